@@ -0,0 +1,302 @@
+"""
+Benchmark every stage of the telemetry hot path against a simulated sim.
+
+Usage:
+    python benchmarks/bench_hot_path.py [--frames 3000] [--threshold 0.5]
+    python benchmarks/bench_hot_path.py --save-baseline
+
+The ``irsdk`` module is replaced by fake_irsdk before the app is imported,
+so the live code path runs unchanged on any OS: pyirsdk reads a simulated
+64-car session with realistic frames and SessionInfo YAML, the
+IRSDKSource and DataProvider decode it, and a real WebInterface emits
+through Flask-SocketIO to one connected client per overlay namespace.
+Emitted packets are encoded like the server does before writing them to
+the socket, then dropped.
+
+Stages (each timed on its own, on a fresh sim tick):
+    freeze                  IRSDKSource.freeze_var_buffer_latest
+    telemetry race          DataProvider.get_telemetry_data, race session
+    telemetry inputs        DataProvider.get_telemetry_data(metrics=False)
+    metrics race            DataProvider._compute_overlay_metrics, race branch
+    metrics practice        DataProvider._compute_overlay_metrics, practice branch
+    normalize               WebInterface._normalize_data
+    emit input_telemetry    TelemetryChannel.publish of the driver inputs
+    emit driver_in_front    TelemetryChannel.publish of the driver in front data
+    process frame           WebInterface._process_telemetry_data, all of the above
+
+For each stage the script prints the median ns per frame (the best of
+``--repeat`` passes) and the memory it
+allocates per frame: the peak of new memory while the stage runs (from
+tracemalloc) and the memory blocks still held afterwards, which should be
+0 once warm. process frame holds its stage timestamps (about 5 blocks)
+until the metrics reader or fold thread folds them. Allocations are measured in a separate pass because
+tracemalloc slows everything down.
+
+The results are compared with benchmarks/hot_path_baseline.json and the
+script exits with status 1 when a stage got more than ``--threshold``
+slower or allocates more than ``--alloc-threshold`` more than the baseline
+(both fractions). Allocations are deterministic and get the tight limit,
+timings vary with the machine and its load: save a baseline on yours with
+--save-baseline before comparing, and tighten --threshold on a quiet one.
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'src'))
+sys.path.insert(0, BENCH_DIR)
+
+import fake_irsdk  # noqa: E402
+
+fake_irsdk.install()
+
+from data_provider import INPUT_KEYS  # noqa: E402
+from telemetry_channel import ENCODING_FULL  # noqa: E402
+from web_interface import DriverInFrontNamespace, WebInterface  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'hot_path_baseline.json')
+
+# Allocation growth below this many bytes is noise (dict resizes, interning)
+ALLOC_SLACK = 512
+
+
+class EncodedPacketSink:
+    """
+    Stands in for the server's packet writers: encodes every packet the way
+    it would be written to the websocket, counts it and drops it.
+    """
+
+    def __init__(self) -> None:
+        self.packets = 0
+        self.bytes = 0
+
+    def _count(self, encoded) -> None:
+        self.packets += 1
+        self.bytes += len(encoded)
+
+    def send_packet(self, eio_sid, pkt) -> None:
+        """Socket.IO packet to one client (keyframes, schemas)."""
+        encoded = pkt.encode()
+        for part in encoded if isinstance(encoded, list) else [encoded]:
+            self._count(part)
+
+    def send_eio_packet(self, eio_sid, eio_pkt) -> None:
+        """Engine.IO packet the manager encoded once for a whole room."""
+        self._count(eio_pkt.encode())
+
+
+class HotPath:
+    """A WebInterface wired to the simulated sim, with one client per namespace."""
+
+    def __init__(self) -> None:
+        self.web = WebInterface([])
+        # The benchmark drives the frames itself
+        self.web.shutdown_flag = True
+        self.web.subscribers_changed.set()
+        self.web.telemetry_thread.join()
+
+        self.provider = self.web.data_provider
+        self.source = self.provider.ir_sdk
+        self.sdk = self.source.ir_sdk
+        self.provider.connect()
+
+        # Overlays without a folder in this tree get no namespace from the app
+        if self.web.driver_in_front_channel.namespace not in self.web.socketio.server.namespace_handlers:
+            self.web.socketio.on_namespace(DriverInFrontNamespace(self.web.driver_in_front_channel.namespace,
+                                                                  self.web.driver_in_front_channel))
+        for channel in self.web.channels:
+            channel.set_emit_rate(None)
+        self.clients = [self.web.socketio.test_client(self.web.app, namespace=channel.namespace,
+                                                      query_string=f'encoding={ENCODING_FULL}')
+                        for channel in self.web.channels]
+        self.sink = EncodedPacketSink()
+        self.web.socketio.server._send_packet = self.sink.send_packet
+        self.web.socketio.server._send_eio_packet = self.sink.send_eio_packet
+
+        self.sdk.auto_advance = False
+        self.next_frame()
+
+    def next_frame(self) -> None:
+        """Let the sim write the next tick and freeze it, outside of any timing."""
+        self.sdk.advance()
+        self.source.freeze_var_buffer_latest()
+
+    def set_session(self, session_num: int) -> None:
+        self.sdk.set_session_num(session_num)
+        self.next_frame()
+
+    def stages(self):
+        """Yield (name, setup, prepare, run) for every stage, only run is timed."""
+        provider, web = self.provider, self.web
+
+        def fresh_frame():
+            self.next_frame()
+
+        def decoded_frame():
+            self.next_frame()
+            provider.frame = provider._read_frame()
+
+        inputs = {}
+
+        def input_payload():
+            self.next_frame()
+            inputs.clear()
+            data = provider.get_telemetry_data(freeze=False)
+            inputs.update((key, data.get(key)) for key in INPUT_KEYS)
+
+        normalized = {}
+
+        def normalized_payload():
+            input_payload()
+            normalized.clear()
+            normalized.update(web._normalize_data(inputs))
+
+        driver_data = {}
+
+        def driver_payload():
+            self.next_frame()
+            data = provider.get_telemetry_data(freeze=False)
+            driver_data.clear()
+            driver_data.update((key, data.get(key, 0.0)) for key in
+                               ('front_last_lap_time', 'front_best_lap_time', 'lap_delta', 'target_pace'))
+            driver_data['session_type'] = data.get('session_type', 'race')
+
+        def advance_only():
+            self.sdk.advance()
+
+        race = lambda: self.set_session(fake_irsdk.SESSION_RACE)  # noqa: E731
+        practice = lambda: self.set_session(fake_irsdk.SESSION_PRACTICE)  # noqa: E731
+
+        yield 'freeze', race, advance_only, self.source.freeze_var_buffer_latest
+        yield 'telemetry race', race, fresh_frame, lambda: provider.get_telemetry_data(freeze=False)
+        yield 'telemetry inputs', race, fresh_frame, lambda: provider.get_telemetry_data(freeze=False, metrics=False)
+        yield 'metrics race', race, decoded_frame, provider._compute_overlay_metrics
+        yield 'metrics practice', practice, decoded_frame, provider._compute_overlay_metrics
+        yield 'normalize', race, input_payload, lambda: web._normalize_data(inputs)
+        yield 'emit input_telemetry', race, normalized_payload, lambda: web.telemetry_channel.publish(normalized)
+        yield 'emit driver_in_front', race, driver_payload, lambda: web.driver_in_front_channel.publish(driver_data)
+        yield 'process frame', race, fresh_frame, lambda: web._process_telemetry_data(freeze=False)
+
+
+def time_stage(prepare, run, frames: int) -> float:
+    """Median ns per call, every call on a freshly prepared frame."""
+    timings = []
+    perf_counter_ns = time.perf_counter_ns
+    for _ in range(frames):
+        prepare()
+        start = perf_counter_ns()
+        run()
+        timings.append(perf_counter_ns() - start)
+    return statistics.median(timings)
+
+
+def measure_allocations(prepare, run, frames: int):
+    """Mean peak bytes allocated per call and mean blocks still held after it."""
+    peak_total = 0
+    tracemalloc.start()
+    for _ in range(frames):
+        prepare()
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        run()
+        peak_total += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+
+    gc.collect()
+    gc.disable()
+    held = 0
+    try:
+        for _ in range(frames):
+            prepare()
+            before = sys.getallocatedblocks()
+            run()
+            held += sys.getallocatedblocks() - before
+    finally:
+        gc.enable()
+    return peak_total / frames, held / frames
+
+
+def run_benchmark(frames: int, alloc_frames: int, repeat: int):
+    hot_path = HotPath()
+    results = {}
+    for name, setup, prepare, run in hot_path.stages():
+        setup()
+        # Warm up caches (field plans, SessionInfo, encoder schemas)
+        for _ in range(50):
+            prepare()
+            run()
+        # Best of several medians, other processes only ever make it slower
+        ns = min(time_stage(prepare, run, frames) for _ in range(repeat))
+        # Start the allocation pass with no frame marks pending
+        hot_path.web.metrics.fold()
+        peak_bytes, held_blocks = measure_allocations(prepare, run, alloc_frames)
+        results[name] = {'ns': round(ns), 'alloc_bytes': round(peak_bytes, 1), 'held_blocks': round(held_blocks, 2)}
+        print(f"{name:<24}{ns:>12,.0f}{peak_bytes:>14,.0f}{held_blocks:>14.2f}")
+    return results
+
+
+def check(results, baseline, threshold: float, alloc_threshold: float):
+    """Return the list of regressions against the baseline."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get('stages', {}).get(name)
+        if base is None:
+            continue
+        if result['ns'] > base['ns'] * (1 + threshold):
+            regressions.append(f"{name}: {result['ns']:,.0f} ns/frame, baseline {base['ns']:,.0f}")
+        if result['alloc_bytes'] > base['alloc_bytes'] * (1 + alloc_threshold) + ALLOC_SLACK:
+            regressions.append(f"{name}: {result['alloc_bytes']:,.0f} B/frame allocated, "
+                               f"baseline {base['alloc_bytes']:,.0f}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', type=int, default=3000, help='timed frames per stage')
+    parser.add_argument('--repeat', type=int, default=3, help='timing passes per stage, the best one counts')
+    parser.add_argument('--alloc-frames', type=int, default=300, help='frames per stage for the allocation pass')
+    parser.add_argument('--threshold', type=float, default=0.5, help='allowed slowdown, 0.5 = 50%%')
+    parser.add_argument('--alloc-threshold', type=float, default=0.1, help='allowed allocation growth')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline file')
+    parser.add_argument('--save-baseline', action='store_true', help='write the results as the new baseline')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    print(f"{'stage':<24}{'ns/frame':>12}{'alloc B/frame':>14}{'held blocks':>14}")
+    results = run_benchmark(args.frames, args.alloc_frames, args.repeat)
+
+    machine = f"{platform.system()} {platform.machine()} Python {platform.python_version()}"
+    if args.save_baseline:
+        with open(args.baseline, 'w') as baseline_file:
+            json.dump({'machine': machine, 'stages': results}, baseline_file, indent=2)
+            baseline_file.write('\n')
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}, run with --save-baseline to create one")
+        return
+    with open(args.baseline) as baseline_file:
+        baseline = json.load(baseline_file)
+    if baseline.get('machine') != machine:
+        print(f"Note: baseline recorded on {baseline.get('machine')}, this is {machine}")
+
+    regressions = check(results, baseline, args.threshold, args.alloc_threshold)
+    if regressions:
+        print("Regressions:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print(f"No regression against the baseline (time {args.threshold:.0%}, allocations {args.alloc_threshold:.0%})")
+
+
+if __name__ == '__main__':
+    main()
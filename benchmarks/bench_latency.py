@@ -0,0 +1,197 @@
+"""
+Measure the sim-to-client latency and fan-out throughput of the web server on
+a simulated sim.
+
+Usage:
+    python benchmarks/bench_latency.py [--mode auto] [--encodings full,delta,binary]
+                                       [--clients 1] [--tick-rate 60]
+                                       [--emit-rate 0] [--seconds 10]
+
+The web server runs in a child process on fake_irsdk, in the server mode
+asked for: ``threading``, ``eventlet`` (needs eventlet installed),
+``asyncio`` (AsyncServer on uvicorn) or ``auto`` like the app; ``all`` runs
+the three modes one after the other and skips eventlet when it is not
+installed. ``--clients`` python-socketio clients per wire encoding connect
+to /input_telemetry and echo every latency probe as soon as it arrives, the
+same echo the overlays send after painting the frame. There is no paint
+here, so the client component is 0 and the total is the server plus network
+latency of that configuration.
+
+The latency figures are the ones the server aggregates for /telemetry_stats
+and /metrics. The fan-out figures count the frames each client received:
+messages per second over all clients, and the share of the frames the
+server sent that reached them. Raise ``--clients`` and ``--tick-rate`` to
+find where a mode stops keeping up.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(BENCH_DIR, '..', 'src')
+
+NAMESPACE = '/input_telemetry'
+EVENTS = {
+    'full': 'telemetry_update',
+    'delta': 'telemetry_update_delta',
+    'binary': 'telemetry_update_binary',
+}
+
+
+MODES = ('threading', 'eventlet', 'asyncio')
+
+
+def serve(port: int, tick_rate: int) -> None:
+    """Run the web server on the simulated sim, the parent configured it through the environment."""
+    sys.path.insert(0, SRC_DIR)
+    sys.path.insert(0, BENCH_DIR)
+    import fake_irsdk
+    fake_irsdk.TICK_RATE = tick_rate
+    fake_irsdk.install()
+    import web_interface
+
+    web = web_interface.WebInterface([])
+    web.data_provider.connect()
+    if web_interface.using_asyncio_mode:
+        web.socketio.run('127.0.0.1', port)
+    elif web_interface.using_fallback_mode:
+        web._run_with_threading('127.0.0.1', port)
+    else:
+        web._run_with_eventlet('127.0.0.1', port)
+
+
+def eventlet_installed() -> bool:
+    try:
+        import eventlet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def start_server(mode: str, args: argparse.Namespace) -> subprocess.Popen:
+    env = dict(os.environ)
+    env['RAH_EMIT_RATES'] = f'input_telemetry={args.emit_rate}'
+    env['RAH_LATENCY_PROBE_INTERVAL'] = str(args.probe_interval)
+    env.pop('RAH_SERVER_MODE', None)
+    if mode in MODES:
+        env['RAH_SERVER_MODE'] = mode
+    return subprocess.Popen([sys.executable, os.path.abspath(__file__), '--serve', '--port', str(args.port),
+                             '--tick-rate', str(args.tick_rate)], env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_for_server(url: str, timeout: float = 30.0):
+    import requests
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            return requests.get(url, timeout=1).json()
+        except requests.RequestException:
+            time.sleep(0.2)
+    sys.exit(f'The server did not start within {timeout:.0f} s')
+
+
+def connect_client(url: str, encoding: str, received_counts: Dict[str, int]):
+    """Connect a client that counts its frames per encoding and echoes every probe it receives."""
+    import socketio
+
+    client = socketio.Client(reconnection=False)
+    micros = lambda: time.perf_counter_ns() // 1000  # noqa: E731
+
+    def on_frame(data, stamp=None):
+        received = micros()
+        received_counts[encoding] += 1
+        if client.connected and isinstance(stamp, list) and len(stamp) >= 3:
+            client.emit('latency_echo', {'tick': stamp[0], 'frame': stamp[1], 'emit': stamp[2],
+                                         'received': received, 'rendered': received, 'echoed': micros()},
+                        namespace=NAMESPACE)
+
+    client.on(EVENTS[encoding], on_frame, namespace=NAMESPACE)
+    client.connect(f'{url}?encoding={encoding}', namespaces=[NAMESPACE], transports=['websocket'])
+    return client
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mode', choices=('auto', 'all') + MODES, default='auto',
+                        help='server mode, all compares the three')
+    parser.add_argument('--encodings', default='full,delta,binary', help='wire encodings the clients ask for')
+    parser.add_argument('--clients', type=int, default=1, help='clients per encoding')
+    parser.add_argument('--tick-rate', type=int, default=60, help='simulated sim ticks per second')
+    parser.add_argument('--emit-rate', type=float, default=0, help='input_telemetry messages per second, 0 = every tick')
+    parser.add_argument('--probe-interval', type=float, default=0.1, help='seconds between latency probes')
+    parser.add_argument('--seconds', type=float, default=10, help='measuring time')
+    parser.add_argument('--port', type=int, default=8095)
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port, args.tick_rate)
+        return
+
+    modes = [args.mode]
+    if args.mode == 'all':
+        modes = [mode for mode in MODES if mode != 'eventlet' or eventlet_installed()]
+        if 'eventlet' not in modes:
+            print('eventlet is not installed, skipping it')
+    elif args.mode == 'eventlet' and not eventlet_installed():
+        sys.exit('eventlet is not installed')
+
+    encodings = [encoding.strip() for encoding in args.encodings.split(',') if encoding.strip()]
+    for mode in modes:
+        run_mode(mode, encodings, args)
+
+
+def run_mode(mode: str, encodings: List[str], args: argparse.Namespace) -> None:
+    """Start a server in one mode, connect the clients and print its figures."""
+    import requests
+
+    url = f'http://127.0.0.1:{args.port}'
+    server = start_server(mode, args)
+    clients = []
+    received = {encoding: 0 for encoding in encodings}
+    try:
+        wait_for_server(f'{url}/telemetry_stats')
+        clients = [connect_client(url, encoding, received) for encoding in encodings for _ in range(args.clients)]
+        before = requests.get(f'{url}/telemetry_stats', timeout=30).json()['channels'][NAMESPACE]['frames_sent']
+        counted = dict(received)
+        started = time.perf_counter()
+        time.sleep(args.seconds)
+        elapsed = time.perf_counter() - started
+        counted = {encoding: received[encoding] - counted[encoding] for encoding in encodings}
+        stats = requests.get(f'{url}/telemetry_stats', timeout=30).json()
+    except requests.RequestException as e:
+        print(f'{mode}: the server stopped answering ({e.__class__.__name__}), it cannot keep up with this load\n')
+        return
+    finally:
+        for client in clients:
+            client.disconnect()
+            client.wait()
+        server.terminate()
+        server.wait()
+
+    channel = stats['channels'][NAMESPACE]
+    frames_sent = channel['frames_sent'] - before
+    print(f"async mode {stats['async_mode']}, {args.tick_rate} Hz, emit rate {channel['emit_rate'] or 'every tick'}, "
+          f"{args.clients} client(s) per encoding, {channel['latency']['echoes']} echoes, "
+          f"{channel['latency']['rejected']} rejected")
+    if 'emits_dropped' in stats:
+        print(f"emits dropped by the asyncio producer: {stats['emits_dropped']}")
+    print(f"{'encoding':<10}{'msgs/s':>10}{'delivered':>11}")
+    for encoding in encodings:
+        expected = frames_sent * args.clients
+        delivered = counted[encoding] / expected if expected else 0.0
+        print(f"{encoding:<10}{counted[encoding] / elapsed:>10.1f}{delivered:>10.1%}")
+    print(f"{'encoding':<10}{'component':<10}{'count':>8}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for encoding, components in sorted(channel['latency']['encodings'].items()):
+        for component, figures in components.items():
+            print(f"{encoding:<10}{component:<10}{figures['count']:>8}{figures['p50_ms']:>10.3f}"
+                  f"{figures['p99_ms']:>10.3f}{figures['max_ms']:>10.3f}")
+    print()
+
+
+if __name__ == '__main__':
+    main()
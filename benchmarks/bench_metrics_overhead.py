@@ -0,0 +1,117 @@
+"""
+Measure what the hot path instrumentation adds to every telemetry frame.
+
+Usage:
+    python benchmarks/bench_metrics_overhead.py [--frames 200000]
+
+A frame of the telemetry loop takes one perf_counter_ns() timestamp per
+entry of FRAME_MARKS, keeps the first two on the DataProvider and records
+the tuple of them. This script replays exactly that sequence without the
+work in between and reports:
+
+    on frame    the statements above, paid inside every frame
+    fold        turning the frames of one FOLD_INTERVAL at 60 Hz into stage
+                histograms and counters, shown per frame. It runs on the
+                metrics reader or the background fold thread, not on the
+                telemetry thread, so it costs CPU but no frame latency.
+    clock       a single perf_counter_ns() call, most of the on frame cost
+                is this times the number of timestamps
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from telemetry_metrics import FOLD_INTERVAL, FRAME_MARKS, TelemetryMetrics  # noqa: E402
+
+# Frames recorded between two background folds at 60 Hz
+FOLD_FRAMES = int(FOLD_INTERVAL * 60)
+# Frames timed between two clears of the pending list
+BATCH_FRAMES = 1024
+
+
+class _Provider:
+    """Holds the DataProvider's frame marks."""
+    frame_started_ns = 0
+    frame_decoded_ns = 0
+
+
+def instrumented_frames(metrics: TelemetryMetrics, frames: int) -> float:
+    """Mean ns per frame of the instrumentation of a frame that emits on both channels."""
+    perf_counter_ns = time.perf_counter_ns
+    provider = _Provider()
+    batches = max(frames // BATCH_FRAMES, 1)
+
+    total = 0
+    for _ in range(batches):
+        started_batch = perf_counter_ns()
+        for _ in range(BATCH_FRAMES):
+            # DataProvider.get_telemetry_data
+            provider.frame_started_ns = perf_counter_ns()
+            provider.frame_decoded_ns = perf_counter_ns()
+            # WebInterface._process_telemetry_data
+            ready = normalized = inputs_sent = perf_counter_ns()
+            normalized = perf_counter_ns()
+            inputs_sent = perf_counter_ns()
+            driver_sent = perf_counter_ns()
+            if provider.frame_decoded_ns:
+                metrics.record_frame((provider.frame_started_ns, provider.frame_decoded_ns, ready,
+                                      normalized, inputs_sent, driver_sent))
+        total += perf_counter_ns() - started_batch
+        metrics._pending.clear()
+    return total / (batches * BATCH_FRAMES)
+
+
+def fold_per_frame(metrics: TelemetryMetrics, batches: int) -> float:
+    """Median ns per frame of folding the frames of one FOLD_INTERVAL."""
+    timings = []
+    for _ in range(batches):
+        now = 0
+        for index in range(FOLD_FRAMES):
+            marks = []
+            for mark in range(len(FRAME_MARKS)):
+                now += 2_000 + (index * 7919 + mark * 104729) % 20_000
+                marks.append(now)
+            metrics.record_frame(tuple(marks))
+        started = time.perf_counter_ns()
+        metrics.fold()
+        timings.append(time.perf_counter_ns() - started)
+    return statistics.median(timings) / FOLD_FRAMES
+
+
+def clock_cost(calls: int) -> float:
+    """Mean ns of one perf_counter_ns() call."""
+    perf_counter_ns = time.perf_counter_ns
+    started = perf_counter_ns()
+    for _ in range(calls):
+        perf_counter_ns()
+    loop_started = perf_counter_ns()
+    for _ in range(calls):
+        pass
+    loop = perf_counter_ns() - loop_started
+    return (loop_started - started - loop) / calls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', type=int, default=200_000, help='instrumented frames to time')
+    parser.add_argument('--repeat', type=int, default=5, help='passes, the best one counts')
+    args = parser.parse_args()
+
+    metrics = TelemetryMetrics()
+    instrumented_frames(metrics, BATCH_FRAMES * 10)
+    on_frame = min(instrumented_frames(metrics, args.frames) for _ in range(args.repeat))
+    fold = min(fold_per_frame(metrics, 20) for _ in range(args.repeat))
+    clock = min(clock_cost(args.frames) for _ in range(args.repeat))
+
+    print(f"timestamps  {len(FRAME_MARKS):>9} per frame")
+    print(f"clock       {clock:>9.0f} ns per perf_counter_ns()")
+    print(f"on frame    {on_frame:>9.0f} ns per frame, on the telemetry thread")
+    print(f"fold        {fold:>9.0f} ns per frame, amortized, off the telemetry thread")
+
+
+if __name__ == '__main__':
+    main()
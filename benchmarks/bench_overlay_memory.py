@@ -0,0 +1,83 @@
+"""
+Estimate the memory the overlay host mode saves per open overlay.
+
+Usage:
+    python benchmarks/bench_overlay_memory.py [--overlays 6]
+
+In the process model every overlay is a Python process that imported
+webview and the window code. In the host model (RAH_OVERLAY_HOST=true) one
+such process owns every window. This script starts ``--overlays`` processes
+that import what an overlay process imports, then measures their resident
+set size. It also measures what one more OverlayWindow object costs inside a
+single process.
+
+No window is opened, so the browser engine is not included. With the
+process model each process also starts its own WebView2 runtime, and that
+cost comes on top of the Python figures reported here. Resident memory is
+read with psutil when it is installed, and from /proc otherwise.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+
+def rss_bytes(pid):
+    """Resident set size of a process."""
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss
+    except ImportError:
+        with open(f'/proc/{pid}/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    raise RuntimeError('Cannot read the process memory, install psutil')
+
+
+def overlay_process(conn, windows):
+    """Import what an overlay process imports, create the window objects and wait."""
+    sys.path.insert(0, SRC_DIR)
+    import window_pool  # noqa: F401
+    from overlay_window import OverlayWindow
+    kept = [OverlayWindow('http://127.0.0.1:8085/overlay/bench', 400, 300, transparent=True)
+            for _ in range(windows)]
+    conn.send(len(kept))
+    conn.recv()
+
+
+def measure(context, windows):
+    """Start one overlay process with ``windows`` window objects, return its RSS."""
+    parent_conn, child_conn = context.Pipe()
+    process = context.Process(target=overlay_process, args=(child_conn, windows), daemon=True)
+    process.start()
+    parent_conn.recv()
+    rss = rss_bytes(process.pid)
+    parent_conn.send(None)
+    process.join()
+    return rss
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--overlays', type=int, default=6)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context('spawn')
+    mib = 1024 * 1024
+    per_process = [measure(context, 1) for _ in range(args.overlays)]
+    host = measure(context, args.overlays)
+
+    process_total = sum(per_process)
+    print(f"{args.overlays} overlays, Python side only")
+    print(f"process model: {process_total / mib:8.1f} MiB  ({process_total / args.overlays / mib:.1f} MiB per overlay)")
+    print(f"host model:    {host / mib:8.1f} MiB")
+    print(f"saved:         {(process_total - host) / mib:8.1f} MiB  "
+          f"({(process_total - host) / max(args.overlays - 1, 1) / mib:.1f} MiB per additional overlay)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,239 @@
+"""
+Compare DataProvider._compute_overlay_metrics with the original
+implementation.
+
+Usage:
+    python benchmarks/bench_overlay_metrics.py [--frames 20000]
+
+Both implementations are fed the same synthetic frames for fields of
+different sizes, their outputs are checked for equality and the cost per
+frame is printed for the race and practice branches (the best of
+``--repeat`` passes). The current version is timed twice: with CarIdx
+arrays delivered as Python lists (what pyirsdk's item access returns) and
+as NumPy arrays straight from the telemetry buffer (what the FieldPlan
+decodes). Its frames are decoded before timing, since the telemetry loop
+decodes them for the driver inputs anyway; the original implementation
+read every variable itself and is timed with those reads.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from data_provider import DataProvider  # noqa: E402
+from telemetry_source import TelemetrySource  # noqa: E402
+
+CAR_SLOTS = 64
+
+
+class SyntheticSource(TelemetrySource):
+    """Serves a fixed set of frames with a configurable number of active cars."""
+
+    def __init__(self, active_cars: int, session_type: str, frames: int = 256, seed: int = 1,
+                 as_arrays: bool = False) -> None:
+        rng = random.Random(seed)
+        self.session_type = session_type
+        self.frames = []
+        for _ in range(frames):
+            best = [-1.0] * CAR_SLOTS
+            last = [-1.0] * CAR_SLOTS
+            est = [0.0] * CAR_SLOTS
+            # iRacing publishes these as float32, keep the values representable
+            for idx in range(active_cars):
+                best[idx] = float(np.float32(rng.uniform(88.0, 92.0)))
+                last[idx] = float(np.float32(best[idx] + rng.uniform(0.0, 1.5)))
+                est[idx] = float(np.float32(rng.uniform(0.0, 90.0)))
+            if as_arrays:
+                best, last, est = (np.asarray(a, dtype=np.float32) for a in (best, last, est))
+            self.frames.append({
+                'PlayerCarIdx': active_cars // 2,
+                'LapLastLapTime': float(last[active_cars // 2]),
+                'CarIdxBestLapTime': best,
+                'CarIdxLastLapTime': last,
+                'CarIdxEstTime': est,
+                'SessionLapsRemain': 12,
+                'SessionTimeRemain': 1800.0,
+                'SessionNum': 0,
+            })
+        self.index = 0
+
+    def startup(self) -> bool:
+        return True
+
+    def shutdown(self) -> None:
+        pass
+
+    def freeze_var_buffer_latest(self) -> None:
+        self.index = (self.index + 1) % len(self.frames)
+
+    @property
+    def session_info_update(self):
+        return 1
+
+    def __getitem__(self, key):
+        if key == 'SessionInfo':
+            return {'Sessions': [{'SessionNum': 0, 'SessionType': self.session_type}]}
+        if key == 'DriverInfo':
+            return {'Drivers': []}
+        return self.frames[self.index].get(key)
+
+
+def legacy_session_type(sdk) -> str:
+    """The SessionInfo lookup that ran on every frame before it was cached."""
+    try:
+        sess_num = int(sdk['SessionNum'])
+        info = sdk['SessionInfo']
+        for sess in info.get('Sessions', []):
+            if int(sess.get('SessionNum', -1)) == sess_num:
+                return str(sess.get('SessionType', 'Race'))
+    except Exception:
+        pass
+    return 'Race'
+
+
+def legacy_compute_overlay_metrics(provider: DataProvider):
+    """The list-based implementation that _compute_overlay_metrics replaced."""
+    sdk = provider.ir_sdk
+    me_idx = int(sdk['PlayerCarIdx'])
+    my_last = float(sdk['LapLastLapTime'] or -1.0)
+    my_best = float(sdk['CarIdxBestLapTime'][me_idx] or -1.0)
+
+    if my_last <= 0.0:
+        return provider._default_front_data()
+
+    session_type = legacy_session_type(sdk).lower()
+
+    if session_type == 'race':
+        est = sdk['CarIdxEstTime']
+        if not est:
+            return provider._default_front_data()
+
+        front_idx, gap_sec = None, None
+        for idx, g in enumerate(est):
+            if g and g > 0 and (gap_sec is None or g < gap_sec):
+                front_idx, gap_sec = idx, g
+
+        if front_idx is None:
+            return provider._default_front_data()
+
+        front_last = float(sdk['CarIdxLastLapTime'][front_idx] or -1.0)
+        if front_last <= 0.0:
+            return provider._default_front_data()
+
+        lap_delta = front_last - my_last
+
+        sess_laps_remain = int(sdk['SessionLapsRemain'])
+        if 0 < sess_laps_remain < 32000:
+            laps_left = max(sess_laps_remain, 1)
+        else:
+            secs_left = float(sdk['SessionTimeRemain'])
+            laps_left = max(int(secs_left / max(my_last, 1e-9)), 1)
+
+        target_pace = my_last - (gap_sec / laps_left) * 1.10
+
+        return {
+            "front_last_lap_time": round(front_last, 3),
+            "lap_delta": round(lap_delta, 3),
+            "target_pace": round(max(target_pace, 0.0), 3),
+            "session_type": session_type,
+        }
+
+    best_array = sdk['CarIdxBestLapTime']
+    if not best_array:
+        return provider._default_front_data()
+
+    standings = sorted(
+        [(idx, t) for idx, t in enumerate(best_array) if t and t > 0],
+        key=lambda x: x[1]
+    )
+
+    my_pos = next((i for i, (idx, _) in enumerate(standings) if idx == me_idx), None)
+    if my_pos is None or my_pos == 0:
+        return provider._default_front_data()
+
+    front_idx, front_best = standings[my_pos - 1]
+    best_delta = my_best - front_best
+
+    front_last = float(sdk['CarIdxLastLapTime'][front_idx] or -1.0)
+    lap_delta = (front_last - my_last) if front_last > 0 else 0.0
+
+    return {
+        "front_best_lap_time": round(front_best, 3),
+        "target_pace": round(lap_delta, 3),
+        "lap_delta": round(best_delta, 3),
+        "session_type": "practice",
+    }
+
+
+def current_compute_overlay_metrics(provider: DataProvider):
+    """Decode the frame and run the current implementation, as the telemetry loop does."""
+    provider.frame = provider._read_frame()
+    return provider._compute_overlay_metrics()
+
+
+def time_legacy(provider: DataProvider, frames: int, repeat: int) -> float:
+    """Return the best mean cost of one legacy call in microseconds."""
+    source = provider.ir_sdk
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(frames):
+            source.freeze_var_buffer_latest()
+            legacy_compute_overlay_metrics(provider)
+        best = min(best, (time.perf_counter() - start) / frames * 1e6)
+    return best
+
+
+def time_current(provider: DataProvider, frames: int, repeat: int) -> float:
+    """Return the best mean cost of one call on an already decoded frame in microseconds."""
+    source = provider.ir_sdk
+    decoded = []
+    for _ in range(len(source.frames)):
+        source.freeze_var_buffer_latest()
+        decoded.append(provider._read_frame())
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for index in range(frames):
+            provider.frame = decoded[index % len(decoded)]
+            provider._compute_overlay_metrics()
+        best = min(best, (time.perf_counter() - start) / frames * 1e6)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', type=int, default=20000, help='frames per measurement')
+    parser.add_argument('--repeat', type=int, default=5, help='passes per measurement, the best one counts')
+    args = parser.parse_args()
+
+    print(f"{'session':<10}{'cars':>6}{'legacy µs':>12}{'lists µs':>12}{'arrays µs':>12}")
+    for session_type in ('Race', 'Practice'):
+        for active_cars in (8, 24, 40, 64):
+            provider = DataProvider(SyntheticSource(active_cars, session_type))
+            array_provider = DataProvider(SyntheticSource(active_cars, session_type, as_arrays=True))
+            provider.connect()
+            array_provider.connect()
+
+            for _ in range(len(provider.ir_sdk.frames)):
+                provider.ir_sdk.freeze_var_buffer_latest()
+                array_provider.ir_sdk.freeze_var_buffer_latest()
+                expected = legacy_compute_overlay_metrics(provider)
+                for candidate in (provider, array_provider):
+                    actual = current_compute_overlay_metrics(candidate)
+                    if expected != actual:
+                        sys.exit(f"Mismatch for {session_type} with {active_cars} cars: {expected} != {actual}")
+
+            legacy = time_legacy(provider, args.frames, args.repeat)
+            from_lists = time_current(provider, args.frames, args.repeat)
+            from_arrays = time_current(array_provider, args.frames, args.repeat)
+            print(f"{session_type:<10}{active_cars:>6}{legacy:>12.2f}{from_lists:>12.2f}{from_arrays:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
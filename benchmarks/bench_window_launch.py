@@ -0,0 +1,75 @@
+"""
+Compare launching an overlay window in a fresh process with handing the
+launch to a pre-warmed window_pool worker.
+
+Usage:
+    python benchmarks/bench_window_launch.py [--runs 10] [--start-method spawn]
+
+No window is opened. Each run measures the time from the launch request to
+the moment the process could call OverlayWindow.create_overlay_window: for a
+cold launch that is process start, the webview and app imports and the
+request; for a warm launch only the pipe round trip. The time the browser
+engine needs to paint the page comes on top of both and is logged by the
+application itself ("Overlay ... loaded ... ms after the launch request").
+
+The default start method is spawn, which is what Windows uses.
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+
+def probe(conn, parent_conn):
+    """Stand-in for window_pool._worker_main that reports instead of opening a window."""
+    parent_conn.close()
+    sys.path.insert(0, SRC_DIR)
+    import window_pool  # noqa: F401
+    import overlay_window  # noqa: F401  everything a pooled worker imports before it is ready
+    conn.send(('ready', os.getpid()))
+    request = conn.recv()
+    conn.send(time.time() - request['requested_at'])
+    conn.close()
+
+
+def launch(context, warm):
+    """Time one launch in milliseconds."""
+    parent_conn, child_conn = context.Pipe()
+    requested_at = None
+    if not warm:
+        requested_at = time.time()
+    process = context.Process(target=probe, args=(child_conn, parent_conn), daemon=True)
+    process.start()
+    child_conn.close()
+    if warm:
+        parent_conn.recv()
+        requested_at = time.time()
+    parent_conn.send({'requested_at': requested_at})
+    if not warm:
+        parent_conn.recv()
+    elapsed = parent_conn.recv()
+    process.join()
+    return elapsed * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--start-method', default='spawn', choices=multiprocessing.get_all_start_methods())
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context(args.start_method)
+    print(f"start method: {args.start_method}, {args.runs} runs")
+    for name, warm in (('cold process', False), ('pooled worker', True)):
+        timings = [launch(context, warm) for _ in range(args.runs)]
+        print(f"{name:14s} median {statistics.median(timings):8.2f} ms   "
+              f"min {min(timings):8.2f} ms   max {max(timings):8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""
+Compare the cost and size of the telemetry_update wire encodings.
+
+Usage:
+    python benchmarks/bench_wire_format.py [--frames 20000]
+
+Each synthetic input telemetry payload carries the INPUT_KEYS fields that
+WebInterface._process_telemetry_data emits on the input_telemetry
+namespace, and is turned into the Socket.IO packet
+the server would send for every encoding: the JSON payload, the JSON delta
+message and the packed binary record. The script prints the server-side
+serialization cost per frame, the bytes on the wire per frame and the cost
+of turning the message back into values (json.loads vs struct.unpack, a
+stand-in for JSON.parse vs DataView reads in the browser).
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+from socketio import packet
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from binary_codec import BinaryEncoder  # noqa: E402
+from data_provider import INPUT_KEYS  # noqa: E402
+from delta_encoder import DeltaEncoder  # noqa: E402
+
+NAMESPACE = '/input_telemetry'
+EVENT = 'telemetry_update'
+
+
+def make_payloads(frames: int, seed: int = 1) -> list:
+    """Build a drive-like sequence of normalized input telemetry payloads."""
+    rng = random.Random(seed)
+    payloads = []
+    speed, gear = 120.0, 3
+    for i in range(frames):
+        speed = max(0.0, speed + rng.uniform(-2.0, 2.0))
+        if i % 240 == 0:
+            gear = rng.randint(1, 6)
+        frame = {
+            'speed': speed,
+            'gear': gear,
+            'throttle': rng.random(),
+            'brake': 0.0 if i % 5 else rng.random(),
+            'clutch': 1.0,
+            'steering_wheel_angle': rng.uniform(-1.5, 1.5),
+            'front_last_lap_time': 91.234,
+            'lap_delta': -0.412,
+            'target_pace': 90.875,
+        }
+        # Only the driver inputs go out on this namespace, like _process_telemetry_data sends them
+        payloads.append({key: frame[key] for key in INPUT_KEYS})
+    return payloads
+
+
+def wire_size(encoded) -> int:
+    """Bytes of an encoded packet, text plus binary attachments."""
+    if isinstance(encoded, list):
+        return sum(len(part) if isinstance(part, bytes) else len(part.encode()) for part in encoded)
+    return len(encoded.encode())
+
+
+def run_json(payloads):
+    out = []
+    for payload in payloads:
+        out.append(packet.Packet(packet.EVENT, data=[EVENT, payload], namespace=NAMESPACE).encode())
+    return out
+
+
+def run_delta(payloads):
+    encoder = DeltaEncoder()
+    out = []
+    for payload in payloads:
+        message = encoder.encode(payload)
+        if message is not None:
+            out.append(packet.Packet(packet.EVENT, data=[f'{EVENT}_delta', message], namespace=NAMESPACE).encode())
+    return out
+
+
+def run_binary(payloads):
+    encoder = BinaryEncoder()
+    out = []
+    for payload in payloads:
+        schema, record = encoder.encode(payload)
+        if schema is not None:
+            out.append(packet.Packet(packet.EVENT, data=[f'{EVENT}_schema', schema], namespace=NAMESPACE).encode())
+        out.append(packet.Packet(packet.EVENT, data=[f'{EVENT}_binary', record], namespace=NAMESPACE).encode())
+    return out, encoder.schema
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', type=int, default=20000)
+    args = parser.parse_args()
+
+    payloads = make_payloads(args.frames)
+
+    json_out, json_time = timed(run_json, payloads)
+    delta_out, delta_time = timed(run_delta, payloads)
+    (binary_out, schema), binary_time = timed(run_binary, payloads)
+
+    # Decode side: the text part after the packet header, or the attachment
+    json_texts = [encoded[encoded.index('['):] for encoded in json_out]
+    records = [encoded[1] for encoded in binary_out if isinstance(encoded, list)]
+    _, json_decode = timed(lambda: [json.loads(text) for text in json_texts])
+    _, binary_decode = timed(lambda: [dict(zip(schema.keys, schema.struct.unpack(r)[1:])) for r in records])
+
+    frames = len(payloads)
+    print(f"{frames} frames, {len(payloads[0])} fields")
+    print(f"{'encoding':<8} {'encode us/frame':>16} {'bytes/frame':>12} {'decode us/frame':>16}")
+    print(f"{'json':<8} {json_time / frames * 1e6:>16.2f} "
+          f"{sum(map(wire_size, json_out)) / frames:>12.1f} {json_decode / frames * 1e6:>16.2f}")
+    print(f"{'delta':<8} {delta_time / frames * 1e6:>16.2f} "
+          f"{sum(map(wire_size, delta_out)) / frames:>12.1f} {'-':>16}")
+    print(f"{'binary':<8} {binary_time / frames * 1e6:>16.2f} "
+          f"{sum(map(wire_size, binary_out)) / frames:>12.1f} {binary_decode / frames * 1e6:>16.2f}")
+    print(f"binary record: {schema.struct.size} bytes, schema sent {len(binary_out) - frames} time(s)")
+
+
+if __name__ == '__main__':
+    main()
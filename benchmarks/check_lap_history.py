@@ -0,0 +1,115 @@
+"""
+Check that the lap history stores the real lap times of a simulated session.
+
+Usage:
+    python benchmarks/check_lap_history.py [--laps 3]
+
+The ``irsdk`` module is replaced by fake_irsdk, which, like iRacing, bumps
+LapCompleted and LapLastLapTime on the same tick. A DataProvider follows
+the player's car through both paths that record laps: the full frame read
+while overlays are open (DataProvider.get_telemetry_data) and the lap
+variables polled while none is (DataProvider.poll_laps). Every stored lap
+must carry the time the sim reported for it, and the laps driven from
+their start must be valid and counted in the statistics.
+
+Ticks far from the start/finish line are simulated without being read, so
+the check takes seconds instead of the minutes of a real lap. The script
+exits with status 1 when a check fails.
+"""
+import argparse
+import logging
+import os
+import sys
+from typing import List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'src'))
+sys.path.insert(0, BENCH_DIR)
+
+import fake_irsdk  # noqa: E402
+
+fake_irsdk.install()
+
+from data_provider import DataProvider  # noqa: E402
+
+# Read every tick this close (in lap fraction) to the line, every
+# SPARSE_EVERY ticks elsewhere
+NEAR_LINE = 0.15
+SPARSE_EVERY = 30
+
+
+def drive(poll: bool, laps: int) -> List[str]:
+    """
+    Drive the player's car until ``laps`` more laps are completed.
+
+    Args:
+        poll: Record through poll_laps instead of full frames
+        laps: Number of laps to complete
+
+    Returns:
+        List[str]: Failed checks, empty if every check passed
+    """
+    provider = DataProvider()
+    provider.connect()
+    session = provider.ir_sdk.ir_sdk.session
+    me = session.player_car_idx
+    start_laps = session.laps_completed[me]
+    expected: List[float] = []
+    tick = 0
+
+    while session.laps_completed[me] < start_laps + laps:
+        pct = session.lap_pct(me)
+        near_line = pct < NEAR_LINE or pct > 1.0 - NEAR_LINE
+        if not near_line and tick % SPARSE_EVERY:
+            session.advance()
+        else:
+            # freeze_var_buffer_latest writes the next tick, then reads it
+            completed = session.laps_completed[me]
+            if poll:
+                provider.poll_laps()
+            else:
+                provider.get_telemetry_data()
+            if session.laps_completed[me] > completed:
+                expected.append(session.last_lap[me])
+        tick += 1
+
+    # Let the history see a few more ticks of the new lap
+    for _ in range(5):
+        provider.poll_laps() if poll else provider.get_telemetry_data()
+
+    failures = []
+    history = provider.get_lap_history()
+    stored = [lap['time'] for lap in history['laps']]
+    label = 'poll' if poll else 'full'
+    print(f"{label}: sim {[round(t, 3) for t in expected]}, stored {[round(t, 3) for t in stored]}")
+
+    if len(stored) != len(expected):
+        failures.append(f"{label}: {len(stored)} laps stored, {len(expected)} completed")
+    for lap, want in zip(history['laps'], expected):
+        if abs(lap['time'] - want) > 1e-3:
+            failures.append(f"{label}: lap {lap['lap']} stored {lap['time']:.3f}s, sim reported {want:.3f}s")
+    # The first lap was already under way when the history started
+    for lap in history['laps'][1:]:
+        if not lap['valid']:
+            failures.append(f"{label}: lap {lap['lap']} driven from its start is not valid")
+    if history['stats']['count'] != len(expected) - 1:
+        failures.append(f"{label}: statistics count {history['stats']['count']}, expected {len(expected) - 1}")
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--laps', type=int, default=3, help='laps to complete per path')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    failures = drive(poll=False, laps=args.laps) + drive(poll=True, laps=args.laps)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if not failures:
+        print("OK")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
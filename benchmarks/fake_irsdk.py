@@ -0,0 +1,447 @@
+"""
+Stand-in for the ``irsdk`` module that simulates a 64-car session.
+
+The fake ``IRSDK`` builds an image of iRacing's shared memory (header, var
+headers, SessionInfo YAML and three rotating var buffers) in a bytearray
+and lets pyirsdk read it, so every read goes through the same struct and
+YAML parsing as on a live sim. Each ``freeze_var_buffer_latest`` advances
+the simulation by one 60 Hz tick and writes the new frame into the next
+var buffer, the way the sim does.
+
+Usage:
+    import fake_irsdk
+    fake_irsdk.install()          # before telemetry_source is imported
+
+    import fake_irsdk
+    sdk = fake_irsdk.IRSDK(session_num=fake_irsdk.SESSION_PRACTICE)
+
+Only the telemetry part is simulated. Broadcast messages and the data-valid
+event do not exist, pyirsdk treats the image like a test file.
+"""
+import math
+import random
+import struct
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+import irsdk as _irsdk
+
+CAR_SLOTS = 64
+TICK_RATE = 60
+NUM_BUF = 3
+
+SESSION_PRACTICE = 0
+SESSION_QUALIFY = 1
+SESSION_RACE = 2
+
+# irsdk_VarType
+CHAR, BOOL, INT, BITFIELD, FLOAT, DOUBLE = range(6)
+_TYPE_CODES = ['c', '?', 'i', 'I', 'f', 'd']
+
+HEADER_SIZE = 48 + 4 * 16
+VAR_HEADER_SIZE = 144
+TRACK_LENGTH_KM = 5.51
+
+# (name, type, count, unit, description), a subset of the ~280 live variables
+# with the same types and array sizes
+VARIABLES: List[Tuple[str, int, int, str, str]] = [
+    ('SessionTime', DOUBLE, 1, 's', 'Seconds since session start'),
+    ('SessionTick', INT, 1, '', 'Current update number'),
+    ('SessionNum', INT, 1, '', 'Session number'),
+    ('SessionState', INT, 1, 'irsdk_SessionState', 'Session state'),
+    ('SessionFlags', BITFIELD, 1, 'irsdk_Flags', 'Session flags'),
+    ('SessionTimeRemain', DOUBLE, 1, 's', 'Seconds left till session ends'),
+    ('SessionLapsRemain', INT, 1, '', 'Old laps left till session ends use SessionLapsRemainEx'),
+    ('SessionLapsRemainEx', INT, 1, '', 'New improved laps left till session ends'),
+    ('PlayerCarIdx', INT, 1, '', "Players carIdx"),
+    ('PlayerCarPosition', INT, 1, '', "Players position in race"),
+    ('PlayerCarClassPosition', INT, 1, '', "Players class position in race"),
+    ('PlayerTrackSurface', INT, 1, 'irsdk_TrkLoc', "Players car track surface type"),
+    ('OnPitRoad', BOOL, 1, '', 'Is the player car on pit road between the cones'),
+    ('Speed', FLOAT, 1, 'm/s', 'GPS vehicle speed'),
+    ('RPM', FLOAT, 1, 'revs/min', 'Engine rpm'),
+    ('Gear', INT, 1, '', '-1=reverse  0=neutral  1..n=current gear'),
+    ('Throttle', FLOAT, 1, '%', '0=off throttle to 1=full throttle'),
+    ('Brake', FLOAT, 1, '%', '0=brake released to 1=max pedal force'),
+    ('Clutch', FLOAT, 1, '%', '0=disengaged to 1=fully engaged'),
+    ('SteeringWheelAngle', FLOAT, 1, 'rad', 'Steering wheel angle'),
+    ('Lap', INT, 1, '', 'Laps started count'),
+    ('LapCompleted', INT, 1, '', 'Laps completed count'),
+    ('LapDist', FLOAT, 1, 'm', 'Meters traveled from S/F this lap'),
+    ('LapDistPct', FLOAT, 1, '%', 'Percentage distance around lap'),
+    ('LapBestLapTime', FLOAT, 1, 's', 'Players best lap time'),
+    ('LapLastLapTime', FLOAT, 1, 's', 'Players last lap time'),
+    ('LapCurrentLapTime', FLOAT, 1, 's', 'Estimate of players current lap time as shown in F3 box'),
+    ('LapDeltaToBestLap', FLOAT, 1, 's', 'Delta time for best lap'),
+    ('FuelLevel', FLOAT, 1, 'l', 'Liters of fuel remaining'),
+    ('FuelLevelPct', FLOAT, 1, '%', 'Percent fuel remaining'),
+    ('FuelUsePerHour', FLOAT, 1, 'kg/h', 'Engine fuel used instantaneous'),
+    ('WaterTemp', FLOAT, 1, 'C', 'Engine coolant temp'),
+    ('OilTemp', FLOAT, 1, 'C', 'Engine oil temperature'),
+    ('Voltage', FLOAT, 1, 'V', 'Engine voltage'),
+    ('EngineWarnings', BITFIELD, 1, 'irsdk_EngineWarnings', 'Bitfield for warning lights'),
+    ('LatAccel', FLOAT, 1, 'm/s^2', 'Lateral acceleration (including gravity)'),
+    ('LongAccel', FLOAT, 1, 'm/s^2', 'Longitudinal acceleration (including gravity)'),
+    ('VertAccel', FLOAT, 1, 'm/s^2', 'Vertical acceleration (including gravity)'),
+    ('Yaw', FLOAT, 1, 'rad', 'Yaw orientation'),
+    ('Pitch', FLOAT, 1, 'rad', 'Pitch orientation'),
+    ('Roll', FLOAT, 1, 'rad', 'Roll orientation'),
+    ('AirTemp', FLOAT, 1, 'C', 'Temperature of air at start/finish line'),
+    ('TrackTempCrew', FLOAT, 1, 'C', 'Temperature of track measured by crew around track'),
+    ('CarIdxLap', INT, CAR_SLOTS, '', 'Laps started by car index'),
+    ('CarIdxLapCompleted', INT, CAR_SLOTS, '', 'Laps completed by car index'),
+    ('CarIdxLapDistPct', FLOAT, CAR_SLOTS, '%', 'Percentage distance around lap by car index'),
+    ('CarIdxTrackSurface', INT, CAR_SLOTS, 'irsdk_TrkLoc', 'Track surface type by car index'),
+    ('CarIdxOnPitRoad', BOOL, CAR_SLOTS, '', 'On pit road between the cones by car index'),
+    ('CarIdxPosition', INT, CAR_SLOTS, '', 'Cars position in race by car index'),
+    ('CarIdxClassPosition', INT, CAR_SLOTS, '', 'Cars class position in race by car index'),
+    ('CarIdxF2Time', FLOAT, CAR_SLOTS, 's', 'Race time behind leader or fastest lap time otherwise'),
+    ('CarIdxEstTime', FLOAT, CAR_SLOTS, 's', 'Estimated time to reach current location on track'),
+    ('CarIdxLastLapTime', FLOAT, CAR_SLOTS, 's', 'Cars last lap time'),
+    ('CarIdxBestLapTime', FLOAT, CAR_SLOTS, 's', 'Cars best lap time'),
+    ('CarIdxGear', INT, CAR_SLOTS, '', '-1=reverse 0=neutral 1..n=current gear by car index'),
+    ('CarIdxRPM', FLOAT, CAR_SLOTS, 'revs/min', 'Engine rpm by car index'),
+    ('CarIdxSteer', FLOAT, CAR_SLOTS, 'rad', 'Steering wheel angle by car index'),
+]
+
+CAR_CLASSES = [
+    {'CarClassID': 4029, 'CarClassShortName': 'GT3', 'CarClassRelSpeed': 60, 'base_lap': 89.2, 'cars': 40},
+    {'CarClassID': 4018, 'CarClassShortName': 'GT4', 'CarClassRelSpeed': 50, 'base_lap': 96.8, 'cars': 24},
+]
+
+
+def _yaml_scalar(value: Any) -> str:
+    if isinstance(value, float):
+        return f'{value:.4f}'
+    return str(value)
+
+
+def _yaml_lines(value: Any, indent: int) -> List[str]:
+    """Emit a value with iRacing's one-space YAML indentation."""
+    pad = ' ' * indent
+    lines: List[str] = []
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if isinstance(item, (dict, list)):
+                lines.append(f'{pad}{key}:')
+                lines.extend(_yaml_lines(item, indent + 1))
+            else:
+                lines.append(f'{pad}{key}: {_yaml_scalar(item)}')
+    else:
+        for item in value:
+            item_lines = _yaml_lines(item, indent + 2)
+            lines.append(f'{pad}- {item_lines[0].lstrip()}')
+            lines.extend(item_lines[1:])
+    return lines
+
+
+class SimulatedSession:
+    """
+    Cars lapping a track at 60 Hz.
+
+    Every car has its own pace and lap-to-lap variation. Lap times, best
+    laps, positions and gaps follow from the simulated progress, and the
+    player's inputs follow a repeating corner pattern around the lap.
+    """
+
+    def __init__(self, session_num: int = SESSION_RACE, player_car_idx: int = 17, seed: int = 1) -> None:
+        self.rng = random.Random(seed)
+        self.session_num = session_num
+        self.player_car_idx = player_car_idx
+        self.tick = 0
+        self.session_time = 0.0
+
+        self.car_class: List[Dict[str, Any]] = []
+        self.pace: List[float] = []
+        for car_class in CAR_CLASSES:
+            for _ in range(car_class['cars']):
+                self.car_class.append(car_class)
+                self.pace.append(car_class['base_lap'] * self.rng.uniform(1.0, 1.025))
+
+        # Start a few laps into the session so every car has lap times
+        self.lap_time = [self._next_lap_time(idx) for idx in range(CAR_SLOTS)]
+        self.lap_started = [-self.rng.uniform(0.0, self.lap_time[idx]) for idx in range(CAR_SLOTS)]
+        self.laps_completed = [3] * CAR_SLOTS
+        self.last_lap = [self._next_lap_time(idx) for idx in range(CAR_SLOTS)]
+        self.best_lap = [min(self.last_lap[idx], self._next_lap_time(idx)) for idx in range(CAR_SLOTS)]
+
+    def _next_lap_time(self, car_idx: int) -> float:
+        return self.pace[car_idx] + abs(self.rng.gauss(0.0, 0.35))
+
+    def advance(self) -> None:
+        """Move the session one tick forward."""
+        self.tick += 1
+        self.session_time = self.tick / TICK_RATE
+        for idx in range(CAR_SLOTS):
+            if self.session_time - self.lap_started[idx] >= self.lap_time[idx]:
+                self.last_lap[idx] = self.lap_time[idx]
+                self.best_lap[idx] = min(self.best_lap[idx], self.lap_time[idx])
+                self.laps_completed[idx] += 1
+                self.lap_started[idx] += self.lap_time[idx]
+                self.lap_time[idx] = self._next_lap_time(idx)
+
+    def lap_pct(self, car_idx: int) -> float:
+        return (self.session_time - self.lap_started[car_idx]) / self.lap_time[car_idx]
+
+    def values(self) -> Dict[str, Any]:
+        """Values of every variable at the current tick."""
+        pct = [self.lap_pct(idx) for idx in range(CAR_SLOTS)]
+        progress = [self.laps_completed[idx] + pct[idx] for idx in range(CAR_SLOTS)]
+        order = sorted(range(CAR_SLOTS), key=lambda idx: -progress[idx])
+        position = [0] * CAR_SLOTS
+        class_position = [0] * CAR_SLOTS
+        class_count: Dict[int, int] = {}
+        for rank, idx in enumerate(order):
+            class_id = self.car_class[idx]['CarClassID']
+            class_count[class_id] = class_count.get(class_id, 0) + 1
+            position[idx] = rank + 1
+            class_position[idx] = class_count[class_id]
+        leader = progress[order[0]]
+
+        me = self.player_car_idx
+        my_pct = pct[me]
+        # Six corners per lap: brake into each, then back on the throttle
+        phase = (my_pct * 6.0) % 1.0
+        braking = phase > 0.85
+        throttle = 0.0 if braking else min(1.0, 0.3 + phase * 1.2)
+        speed = 38.0 + 34.0 * math.sin(math.pi * phase) ** 2
+        gear = min(6, max(2, int(speed / 12.0)))
+        steering = 1.2 * math.sin(2.0 * math.pi * phase) if phase > 0.7 else 0.05 * math.sin(self.tick * 0.3)
+
+        return {
+            'SessionTime': self.session_time,
+            'SessionTick': self.tick,
+            'SessionNum': self.session_num,
+            'SessionState': 4,
+            'SessionFlags': 0x00040000,
+            'SessionTimeRemain': max(3600.0 - self.session_time, 0.0),
+            'SessionLapsRemain': 32767,
+            'SessionLapsRemainEx': 32767,
+            'PlayerCarIdx': me,
+            'PlayerCarPosition': position[me],
+            'PlayerCarClassPosition': class_position[me],
+            'PlayerTrackSurface': 3,
+            'OnPitRoad': False,
+            'Speed': speed,
+            'RPM': 4500.0 + 3000.0 * throttle,
+            'Gear': gear,
+            'Throttle': throttle,
+            'Brake': (phase - 0.85) / 0.15 if braking else 0.0,
+            'Clutch': 1.0,
+            'SteeringWheelAngle': steering,
+            'Lap': self.laps_completed[me] + 1,
+            'LapCompleted': self.laps_completed[me],
+            'LapDist': my_pct * TRACK_LENGTH_KM * 1000.0,
+            'LapDistPct': my_pct,
+            'LapBestLapTime': self.best_lap[me],
+            'LapLastLapTime': self.last_lap[me],
+            'LapCurrentLapTime': self.session_time - self.lap_started[me],
+            'LapDeltaToBestLap': (self.session_time - self.lap_started[me]) - my_pct * self.best_lap[me],
+            'FuelLevel': 80.0 - self.session_time * 0.02,
+            'FuelLevelPct': (80.0 - self.session_time * 0.02) / 120.0,
+            'FuelUsePerHour': 60.0 * throttle + 5.0,
+            'WaterTemp': 88.0,
+            'OilTemp': 101.0,
+            'Voltage': 13.8,
+            'EngineWarnings': 0,
+            'LatAccel': steering * 12.0,
+            'LongAccel': -15.0 if braking else 4.0 * throttle,
+            'VertAccel': 9.81,
+            'Yaw': 2.0 * math.pi * my_pct,
+            'Pitch': 0.01,
+            'Roll': 0.02 * steering,
+            'AirTemp': 22.0,
+            'TrackTempCrew': 31.0,
+            'CarIdxLap': [laps + 1 for laps in self.laps_completed],
+            'CarIdxLapCompleted': list(self.laps_completed),
+            'CarIdxLapDistPct': pct,
+            'CarIdxTrackSurface': [3] * CAR_SLOTS,
+            'CarIdxOnPitRoad': [False] * CAR_SLOTS,
+            'CarIdxPosition': position,
+            'CarIdxClassPosition': class_position,
+            'CarIdxF2Time': [(leader - progress[idx]) * self.pace[idx] for idx in range(CAR_SLOTS)],
+            'CarIdxEstTime': [pct[idx] * self.pace[idx] for idx in range(CAR_SLOTS)],
+            'CarIdxLastLapTime': list(self.last_lap),
+            'CarIdxBestLapTime': list(self.best_lap),
+            'CarIdxGear': [4] * CAR_SLOTS,
+            'CarIdxRPM': [7000.0] * CAR_SLOTS,
+            'CarIdxSteer': [0.0] * CAR_SLOTS,
+        }
+
+    def session_info_yaml(self) -> bytes:
+        """The SessionInfo string in the format the sim writes."""
+        sections = {
+            'WeekendInfo': {
+                'Encoding': 'UTF8',
+                'TrackName': 'spa 2022 gp',
+                'TrackID': 511,
+                'TrackLength': f'{TRACK_LENGTH_KM:.2f} km',
+                'TrackDisplayName': 'Circuit de Spa-Francorchamps',
+                'TrackCity': 'Stavelot',
+                'TrackCountry': 'Belgium',
+                'TrackNumTurns': 20,
+                'SeriesID': 0,
+                'SessionID': 0,
+                'NumCarClasses': len(CAR_CLASSES),
+                'NumCarTypes': len(CAR_CLASSES),
+                'Official': 0,
+                'EventType': 'Race',
+            },
+            'SessionInfo': {
+                'Sessions': [
+                    {'SessionNum': SESSION_PRACTICE, 'SessionLaps': 'unlimited', 'SessionTime': '3600.0000 sec',
+                     'SessionType': 'Practice', 'SessionName': 'PRACTICE'},
+                    {'SessionNum': SESSION_QUALIFY, 'SessionLaps': 'unlimited', 'SessionTime': '900.0000 sec',
+                     'SessionType': 'Open Qualify', 'SessionName': 'QUALIFY'},
+                    {'SessionNum': SESSION_RACE, 'SessionLaps': 'unlimited', 'SessionTime': '3600.0000 sec',
+                     'SessionType': 'Race', 'SessionName': 'RACE'},
+                ],
+            },
+            'SplitTimeInfo': {
+                'Sectors': [{'SectorNum': num, 'SectorStartPct': pct}
+                            for num, pct in enumerate((0.0, 0.3012, 0.6647))],
+            },
+            'DriverInfo': {
+                'DriverCarIdx': self.player_car_idx,
+                'DriverUserID': 100000 + self.player_car_idx,
+                'Drivers': [
+                    {
+                        'CarIdx': idx,
+                        'UserName': f'Driver {idx + 1}',
+                        'AbbrevName': f'Driver, {idx + 1}',
+                        'Initials': 'DR',
+                        'UserID': 100000 + idx,
+                        'TeamName': f'Team {idx // 2 + 1}',
+                        'CarNumber': f'"{idx + 1}"',
+                        'CarClassID': self.car_class[idx]['CarClassID'],
+                        'CarClassShortName': self.car_class[idx]['CarClassShortName'],
+                        'CarClassRelSpeed': self.car_class[idx]['CarClassRelSpeed'],
+                        'CarClassEstLapTime': self.car_class[idx]['base_lap'],
+                        'CarScreenName': f"{self.car_class[idx]['CarClassShortName']} car",
+                        'IRating': 1500 + (idx * 97) % 3000,
+                        'LicString': 'A 3.41',
+                        'IsSpectator': 0,
+                    }
+                    for idx in range(CAR_SLOTS)
+                ],
+            },
+        }
+        lines = ['---']
+        for key, section in sections.items():
+            lines.extend(_yaml_lines({key: section}, 0))
+            lines.append('')
+        lines.append('...')
+        return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+class IRSDK(_irsdk.IRSDK):
+    """
+    pyirsdk's IRSDK reading a simulated session instead of the sim's memory.
+
+    ``startup(test_file=...)`` still opens a recorded file like the real
+    class does, which the .ibt replay source relies on.
+    """
+
+    def __init__(self, *args: Any, session_num: int = SESSION_RACE, player_car_idx: int = 17,
+                 seed: int = 1, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.session = SimulatedSession(session_num, player_car_idx, seed)
+        self._memory: Optional[bytearray] = None
+        self._var_layout: List[Tuple[str, struct.Struct, int, int]] = []
+        self._buf_offsets: List[int] = []
+        self._write_index = 0
+        # Simulate a tick on every freeze like the live sim, benchmarks that
+        # time the freeze call itself advance with advance() instead
+        self.auto_advance = True
+
+    def startup(self, test_file: Optional[str] = None, dump_to: Optional[str] = None) -> bool:
+        if test_file is not None:
+            return super().startup(test_file=test_file, dump_to=dump_to)
+        if self._memory is None:
+            self._build_memory()
+        self._shared_mem = self._memory
+        self._header = _irsdk.Header(self._shared_mem)
+        self.is_initialized = True
+        return True
+
+    def shutdown(self) -> None:
+        # pyirsdk closes the mmap it opened, there is none here
+        self._shared_mem = None
+        super().shutdown()
+
+    def _build_memory(self) -> None:
+        """Lay out the header, var headers, SessionInfo and var buffers."""
+        session_info = self.session.session_info_yaml()
+        var_header_offset = HEADER_SIZE
+        session_info_offset = var_header_offset + len(VARIABLES) * VAR_HEADER_SIZE
+        # The sim reserves room for the SessionInfo to grow
+        session_info_size = (len(session_info) // 4096 + 2) * 4096
+
+        buf_len, layout = 0, []
+        for name, var_type, count, _unit, _desc in VARIABLES:
+            code = _TYPE_CODES[var_type]
+            layout.append((name, var_type, count, buf_len))
+            buf_len += struct.calcsize(code) * count
+        buf_len = (buf_len + 15) // 16 * 16
+
+        first_buf = session_info_offset + session_info_size
+        self._buf_offsets = [first_buf + i * buf_len for i in range(NUM_BUF)]
+        memory = bytearray(first_buf + NUM_BUF * buf_len)
+
+        struct.pack_into('<10i', memory, 0, 2, _irsdk.StatusField.status_connected, TICK_RATE, 1,
+                         len(session_info), session_info_offset, len(VARIABLES), var_header_offset,
+                         NUM_BUF, buf_len)
+        for i, buf_offset in enumerate(self._buf_offsets):
+            struct.pack_into('<3i', memory, 48 + i * 16, 0, buf_offset, 0)
+
+        self._var_layout = []
+        for i, ((name, var_type, count, offset), variable) in enumerate(zip(layout, VARIABLES)):
+            struct.pack_into('<3i?3x32s64s32s', memory, var_header_offset + i * VAR_HEADER_SIZE,
+                             var_type, offset, count, False, name.encode(), variable[4].encode(),
+                             variable[3].encode())
+            fmt = struct.Struct('<' + _TYPE_CODES[var_type] * count)
+            self._var_layout.append((name, fmt, offset, count))
+
+        memory[session_info_offset:session_info_offset + len(session_info)] = session_info
+        self._memory = memory
+        self._write_frame()
+
+    def _write_frame(self) -> None:
+        """Write the current tick into the next var buffer, then publish its tick count."""
+        values = self.session.values()
+        index = self._write_index
+        buf_offset = self._buf_offsets[index]
+        struct.pack_into('<i', self._memory, 48 + index * 16 + 8, self.session.tick)
+        for name, fmt, offset, count in self._var_layout:
+            value = values[name]
+            if count == 1:
+                fmt.pack_into(self._memory, buf_offset + offset, value)
+            else:
+                fmt.pack_into(self._memory, buf_offset + offset, *value)
+        struct.pack_into('<i', self._memory, 48 + index * 16, self.session.tick)
+        struct.pack_into('<i', self._memory, 40, self.session.tick)
+        self._write_index = (index + 1) % NUM_BUF
+
+    def advance(self) -> None:
+        """Simulate one tick."""
+        self.session.advance()
+        self._write_frame()
+
+    def freeze_var_buffer_latest(self) -> None:
+        # The live call blocks until the sim wrote the next tick
+        if self._memory is not None and self.auto_advance:
+            self.advance()
+        super().freeze_var_buffer_latest()
+
+    def set_session_num(self, session_num: int) -> None:
+        """Switch to another session of the SessionInfo."""
+        self.session.session_num = session_num
+
+
+def install() -> None:
+    """Make ``import irsdk`` return this module."""
+    module = sys.modules[__name__]
+    for name in dir(_irsdk):
+        if not name.startswith('__') and not hasattr(module, name):
+            setattr(module, name, getattr(_irsdk, name))
+    sys.modules['irsdk'] = module
@@ -21,7 +21,10 @@ def check_requirements():
         "flask_socketio": "5.4.1",
         "eventlet": "0.37.0",
         "pywebview": "4.4.1",
-        "dnspython": "2.4.2"
+        "dnspython": "2.4.2",
+        "numpy": "1.26.4",
+        "uvicorn": "0.30.6",
+        "asgiref": "3.8.1"
     }
     
     for package, version in required_packages.items():
@@ -143,6 +143,21 @@ hidden_imports = [
     'eventlet.green.time',
     '_thread',
     'queue',
+    # asyncio server mode (RAH_SERVER_MODE=asyncio), uvicorn loads its
+    # protocols by name
+    'asgi_server',
+    'asgiref.wsgi',
+    'engineio.async_drivers.asgi',
+    'uvicorn',
+    'uvicorn.logging',
+    'uvicorn.loops.auto',
+    'uvicorn.loops.asyncio',
+    'uvicorn.protocols.http.auto',
+    'uvicorn.protocols.http.h11_impl',
+    'uvicorn.protocols.websockets.auto',
+    'uvicorn.protocols.websockets.wsproto_impl',
+    'uvicorn.protocols.websockets.websockets_impl',
+    'uvicorn.lifespan.on',
 ]
 
 # Windows-specific additional hidden imports
@@ -9,8 +9,20 @@ if platform.system() == 'Windows':
     # Force using threading mode for reliability
     os.environ['FORCE_THREADING_MODE'] = 'true'
 
-from web_interface import WebInterface, using_fallback_mode
-from overlay_window import OverlayWindow
+if __name__ == '__main__':
+    # Pick the server mode and apply the eventlet monkey patch before threading,
+    # multiprocessing or signal are imported. Spawned children import this
+    # module as __mp_main__ and leave it to web_interface, so window
+    # processes stay unpatched.
+    import server_mode
+
+import startup_profile
+startup_profile.install()
+
+# web_interface and overlay_window are imported where they are used. Spawned
+# child processes import this module again and each loads only its own part:
+# the web server skips webview, a window process skips Flask and numpy.
+from overlay_registry import get_overlay_registry
 import multiprocessing
 import atexit
 import signal
@@ -35,8 +47,7 @@ def detect_overlays():
     """
     Detect available overlays in the overlays directory.
     """
-    overlays_dir = resource_path('overlays')
-    return [name for name in os.listdir(overlays_dir) if os.path.isdir(os.path.join(overlays_dir, name))]
+    return get_overlay_registry().folder_names()
 
 def cleanup():
     """
@@ -44,6 +55,12 @@ def cleanup():
     """
     print("Cleaning up resources...")
     
+    try:
+        # Overlay positions are written back in the background
+        get_overlay_registry().flush()
+    except Exception as e:
+        print(f"Error saving overlay properties: {e}")
+    
     try:
         from interface import opened_overlays
         print(f"Found {len(opened_overlays)} active overlay windows to close")
@@ -81,6 +98,7 @@ def signal_handler(sig, frame):
 def create_main_window_thread(exit_flag):
     """Create the main window in a thread instead of a process on Windows"""
     try:
+        from overlay_window import OverlayWindow
         interface = OverlayWindow('http://127.0.0.1:8085/', width=1000, height=700, frameless=False)
         
         def on_window_closed():
@@ -97,6 +115,7 @@ def create_main_window(exit_flag):
     Create the main window in a separate process
     """
     try:
+        from overlay_window import OverlayWindow
         interface = OverlayWindow('http://127.0.0.1:8085/', width=1000, height=700, frameless=False)
         
         def on_window_closed():
@@ -113,6 +132,7 @@ def run_web_interface(selected_overlays):
     Run the web interface in a separate process
     """
     try:
+        from web_interface import WebInterface
         web_interface = WebInterface(selected_overlays)
         web_interface.run()
     except Exception as e:
@@ -124,6 +144,8 @@ def run_unified_app(selected_overlays):
     This is used when we're in fallback mode to ensure pywebview runs in the main thread
     """
     try:
+        from web_interface import WebInterface
+        from overlay_window import OverlayWindow
         web_interface = WebInterface(selected_overlays)
         
         web_thread = threading.Thread(target=lambda: web_interface.run())
@@ -154,6 +176,9 @@ def main():
     signal.signal(signal.SIGTERM, signal_handler) 
     
     try:
+        # Read without importing web_interface (Flask, Socket.IO, numpy)
+        from server_mode import using_fallback_mode
+
         selected_overlays = detect_overlays()
         frozen_on_windows = platform.system() == 'Windows' and getattr(sys, 'frozen', False)
         
@@ -0,0 +1,220 @@
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+from urllib.parse import parse_qs
+
+import socketio
+from asgiref.wsgi import WsgiToAsgi
+
+from telemetry_channel import ENCODING_FULL, TelemetryChannel
+from telemetry_history import TelemetryHistory
+
+# Emits waiting for the producer coroutine before the oldest frames are
+# dropped. A delta client that misses a message asks for a keyframe.
+MAX_PENDING_EMITS = 256
+
+# Emits waiting for the producer above which the channels skip whole frames,
+# about two frames of every encoding
+BACKLOG_EMITS = 6
+
+
+class AsyncSocketIO:
+    """
+    python-socketio's AsyncServer served as an ASGI app by uvicorn, with the
+    Flask app mounted for every path that is not Socket.IO.
+
+    It stands in for Flask-SocketIO's SocketIO wherever the web interface
+    and its channels use it. ``emit`` and ``server.enter_room`` can be
+    called from any thread: they are queued and run in order by the
+    telemetry producer coroutine on the event loop. The telemetry thread
+    acquires and encodes frames and never waits for a client; when the
+    producer falls behind, ``is_backlogged`` lets the channels skip whole
+    frames. The loop needs no monkey patching.
+    """
+
+    async_mode = 'asyncio'
+
+    def __init__(self, flask_app: Any, **server_kwargs: Any) -> None:
+        """
+        Initialize the server.
+
+        Args:
+            flask_app: WSGI app serving the pages, static files and JSON routes
+            server_kwargs: Options of socketio.AsyncServer
+        """
+        self.sio = socketio.AsyncServer(async_mode='asgi', **server_kwargs)
+        self.asgi_app = socketio.ASGIApp(self.sio, other_asgi_app=WsgiToAsgi(flask_app))
+        # Channels enter rooms through socketio.server, like with Flask-SocketIO
+        self.server = self
+        self._pending: Deque[Tuple[bool, Callable[[], Awaitable[Any]]]] = deque()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._waiting = False
+        self._uvicorn: Optional[Any] = None
+        self.emits_dropped = 0
+
+    @property
+    def pending_count(self) -> int:
+        """Number of emits waiting for the producer coroutine."""
+        return len(self._pending)
+
+    def is_backlogged(self) -> bool:
+        """
+        Check whether the producer is behind the telemetry thread.
+
+        Returns:
+            bool: True while at least BACKLOG_EMITS emits are waiting
+        """
+        return len(self._pending) >= BACKLOG_EMITS
+
+    def on_namespace(self, namespace: socketio.AsyncNamespace) -> None:
+        """Register a namespace handler."""
+        self.sio.register_namespace(namespace)
+
+    def emit(self, event: str, data: Any = None, namespace: Optional[str] = None, to: Optional[str] = None) -> None:
+        """
+        Queue an event for a room or client, a tuple sends several arguments.
+
+        Args:
+            event: Event name
+            data: Event data
+            namespace: Namespace of the recipients
+            to: Room or session id, None for everyone
+        """
+        self._put(lambda: self.sio.emit(event, data, to=to, namespace=namespace), droppable=True)
+
+    def enter_room(self, sid: str, room: str, namespace: Optional[str] = None) -> None:
+        """
+        Queue adding a client to a room, ahead of any emit queued after it.
+
+        Args:
+            sid: Session id
+            room: Room name
+            namespace: Namespace of the client
+        """
+        self._put(lambda: self.sio.enter_room(sid, room, namespace=namespace), droppable=False)
+
+    def _put(self, call: Callable[[], Awaitable[Any]], droppable: bool) -> None:
+        """Queue a call for the producer and wake it if it sleeps."""
+        with self._lock:
+            if len(self._pending) >= MAX_PENDING_EMITS:
+                for index, (can_drop, _) in enumerate(self._pending):
+                    if can_drop:
+                        del self._pending[index]
+                        self.emits_dropped += 1
+                        break
+            self._pending.append((droppable, call))
+            wake = self._waiting
+            self._waiting = False
+        if wake:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _produce(self) -> None:
+        """Telemetry producer: run the queued emits in order as they come in."""
+        while True:
+            with self._lock:
+                call = self._pending.popleft()[1] if self._pending else None
+                self._waiting = call is None
+            if call is None:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+            try:
+                await call()
+            except Exception as e:
+                logging.error(f"Error emitting telemetry: {e}")
+
+    def run(self, host: str, port: int) -> None:
+        """
+        Serve until stop() is called, blocks the calling thread.
+
+        Args:
+            host: The hostname to listen on
+            port: The port of the webserver
+        """
+        asyncio.run(self._serve(host, port))
+
+    async def _serve(self, host: str, port: int) -> None:
+        import uvicorn
+
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        producer = asyncio.create_task(self._produce())
+        self._uvicorn = uvicorn.Server(uvicorn.Config(self.asgi_app, host=host, port=port, log_level='warning'))
+        logging.info(f"Starting SocketIO server with asyncio mode on {host}:{port}...")
+        try:
+            await self._uvicorn.serve()
+        finally:
+            producer.cancel()
+
+    def stop(self) -> None:
+        """Ask the server to shut down."""
+        if self._uvicorn is not None:
+            self._uvicorn.should_exit = True
+
+
+class AsyncChannelNamespace(socketio.AsyncNamespace):
+    """
+    AsyncServer namespace whose clients are served by a TelemetryChannel, the
+    asyncio mode counterpart of ChannelNamespace.
+    """
+
+    def __init__(self, namespace: str, channel: TelemetryChannel) -> None:
+        """
+        Initialize the namespace.
+
+        Args:
+            namespace: Namespace path, e.g. '/input_telemetry'
+            channel: Channel that emits to this namespace
+        """
+        super().__init__(namespace)
+        self.channel = channel
+
+    async def on_connect(self, sid: str, environ: Dict[str, Any], auth: Optional[Dict[str, Any]] = None) -> None:
+        """Register the client with the encoding it asked for."""
+        query = parse_qs(environ.get('QUERY_STRING', ''))
+        encoding = (query.get('encoding') or [''])[0] or (auth or {}).get('encoding') or ENCODING_FULL
+        encoding = self.channel.add_client(sid, encoding)
+        logging.info(f"Client {sid} connected to {self.namespace} ({encoding})")
+
+    async def on_disconnect(self, sid: str, reason: Optional[str] = None) -> None:
+        """Forget the client."""
+        self.channel.remove_client(sid)
+        logging.info(f"Client {sid} disconnected from {self.namespace}")
+
+    async def on_request_keyframe(self, sid: str) -> None:
+        """Resend the state (delta) or schema (binary) to a client that lost track."""
+        self.channel.send_keyframe(sid)
+
+    async def on_latency_echo(self, sid: str, echo: Dict[str, Any]) -> None:
+        """Record the receipt and render times a client echoed for a probe frame."""
+        self.channel.record_latency_echo(sid, echo)
+
+
+class AsyncTelemetryNamespace(AsyncChannelNamespace):
+    """AsyncServer namespace for telemetry data."""
+
+    def __init__(self, namespace: str, channel: TelemetryChannel, history: Optional[TelemetryHistory] = None,
+                 backfill_seconds: float = 0.0) -> None:
+        """
+        Initialize the namespace.
+
+        Args:
+            namespace: Namespace path, e.g. '/input_telemetry'
+            channel: Channel that emits to this namespace
+            history: Recent driver inputs sent to clients when they connect
+            backfill_seconds: Seconds of history sent to a new client
+        """
+        super().__init__(namespace, channel)
+        self.history = history
+        self.backfill_seconds = backfill_seconds
+
+    async def on_connect(self, sid: str, environ: Dict[str, Any], auth: Optional[Dict[str, Any]] = None) -> None:
+        """Register the client and backfill its input graph."""
+        await super().on_connect(sid, environ, auth)
+        if self.history is not None and self.history.count:
+            backfill = self.history.to_message(seconds=self.backfill_seconds, binary=True)
+            await self.emit('telemetry_history', backfill, room=sid)
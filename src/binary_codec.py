@@ -0,0 +1,112 @@
+import struct
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+# Python value type -> (struct code, schema type name) of a packed field
+FIELD_TYPES = {
+    int: ('h', 'int16'),
+    float: ('f', 'float32'),
+}
+
+# Every record starts with the id of the schema it was packed with
+RECORD_HEADER = '<H'
+
+
+class PackedSchema:
+    """
+    Fixed record layout for one set of payload keys.
+
+    Integer values are packed as int16 and everything else as float32, in
+    payload order, after a uint16 schema id. All values are little-endian.
+    """
+
+    def __init__(self, schema_id: int, payload: Dict[str, Any]) -> None:
+        """
+        Build the layout from a sample payload.
+
+        Args:
+            schema_id: Id written at the start of every record
+            payload: Payload whose keys and value types define the layout
+        """
+        self.id = schema_id
+        self.keys = tuple(payload)
+        self.fields: List[Tuple[str, str, int]] = []
+
+        fmt = [RECORD_HEADER]
+        offset = struct.calcsize(RECORD_HEADER)
+        for key, value in payload.items():
+            code, type_name = FIELD_TYPES[int] if isinstance(value, int) else FIELD_TYPES[float]
+            self.fields.append((key, type_name, offset))
+            fmt.append(code)
+            offset += struct.calcsize(code)
+        self.struct = struct.Struct(''.join(fmt))
+
+    def to_message(self) -> Dict[str, Any]:
+        """
+        Describe the layout for the client.
+
+        Returns:
+            Dict[str, Any]: Schema id, record size and field list
+        """
+        return {
+            'id': self.id,
+            'size': self.struct.size,
+            'fields': [{'name': name, 'type': type_name, 'offset': offset}
+                       for name, type_name, offset in self.fields],
+        }
+
+
+class BinaryEncoder:
+    """
+    Packs numeric payloads into fixed-layout binary records.
+
+    The schema is negotiated instead of repeated: it is built from the first
+    payload, sent to clients once, and only replaced (with a new id) when the
+    set of keys changes, e.g. when switching between race and practice
+    metrics.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the encoder without a schema."""
+        self._lock = threading.Lock()
+        self.schema: Optional[PackedSchema] = None
+        self._next_id = 1
+
+    def encode(self, payload: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[bytes]]:
+        """
+        Pack one payload.
+
+        Args:
+            payload: Payload of int and float values
+
+        Returns:
+            Tuple[Optional[Dict[str, Any]], Optional[bytes]]: The new schema
+                message if the layout changed (None otherwise) and the packed
+                record, None if the payload could not be packed
+        """
+        with self._lock:
+            schema_message = None
+            schema = self.schema
+            if schema is None or tuple(payload) != schema.keys:
+                schema = PackedSchema(self._next_id, payload)
+                self._next_id = self._next_id % 0xFFFF + 1
+                self.schema = schema
+                schema_message = schema.to_message()
+
+            try:
+                record = schema.struct.pack(schema.id, *payload.values())
+            except struct.error as e:
+                logging.error(f"Cannot pack telemetry payload: {e}")
+                record = None
+            return schema_message, record
+
+    def schema_message(self) -> Optional[Dict[str, Any]]:
+        """
+        Return the current schema for a client that just joined.
+
+        Returns:
+            Optional[Dict[str, Any]]: The schema message, None before the first payload
+        """
+        with self._lock:
+            return self.schema.to_message() if self.schema else None
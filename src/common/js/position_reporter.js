@@ -29,24 +29,33 @@ function initPositionReporter(folderName) {
     createSaveButton(folderName);
     createPositionDisplay();
     
-    setInterval(function() {
-        try {
-            if (window.pywebview && window.pywebview.position) {
-                currentX = window.pywebview.position.x;
-                currentY = window.pywebview.position.y;
-                updatePositionDisplay(currentX, currentY, dpiScale);
-            } else {
-                currentX = window.screenX || window.screenLeft || 0;
-                currentY = window.screenY || window.screenTop || 0;
-                
-                currentX = Math.round(currentX * dpiScale);
-                currentY = Math.round(currentY * dpiScale);
-                updatePositionDisplay(currentX, currentY, dpiScale);
-            }
-        } catch (e) {
-            console.error("Error getting position:", e);
+    // Read the position once, the window calls updatePositionDisplay
+    // whenever it moves
+    try {
+        if (window.pywebview && window.pywebview.dpiScale) {
+            dpiScale = window.pywebview.dpiScale;
+        }
+        if (window.pywebview && window.pywebview.position) {
+            currentX = window.pywebview.position.x;
+            currentY = window.pywebview.position.y;
+        } else {
+            currentX = Math.round((window.screenX || window.screenLeft || 0) * dpiScale);
+            currentY = Math.round((window.screenY || window.screenTop || 0) * dpiScale);
         }
-    }, 1000);
+        updatePositionDisplay(currentX, currentY, dpiScale);
+    } catch (e) {
+        console.error("Error getting position:", e);
+    }
+}
+
+/**
+ * Remove the save button and position display
+ */
+function stopPositionReporter() {
+    ['position-save-button', 'position-display'].forEach(function(id) {
+        const element = document.getElementById(id);
+        if (element) element.remove();
+    });
 }
 
 /**
@@ -157,9 +166,13 @@ function createSaveButton(folderName) {
         .then(data => {
             if (data.status === 'success') {
                 updateSaveBtnState('success', x, y);
-                setTimeout(function() {
-                    window.close();
-                }, 1000);
+                // A window switched in place stays open, the app leaves
+                // positioning mode itself
+                if (!data.in_place) {
+                    setTimeout(function() {
+                        window.close();
+                    }, 1000);
+                }
             } else {
                 throw new Error(data.message || 'Unknown error');
             }
@@ -63,6 +63,9 @@ function addPulseAnimation() {
     const style = document.createElement('style');
     style.id = 'positioning-pulse-style';
     style.textContent = `
+        body {
+            background-color: rgba(0, 0, 0, 0.35);
+        }
         .telemetry-container {
             animation: telemetry_pulse 2s infinite;
         }
@@ -73,4 +76,39 @@ function addPulseAnimation() {
         }
     `;
     document.head.appendChild(style);
-} 
\ No newline at end of file
+}
+
+/**
+ * Remove everything initPositioningMode added
+ */
+function exitPositioningMode() {
+    const overlayContainer = document.querySelector('.telemetry-container');
+    if (overlayContainer) {
+        overlayContainer.style.border = '';
+    }
+    
+    ['positioning-mode-indicator', 'positioning-pulse-style'].forEach(function(id) {
+        const element = document.getElementById(id);
+        if (element) element.remove();
+    });
+}
+
+/**
+ * Switch the page between positioning mode and the plain overlay.
+ * Called by the window when it toggles in place instead of being recreated.
+ * @param {boolean} enabled - True for positioning mode
+ * @param {string} folderName - The folder name for position saving
+ */
+function setPositioningMode(enabled, folderName) {
+    if (enabled) {
+        initPositioningMode();
+        if (typeof initPositionReporter === 'function') {
+            initPositionReporter(folderName);
+        }
+    } else {
+        exitPositioningMode();
+        if (typeof stopPositionReporter === 'function') {
+            stopPositionReporter();
+        }
+    }
+}
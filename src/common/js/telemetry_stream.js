@@ -0,0 +1,150 @@
+/**
+ * Telemetry Stream decoder for iRacing Telemetry Overlay
+ * 
+ * Rebuilds full payloads from the keyframe + delta messages the server sends
+ * to clients that connect with the `encoding: 'delta'` query parameter, or
+ * from the packed records sent with `encoding: 'binary'`.
+ *
+ * Every frame comes with a [tick, frameTime] stamp as its second argument.
+ * Probe frames add the server's emit time, the overlay echoes those back
+ * once the frame is on screen so the server can measure the sim-to-screen
+ * latency.
+ */
+
+/**
+ * Echo a latency probe back to the server after the frame it came with was painted
+ * @param {Object} socket - Socket.IO socket the frame arrived on
+ * @param {Array} stamp - Second argument of the frame event, only probes are echoed
+ * @param {number} received - performance.now() when the frame arrived
+ */
+function echoLatencyProbe(socket, stamp, received) {
+    if (!Array.isArray(stamp) || stamp.length < 3) return;
+
+    const micros = (ms) => Math.round(ms * 1000);
+    // The next paint follows the next animation frame callback, a task
+    // queued from that callback runs after the paint
+    requestAnimationFrame(function() {
+        setTimeout(function() {
+            const rendered = performance.now();
+            socket.emit('latency_echo', {
+                tick: stamp[0],
+                frame: stamp[1],
+                emit: stamp[2],
+                received: micros(received),
+                rendered: micros(rendered),
+                echoed: micros(performance.now())
+            });
+        }, 0);
+    });
+}
+
+/**
+ * Subscribe to a delta-encoded event and receive full payloads
+ * @param {Object} socket - Socket.IO socket connected with encoding=delta
+ * @param {string} event - Name of the full payload event, e.g. 'telemetry_update'
+ * @param {function} onUpdate - Called with the rebuilt payload and the frame's sim
+ *     tick (null without a stamp) after every message. Frames whose fields did not
+ *     change are not sent, so ticks can be skipped.
+ */
+function subscribeDeltaStream(socket, event, onUpdate) {
+    let state = null;
+    let lastSeq = 0;
+    let waitingForKeyframe = true;
+
+    function resync() {
+        waitingForKeyframe = true;
+        socket.emit('request_keyframe');
+    }
+
+    socket.on(event + '_delta', function(message, stamp) {
+        const received = performance.now();
+        if (!message || typeof message !== 'object' || !message.data) {
+            console.error('Invalid delta message received:', message);
+            return;
+        }
+
+        if (message.key) {
+            state = Object.assign({}, message.data);
+            lastSeq = message.seq;
+            waitingForKeyframe = false;
+        } else {
+            // Deltas sent before our keyframe are already part of it
+            if (waitingForKeyframe || message.seq <= lastSeq) return;
+
+            if (message.seq !== lastSeq + 1) {
+                console.warn(`Missed delta ${lastSeq + 1}, requesting keyframe`);
+                resync();
+                return;
+            }
+
+            Object.assign(state, message.data);
+            lastSeq = message.seq;
+        }
+
+        onUpdate(state, Array.isArray(stamp) ? stamp[0] : null);
+        echoLatencyProbe(socket, stamp, received);
+    });
+
+    socket.on('disconnect', function() {
+        state = null;
+        lastSeq = 0;
+        waitingForKeyframe = true;
+    });
+}
+
+/**
+ * Subscribe to a binary packed event and receive full payloads
+ * @param {Object} socket - Socket.IO socket connected with encoding=binary
+ * @param {string} event - Name of the full payload event, e.g. 'telemetry_update'
+ * @param {function} onUpdate - Called with the unpacked payload and the frame's sim
+ *     tick (null without a stamp) after every record
+ */
+function subscribeBinaryStream(socket, event, onUpdate) {
+    const readers = {
+        float32: (view, offset) => view.getFloat32(offset, true),
+        int16: (view, offset) => view.getInt16(offset, true)
+    };
+    let schema = null;
+    let fields = [];
+    let waitingForSchema = false;
+
+    socket.on(event + '_schema', function(message) {
+        if (!message || !Array.isArray(message.fields)) {
+            console.error('Invalid schema received:', message);
+            return;
+        }
+
+        schema = message;
+        fields = message.fields.map(field => [field.name, readers[field.type], field.offset]);
+        waitingForSchema = false;
+    });
+
+    socket.on(event + '_binary', function(record, stamp) {
+        const received = performance.now();
+        const view = new DataView(record instanceof ArrayBuffer ? record : record.buffer,
+                                  record.byteOffset || 0, record.byteLength);
+        const schemaId = view.getUint16(0, true);
+
+        if (!schema || schema.id !== schemaId || view.byteLength < schema.size) {
+            // Records packed with a schema we do not have yet cannot be read
+            if (!waitingForSchema) {
+                waitingForSchema = true;
+                socket.emit('request_keyframe');
+            }
+            return;
+        }
+
+        const data = {};
+        for (const [name, read, offset] of fields) {
+            data[name] = read(view, offset);
+        }
+        onUpdate(data, Array.isArray(stamp) ? stamp[0] : null);
+        echoLatencyProbe(socket, stamp, received);
+    });
+
+    socket.on('disconnect', function() {
+        schema = null;
+        fields = [];
+        waitingForSchema = false;
+    });
+}
@@ -1,24 +1,67 @@
-import irsdk
 import os
+import time
 import logging
-import yaml
 from typing import Dict, List, Optional, Union, Any
 
+import numpy as np
+
+from field_plan import FieldPlan, read_frame
+from lap_history import LapHistory
+from session_info import SessionInfoCache
+from telemetry_metrics import get_telemetry_metrics
+from telemetry_source import TelemetrySource, create_telemetry_source
+
+# Variables decoded on every frame, see FieldPlan. The metric variables are
+# only decoded when the overlay metrics are requested.
+INPUT_SCALARS = ('Speed', 'Gear', 'Throttle', 'Brake', 'Clutch', 'SteeringWheelAngle')
+LAP_SCALARS = ('SessionNum', 'LapCompleted', 'LapLastLapTime', 'LapCurrentLapTime', 'LapDistPct',
+               'FuelLevel', 'OnPitRoad')
+METRIC_SCALARS = ('PlayerCarIdx', 'LapLastLapTime', 'SessionNum', 'SessionLapsRemain', 'SessionTimeRemain')
+BASE_SCALARS = tuple(dict.fromkeys(INPUT_SCALARS + LAP_SCALARS))
+FRAME_SCALARS = tuple(dict.fromkeys(BASE_SCALARS + METRIC_SCALARS))
+FRAME_ARRAYS = ('CarIdxEstTime', 'CarIdxBestLapTime', 'CarIdxLastLapTime')
+# Variables read by poll_laps() while no overlay is open, enough to store
+# lap times without following the sectors
+IDLE_LAP_SCALARS = ('SessionNum', 'LapCompleted', 'LapLastLapTime', 'LapCurrentLapTime', 'FuelLevel', 'OnPitRoad')
+
+# Keys of the driver input part of get_telemetry_data()
+INPUT_KEYS = ('speed', 'gear', 'throttle', 'brake', 'clutch', 'steering_wheel_angle')
+
+
 class DataProvider:
     """
     Provides telemetry data from iRacing.
     
     This class manages the connection to the iRacing SDK and handles
-    retrieval of telemetry data and lap times for overlays.
+    retrieval of telemetry data and lap times for overlays. The SDK is
+    reached through a TelemetrySource, so a recorded .ibt file can stand
+    in for the live sim.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, source: Optional[TelemetrySource] = None) -> None:
         """
         Initialize the DataProvider with default values.
+
+        Args:
+            source: Telemetry source to read from, defaults to the one
+                selected by the environment (live iRacing unless a replay
+                file is configured)
         """
-        self.ir_sdk = irsdk.IRSDK()
+        self.ir_sdk = source if source is not None else create_telemetry_source()
         self.is_connected = False
-        self.lap_times: List[float] = []
+        self.frame_tick: Optional[int] = None
+        self.session_info = SessionInfoCache()
+        self.frame: Dict[str, Any] = {}
+        self._field_plans: Dict[bool, Optional[FieldPlan]] = {}
+        self._plan_headers: Optional[Any] = None
+        self.laps = LapHistory()
+        self.metrics = get_telemetry_metrics()
+        # perf_counter_ns() when the last frame started decoding and was
+        # decoded (0 if it failed), the first marks of the frame the caller
+        # records into the metrics
+        self.frame_started_ns = 0
+        self.frame_decoded_ns = 0
+        self._connected_before = False
         logging.debug(f"DataProvider initialized. Current working directory: {os.getcwd()}")
 
     def connect(self) -> bool:
@@ -31,6 +74,9 @@ class DataProvider:
         if not self.is_connected:
             self.is_connected = self.ir_sdk.startup()
             if self.is_connected:
+                if self._connected_before:
+                    self.metrics.reconnects += 1
+                self._connected_before = True
                 logging.info("Connected to iRacing")
             else:
                 logging.warning("Failed to connect to iRacing")
@@ -43,12 +89,51 @@ class DataProvider:
         if self.is_connected:
             self.ir_sdk.shutdown()
             self.is_connected = False
+            self.frame_tick = None
+            self.session_info.clear()
+            self.frame = {}
+            self._field_plans = {}
+            self._plan_headers = None
+            # The laps are kept, only the one in progress is incomplete now
+            self.laps.interrupt()
             logging.info("Disconnected from iRacing")
 
-    def get_telemetry_data(self) -> Dict[str, Union[float, int]]:
+    def acquire_frame(self) -> bool:
+        """
+        Freeze the latest frame and report whether the sim tick moved.
+
+        With a data-ready event this blocks until iRacing publishes the next
+        tick. Sources that cannot report a tick always count as new.
+
+        Returns:
+            bool: True if the frozen frame has not been seen before
+        """
+        if not self.is_connected:
+            return False
+
+        try:
+            self.ir_sdk.freeze_var_buffer_latest()
+        except Exception as e:
+            self.metrics.count_error(e)
+            logging.error(f"Error freezing telemetry buffer: {e}")
+            return False
+
+        tick = self.ir_sdk.tick_count
+        if tick is not None and tick == self.frame_tick:
+            return False
+        self.frame_tick = tick
+        return True
+
+    def get_telemetry_data(self, freeze: bool = True, metrics: bool = True) -> Dict[str, Union[float, int]]:
         """
         Retrieve telemetry data from iRacing.
         
+        Args:
+            freeze: Freeze the latest frame first, pass False when the frame
+                was already acquired with acquire_frame()
+            metrics: Also compute the overlay metrics (front lap times, lap
+                delta, target pace), False to return the driver inputs only
+
         Returns:
             Dict[str, Union[float, int]]: Dictionary containing telemetry values
                 or empty dict if not connected or error occurs
@@ -58,16 +143,54 @@ class DataProvider:
             return {}
             
         try:
-            self.ir_sdk.freeze_var_buffer_latest()
-            return self._extract_data()
+            if freeze:
+                self.ir_sdk.freeze_var_buffer_latest()
+            self.frame_started_ns = time.perf_counter_ns()
+            self.frame = self._read_frame(metrics)
+            self.frame_decoded_ns = time.perf_counter_ns()
+            self._update_laps()
+            return self._extract_data(metrics)
         except (TypeError, ValueError, KeyError) as e:
+            self.metrics.count_error(e)
+            self.frame_decoded_ns = 0
             logging.error(f"Error processing telemetry data: {e}")
             return self._get_default_telemetry()
         except Exception as e:
+            self.metrics.count_error(e)
+            self.frame_decoded_ns = 0
             logging.error(f"Unexpected error in get_telemetry_data: {e}")
             return {}
     
-    def _extract_data(self) -> Dict[str, float | int]:
+    def _read_frame(self, metrics: bool = True) -> Dict[str, Any]:
+        """
+        Decode every hot variable of the frozen frame in one pass.
+
+        The FieldPlans are compiled again only when the source reports a new
+        var header layout (after a reconnect). Sources without a raw buffer
+        fall back to name-based reads.
+
+        Args:
+            metrics: Also decode the variables the overlay metrics need
+
+        Returns:
+            Dict[str, Any]: Frame values by variable name
+        """
+        scalars, arrays = (FRAME_SCALARS, FRAME_ARRAYS) if metrics else (BASE_SCALARS, ())
+
+        var_headers = self.ir_sdk.var_headers
+        if var_headers is not self._plan_headers:
+            self._plan_headers = var_headers
+            self._field_plans = {}
+        if metrics not in self._field_plans:
+            self._field_plans[metrics] = FieldPlan(var_headers, scalars, arrays) if var_headers else None
+
+        field_plan = self._field_plans[metrics]
+        if field_plan is not None:
+            buffer, offset = self.ir_sdk.frozen_buffer()
+            return field_plan.decode(buffer, offset)
+        return read_frame(self.ir_sdk, scalars, arrays)
+
+    def _extract_data(self, metrics: bool = True) -> Dict[str, float | int]:
         """
         Returns one dict that contains both the "live telemetry" numbers
         you were already broadcasting **and** the extra overlay metrics
@@ -75,17 +198,19 @@ class DataProvider:
 
         Keys that are *unused* for a particular session type are present
         with value 0.0, so the websocket payload is always predictable.
+        With ``metrics`` False only the live telemetry numbers are returned.
         """
 
-        speed_kmh = float(self.ir_sdk['Speed'] or 0.0) * 3.6
-        gear      = int(self.ir_sdk['Gear'] or 0)
-        throttle  = float(self.ir_sdk['Throttle'] or 0.0)
-        brake     = float(self.ir_sdk['Brake'] or 0.0)
+        frame = self.frame
+        speed_kmh = float(frame['Speed'] or 0.0) * 3.6
+        gear      = int(frame['Gear'] or 0)
+        throttle  = float(frame['Throttle'] or 0.0)
+        brake     = float(frame['Brake'] or 0.0)
 
-        clutch_raw = self.ir_sdk['Clutch']       
+        clutch_raw = frame['Clutch']       
         clutch     = 1.0 - float(clutch_raw) if clutch_raw is not None else 1.0
 
-        steering = float(self.ir_sdk['SteeringWheelAngle'] or 0.0)
+        steering = float(frame['SteeringWheelAngle'] or 0.0)
 
         base = {
             "speed": speed_kmh,
@@ -95,7 +220,9 @@ class DataProvider:
             "clutch": clutch,
             "steering_wheel_angle": steering,
         }
-        
+
+        if not metrics:
+            return base
         return {**base, **self._compute_overlay_metrics()}
 
     def _compute_overlay_metrics(self) -> Dict[str, float]:
@@ -105,11 +232,14 @@ class DataProvider:
         • lap_delta
         • target_pace  (race)   OR   best‑lap delta  (practice/qualy)
         Always returns the three fields so the client has a fixed schema.
+
+        Every CarIdx* array is scanned once in plain Python: with 64 car
+        slots that beats NumPy, whose per-call overhead dominates.
         """
 
-        me_idx  = int(self.ir_sdk['PlayerCarIdx'])
-        my_last = float(self.ir_sdk['LapLastLapTime']  or -1.0)
-        my_best = float(self.ir_sdk['CarIdxBestLapTime'][me_idx] or -1.0)
+        frame   = self.frame
+        me_idx  = int(frame['PlayerCarIdx'])
+        my_last = float(frame['LapLastLapTime']  or -1.0)
 
         if my_last <= 0.0:
             return self._default_front_data()   # we haven't set a lap yet
@@ -117,29 +247,26 @@ class DataProvider:
         session_type = self._current_session_type().lower()
 
         if session_type == 'race':
-            est = self.ir_sdk['CarIdxEstTime']
-            if not est:
+            est = self._car_values('CarIdxEstTime')
+            if est is None:
                 return self._default_front_data()
 
-            front_idx, gap_sec = None, None
-            for idx, g in enumerate(est):
-                if g and g > 0 and (gap_sec is None or g < gap_sec):
-                    front_idx, gap_sec = idx, g
-
+            front_idx = self._closest_car_ahead(est)
             if front_idx is None:
                 return self._default_front_data()
+            gap_sec = est[front_idx]
 
-            front_last = float(self.ir_sdk['CarIdxLastLapTime'][front_idx] or -1.0)
+            front_last = self._car_value('CarIdxLastLapTime', front_idx)
             if front_last <= 0.0:
                 return self._default_front_data()
 
             lap_delta = front_last - my_last
 
-            sess_laps_remain = int(self.ir_sdk['SessionLapsRemain'])
+            sess_laps_remain = int(frame['SessionLapsRemain'])
             if 0 < sess_laps_remain < 32000:
                 laps_left = max(sess_laps_remain, 1)
             else:
-                secs_left = float(self.ir_sdk['SessionTimeRemain'])
+                secs_left = float(frame['SessionTimeRemain'])
                 laps_left = max(int(secs_left / max(my_last, 1e-9)), 1)
 
             target_pace = my_last - (gap_sec / laps_left) * 1.10
@@ -151,23 +278,19 @@ class DataProvider:
                 "session_type":        session_type,
             }
 
-        best_array = self.ir_sdk['CarIdxBestLapTime']
-        if not best_array:
+        best_array = self._car_values('CarIdxBestLapTime')
+        if best_array is None or not 0 <= me_idx < len(best_array):
             return self._default_front_data()
 
-        standings = sorted(
-            [(idx, t) for idx, t in enumerate(best_array) if t and t > 0],
-            key=lambda x: x[1]
-        )
-
-        my_pos = next((i for i, (idx, _) in enumerate(standings) if idx == me_idx), None)
-        if my_pos is None or my_pos == 0:
-            return self._default_front_data()   
+        front_idx = self._car_ahead_on_best_lap(best_array, me_idx)
+        if front_idx is None:
+            return self._default_front_data()
 
-        front_idx, front_best = standings[my_pos - 1]
+        my_best = best_array[me_idx]
+        front_best = best_array[front_idx]
         best_delta = my_best - front_best
         
-        front_last = float(self.ir_sdk['CarIdxLastLapTime'][front_idx] or -1.0)
+        front_last = self._car_value('CarIdxLastLapTime', front_idx)
         lap_delta  = (front_last - my_last) if front_last > 0 else 0.0
 
         return {
@@ -177,30 +300,83 @@ class DataProvider:
             "session_type":        "practice",
         }
 
-    
+    def _car_values(self, name: str) -> Optional[List[float]]:
+        """
+        Read a CarIdx* array of the current frame as a list.
+
+        Args:
+            name: Name of the per-car variable
+
+        Returns:
+            Optional[List[float]]: The values, or None if the variable is missing or empty
+        """
+        values = self.frame.get(name)
+        if values is None:
+            return None
+        if isinstance(values, np.ndarray):
+            # Iterating Python floats is several times faster than NumPy scalars
+            values = values.tolist()
+        return values if len(values) else None
+
+    def _car_value(self, name: str, car_idx: int) -> float:
+        """
+        Read one car's entry of a CarIdx* array of the current frame.
+
+        Returns:
+            float: The value, or -1.0 if it is missing or zero
+        """
+        values = self.frame.get(name)
+        if values is None or not 0 <= car_idx < len(values):
+            return -1.0
+        return float(values[car_idx] or -1.0)
+
+    @staticmethod
+    def _closest_car_ahead(est: List[float]) -> Optional[int]:
+        """
+        Return the CarIdx with the smallest positive CarIdxEstTime.
+
+        Ties go to the lowest CarIdx.
+        """
+        front_idx, gap_sec = None, None
+        for idx, gap in enumerate(est):
+            if gap > 0.0 and (gap_sec is None or gap < gap_sec):
+                front_idx, gap_sec = idx, gap
+        return front_idx
+
+    @staticmethod
+    def _car_ahead_on_best_lap(best: List[float], me_idx: int) -> Optional[int]:
+        """
+        Return the CarIdx directly ahead of the player in best-lap standings.
+
+        Standings rank every car with a positive best lap by time, ties by
+        CarIdx. Returns None if the player has no time or leads.
+        """
+        my_best = best[me_idx]
+        if not my_best > 0.0:
+            return None
+
+        # The slowest car that ranks before us, in one pass instead of a sort
+        front_idx, front_best = None, None
+        for idx, lap in enumerate(best):
+            if lap > 0.0 and (lap < my_best or (lap == my_best and idx < me_idx)) \
+                    and (front_best is None or lap >= front_best):
+                front_idx, front_best = idx, lap
+        return front_idx
+
     def _current_session_type(self) -> str:
         """
         Return the current session type ('Race', 'Qualify', 'Practice', …).
 
-        Works whether irsdk delivers SessionInfo as:
-        • a YAML string  **or**
-        • an already‑parsed dict
+        The SessionInfo is only parsed again when iRacing bumps its
+        SessionInfoUpdate counter, so this is a dict lookup on most frames.
         """
         try:
-            sess_num = int(self.ir_sdk['SessionNum'])
-
-            raw = self.ir_sdk['SessionInfo']
-            # iRacing 2024.4+ may give us a dict already
-            if isinstance(raw, dict):
-                info = raw
-            else:
-                info = yaml.safe_load(raw or "") or {}
-
-            for sess in info.get('Sessions', []):
-                if int(sess.get('SessionNum', -1)) == sess_num:
-                    return str(sess.get('SessionType', 'Race'))
+            self.session_info.refresh(self.ir_sdk)
+            session_type = self.session_info.session_type(int(self.frame['SessionNum']))
+            if session_type:
+                return session_type
         except Exception as e:
-            logging.debug(f"Could not parse SessionInfo: {e}")
+            logging.debug(f"Could not read session type: {e}")
 
         # default so the overlay logic still works
         return 'Race'
@@ -227,45 +403,61 @@ class DataProvider:
     
     def get_lap_times(self) -> List[float]:
         """
-        Retrieve the last 10 lap times from iRacing.
-        
-        Updates internal lap times list and returns all stored times.
-        
+        Retrieve the lap times of the current session.
+
+        Laps are recorded by the telemetry loop, see LapHistory and poll_laps.
+
         Returns:
-            List[float]: List of up to 10 most recent lap times or empty list if not connected
+            List[float]: Time of every completed lap, oldest first, or an
+                empty list if not connected
         """
         if not self.is_connected:
             logging.debug("Not connected to iRacing")
             return []
-        
+        return self.laps.lap_times()
+
+    def get_lap_history(self, session_num: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Retrieve every lap and the lap statistics of a session.
+
+        Args:
+            session_num: SessionNum, None for the current session
+
+        Returns:
+            Dict[str, Any]: Laps (number, time, sector splits, fuel used,
+                valid flag) and best/average/stddev statistics
+        """
+        return self.laps.to_dict(session_num)
+
+    def poll_laps(self) -> None:
+        """
+        Feed the lap variables of the latest frame to the lap history.
+
+        Called about once per second while no overlay is open, so laps are
+        still recorded without reading the whole frame on every tick. The
+        lap times come from LapLastLapTime and stay exact, the sector splits
+        of those laps are not known.
+        """
+        if not self.is_connected:
+            return
         try:
-            self._update_lap_times()
-            return self.lap_times
-        except (TypeError, ValueError, KeyError) as e:
-            logging.error(f"Error processing lap times: {e}")
-            return self.lap_times
+            self.ir_sdk.freeze_var_buffer_latest()
+            self._update_laps(read_frame(self.ir_sdk, IDLE_LAP_SCALARS))
         except Exception as e:
-            logging.error(f"Unexpected error in get_lap_times: {e}")
-            return []
-    
-    def _update_lap_times(self) -> None:
+            self.metrics.count_error(e)
+            logging.error(f"Error polling lap variables: {e}")
+
+    def _update_laps(self, frame: Optional[Dict[str, Any]] = None) -> None:
         """
-        Update the stored lap times with new data from iRacing.
+        Feed a frame to the lap history, the frame just read by default.
+
+        Args:
+            frame: Values by variable name, see LapHistory.update
         """
-        current_lap = self.ir_sdk['Lap']
-        
-        if not isinstance(current_lap, (int, float)) or current_lap is None:
-            return
-        
-        current_lap = int(current_lap)
-        lap_time = self.ir_sdk['LapCurrentLapTime']
-        
-        if not isinstance(lap_time, (int, float)) or lap_time is None:
-            lap_time = 0.0
-        
-        lap_time = float(lap_time)
-        
-        if current_lap > len(self.lap_times):
-            self.lap_times.append(lap_time)
-            if len(self.lap_times) > 10:
-                self.lap_times.pop(0)
\ No newline at end of file
+        try:
+            self.session_info.refresh(self.ir_sdk)
+            self.laps.set_event(self.session_info.event_id)
+            self.laps.update(self.frame if frame is None else frame, self.session_info.sector_starts)
+        except (TypeError, ValueError, KeyError) as e:
+            self.metrics.count_error(e)
+            logging.error(f"Error updating lap history: {e}")
@@ -0,0 +1,84 @@
+import threading
+from typing import Any, Dict, Optional
+
+
+class DeltaEncoder:
+    """
+    Turns a stream of full payloads into keyframes and field deltas.
+
+    Every encoded message carries a sequence number. Keyframes (``key``
+    True) hold the full payload, deltas only the fields whose value changed
+    since the previous message. A keyframe is produced for the first frame,
+    every ``keyframe_interval`` messages, and whenever the set of keys
+    changes (e.g. switching between race and practice metrics), so the
+    client never has to handle removed fields.
+
+    The message layout is ``{'seq': int, 'key': bool, 'data': dict}``.
+    """
+
+    def __init__(self, keyframe_interval: int = 120) -> None:
+        """
+        Initialize the encoder.
+
+        Args:
+            keyframe_interval: Number of messages between periodic keyframes
+        """
+        self.keyframe_interval = max(int(keyframe_interval), 1)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Drop the current state so the next message is a keyframe."""
+        self.state: Dict[str, Any] = {}
+        self.seq = 0
+        self._since_keyframe = 0
+        self._force_keyframe = True
+
+    def request_keyframe(self) -> None:
+        """Make the next encoded message a keyframe."""
+        self._force_keyframe = True
+
+    def encode(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Encode the next payload.
+
+        Args:
+            payload: The full payload for this frame
+
+        Returns:
+            Optional[Dict[str, Any]]: The message to send, None if nothing changed
+        """
+        with self._lock:
+            if (self._force_keyframe
+                    or self._since_keyframe >= self.keyframe_interval
+                    or payload.keys() != self.state.keys()):
+                self.state = dict(payload)
+                self.seq += 1
+                self._since_keyframe = 0
+                self._force_keyframe = False
+                return {'seq': self.seq, 'key': True, 'data': dict(payload)}
+
+            state = self.state
+            changed = {key: value for key, value in payload.items() if state[key] != value}
+            if not changed:
+                return None
+
+            state.update(changed)
+            self.seq += 1
+            self._since_keyframe += 1
+            return {'seq': self.seq, 'key': False, 'data': changed}
+
+    def snapshot(self) -> Optional[Dict[str, Any]]:
+        """
+        Return a keyframe of the current state for a client that just joined.
+
+        It carries the sequence number of the last message, so the next delta
+        applies on top of it.
+
+        Returns:
+            Optional[Dict[str, Any]]: The keyframe, None before the first frame
+        """
+        with self._lock:
+            if not self.state:
+                return None
+            return {'seq': self.seq, 'key': True, 'data': dict(self.state)}
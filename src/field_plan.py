@@ -0,0 +1,105 @@
+import struct
+import logging
+from typing import Any, Dict, Iterable, List, Mapping, Tuple
+
+import numpy as np
+
+from ibt_reader import VAR_TYPE_DTYPES
+
+# irsdk_VarType -> struct code (char, bool, int, bitfield, float, double)
+VAR_TYPE_CODES = ['c', '?', 'i', 'I', 'f', 'd']
+
+
+class FieldPlan:
+    """
+    Precompiled decoder for the telemetry variables read on every frame.
+
+    Looking a variable up by name through pyirsdk resolves its header and
+    builds a fresh struct format on each access. The plan resolves the var
+    header offsets once, then decodes every requested scalar from a frozen
+    var buffer with a single ``struct.unpack_from`` and every array with a
+    zero-copy ``numpy.frombuffer``.
+
+    The var headers only need to expose ``type``, ``offset`` and ``count``,
+    which both pyirsdk's VarHeader and IbtVarHeader do.
+    """
+
+    def __init__(self, var_headers: Mapping[str, Any], scalars: Iterable[str], arrays: Iterable[str] = ()) -> None:
+        """
+        Compile the plan for a var header layout.
+
+        Args:
+            var_headers: Mapping of variable name to its var header
+            scalars: Names of single-value variables to decode
+            arrays: Names of array variables (CarIdx*) to decode
+        """
+        self.var_headers = var_headers
+        self.missing: List[str] = []
+
+        scalar_fields: List[Tuple[int, str, str]] = []
+        for name in scalars:
+            header = var_headers.get(name)
+            if header is None:
+                self.missing.append(name)
+                continue
+            scalar_fields.append((header.offset, name, VAR_TYPE_CODES[header.type]))
+        scalar_fields.sort()
+
+        fmt, position = ['<'], 0
+        for offset, _name, code in scalar_fields:
+            if offset > position:
+                fmt.append(f'{offset - position}x')
+            fmt.append(code)
+            position = offset + struct.calcsize(code)
+        self._scalar_struct = struct.Struct(''.join(fmt))
+        self._scalar_names = tuple(name for _offset, name, _code in scalar_fields)
+
+        self._arrays: List[Tuple[str, np.dtype, int, int]] = []
+        for name in arrays:
+            header = var_headers.get(name)
+            if header is None:
+                self.missing.append(name)
+                continue
+            self._arrays.append((name, VAR_TYPE_DTYPES[header.type], header.offset, header.count))
+
+        if self.missing:
+            logging.debug(f"Telemetry variables not available from this source: {self.missing}")
+
+    def decode(self, buffer: Any, base_offset: int = 0) -> Dict[str, Any]:
+        """
+        Decode one frame.
+
+        Args:
+            buffer: The frozen var buffer (bytes, mmap or memoryview)
+            base_offset: Offset of the var buffer inside ``buffer``
+
+        Returns:
+            Dict[str, Any]: Python scalars and read-only NumPy arrays by
+                variable name, None for variables the source does not have
+        """
+        frame: Dict[str, Any] = dict.fromkeys(self.missing)
+        frame.update(zip(self._scalar_names, self._scalar_struct.unpack_from(buffer, base_offset)))
+        for name, dtype, offset, count in self._arrays:
+            frame[name] = np.frombuffer(buffer, dtype=dtype, count=count, offset=base_offset + offset)
+        return frame
+
+
+def read_frame(source: Any, scalars: Iterable[str], arrays: Iterable[str] = ()) -> Dict[str, Any]:
+    """
+    Read the same fields as a FieldPlan through name-based item access.
+
+    Used for sources that cannot hand out their raw var buffer.
+
+    Args:
+        source: Telemetry source supporting ``source[name]``
+        scalars: Names of single-value variables
+        arrays: Names of array variables
+
+    Returns:
+        Dict[str, Any]: Values by variable name
+    """
+    frame = {name: source[name] for name in scalars}
+    for name in arrays:
+        frame[name] = source[name]
+    return frame
+
@@ -0,0 +1,242 @@
+import mmap
+import os
+import struct
+import logging
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+import numpy as np
+
+# Layout of the iRacing telemetry file header (irsdk_header + irsdk_diskSubHeader)
+HEADER_STRUCT = struct.Struct('<10i')
+VAR_BUF_STRUCT = struct.Struct('<2i')
+DISK_SUB_HEADER_STRUCT = struct.Struct('<Qddii')
+VAR_HEADER_STRUCT = struct.Struct('<3i?3x32s64s32s')
+
+VAR_BUF_OFFSET = 48
+DISK_SUB_HEADER_OFFSET = 112
+
+# irsdk_VarType -> NumPy dtype (char, bool, int, bitfield, float, double)
+VAR_TYPE_DTYPES = [
+    np.dtype('S1'),
+    np.dtype('?'),
+    np.dtype('<i4'),
+    np.dtype('<u4'),
+    np.dtype('<f4'),
+    np.dtype('<f8'),
+]
+
+
+class IbtVarHeader(NamedTuple):
+    """Description of one telemetry channel stored in an .ibt file."""
+
+    name: str
+    type: int
+    offset: int
+    count: int
+    count_as_time: bool
+    desc: str
+    unit: str
+
+    @property
+    def dtype(self) -> np.dtype:
+        return VAR_TYPE_DTYPES[self.type]
+
+
+class IbtFile:
+    """
+    Memory-mapped reader for recorded iRacing ``.ibt`` telemetry files.
+
+    The file is mapped once and the variable headers are parsed up front.
+    Every channel is exposed as a strided NumPy view over the mapping, so
+    reading a whole session allocates nothing per sample and the resident
+    memory stays close to the size of the file.
+
+    Usage:
+        with IbtFile('session.ibt') as ibt:
+            speed = ibt['Speed']             # shape (records,)
+            est = ibt['CarIdxEstTime']       # shape (records, 64)
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Open and map an .ibt file.
+
+        Args:
+            path: Path to the .ibt file
+
+        Raises:
+            ValueError: If the file is not a valid telemetry file
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path} is empty")
+
+        self._channels: Dict[str, np.ndarray] = {}
+        try:
+            self._parse_headers()
+        except Exception:
+            self.close()
+            raise
+        logging.debug(f"Mapped {path}: {self.record_count} records, {len(self.var_headers)} channels")
+
+    def _parse_headers(self) -> None:
+        """Parse the file header, disk sub-header and variable headers."""
+        file_size = len(self._mmap)
+        if file_size < DISK_SUB_HEADER_OFFSET + DISK_SUB_HEADER_STRUCT.size:
+            raise ValueError(f"{self.path} is too small to be an .ibt file")
+
+        (self.version, _status, self.tick_rate,
+         self.session_info_update, self._session_info_len, self._session_info_offset,
+         num_vars, var_header_offset, _num_buf, self.buf_len) = HEADER_STRUCT.unpack_from(self._mmap, 0)
+        _tick_count, self.data_offset = VAR_BUF_STRUCT.unpack_from(self._mmap, VAR_BUF_OFFSET)
+        (_start_date, self.session_start_time, self.session_end_time,
+         self.session_lap_count, record_count) = DISK_SUB_HEADER_STRUCT.unpack_from(self._mmap, DISK_SUB_HEADER_OFFSET)
+
+        if self.buf_len <= 0 or not 0 < self.data_offset <= file_size:
+            raise ValueError(f"{self.path} has an invalid telemetry header")
+
+        # Files from a crashed session may have a zero record count, so trust
+        # the file size when it disagrees with the header.
+        available = (file_size - self.data_offset) // self.buf_len
+        self.record_count = min(record_count, available) if record_count > 0 else available
+
+        self.var_headers: Dict[str, IbtVarHeader] = {}
+        for i in range(num_vars):
+            var_type, offset, count, count_as_time, name, desc, unit = VAR_HEADER_STRUCT.unpack_from(
+                self._mmap, var_header_offset + i * VAR_HEADER_STRUCT.size)
+            header = IbtVarHeader(
+                name=name.rstrip(b'\x00').decode('latin-1'),
+                type=var_type,
+                offset=offset,
+                count=count,
+                count_as_time=count_as_time,
+                desc=desc.rstrip(b'\x00').decode('latin-1'),
+                unit=unit.rstrip(b'\x00').decode('latin-1'),
+            )
+            self.var_headers[header.name] = header
+
+    def __enter__(self) -> 'IbtFile':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.var_headers
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.var_headers)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.channel(name)
+
+    def __len__(self) -> int:
+        return self.record_count
+
+    @property
+    def channel_names(self) -> List[str]:
+        return list(self.var_headers)
+
+    def channel(self, name: str) -> np.ndarray:
+        """
+        Return a read-only, zero-copy view of a channel across all records.
+
+        Args:
+            name: Channel name, e.g. 'Speed' or 'CarIdxLapDistPct'
+
+        Returns:
+            np.ndarray: Shape (records,) for scalars, (records, count) for arrays
+
+        Raises:
+            KeyError: If the channel is not present in the file
+        """
+        view = self._channels.get(name)
+        if view is not None:
+            return view
+
+        header = self.var_headers[name]
+        dtype = header.dtype
+        if header.count == 1:
+            shape, strides = (self.record_count,), (self.buf_len,)
+        else:
+            shape, strides = (self.record_count, header.count), (self.buf_len, dtype.itemsize)
+
+        view = np.ndarray(
+            shape=shape,
+            dtype=dtype,
+            buffer=self._mmap,
+            offset=self.data_offset + header.offset,
+            strides=strides,
+        )
+        self._channels[name] = view
+        return view
+
+    def record(self, index: int) -> memoryview:
+        """
+        Return the raw bytes of one telemetry record without copying.
+
+        Args:
+            index: Record index, negative values count from the end
+
+        Returns:
+            memoryview: The record, laid out like a live SDK var buffer
+        """
+        if index < 0:
+            index += self.record_count
+        if not 0 <= index < self.record_count:
+            raise IndexError(f"record {index} out of range")
+        start = self.data_offset + index * self.buf_len
+        return memoryview(self._mmap)[start:start + self.buf_len]
+
+    def session_info(self) -> str:
+        """
+        Return the raw SessionInfo YAML stored in the file.
+
+        Returns:
+            str: The SessionInfo document
+        """
+        start = self._session_info_offset
+        raw = self._mmap[start:start + self._session_info_len].rstrip(b'\x00')
+        try:
+            return raw.decode('utf-8')
+        except UnicodeDecodeError:
+            return raw.decode('cp1252', errors='replace')
+
+    def close(self) -> None:
+        """Unmap the file. Views handed out earlier must not be used afterwards."""
+        self._channels.clear()
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # A caller still holds a channel view, the mapping is released
+                # once the last view is garbage collected.
+                logging.debug(f"Deferring unmap of {self.path}, channel views still in use")
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def open_ibt(path: str) -> Optional[IbtFile]:
+    """
+    Open an .ibt file, logging instead of raising on failure.
+
+    Args:
+        path: Path to the .ibt file
+
+    Returns:
+        Optional[IbtFile]: The mapped file or None if it cannot be read
+    """
+    if not os.path.isfile(path):
+        logging.error(f"Telemetry file not found: {path}")
+        return None
+    try:
+        return IbtFile(path)
+    except (OSError, ValueError, struct.error) as e:
+        logging.error(f"Could not read telemetry file {path}: {e}")
+        return None
@@ -1,12 +1,9 @@
-from flask import Blueprint, render_template, send_from_directory, jsonify, request
-import os
-import multiprocessing
-from overlay_window import OverlayWindow
-import json
+from flask import Blueprint, render_template, jsonify, request
+from overlay_registry import get_overlay_registry
+from window_pool import IN_PLACE_TOGGLE, get_window_pool, run_overlay_window
+from overlay_host import HOST_MODE, get_overlay_host
+from static_assets import get_static_assets
 import logging
-import sys
-import threading
-import time
 
 interface_bp = Blueprint(
     'interface', __name__,
@@ -25,52 +22,15 @@ def index():
 
 @interface_bp.route('/static/<filename>')
 def serve_static(filename):
-    return send_from_directory(os.path.join(interface_bp.root_path, 'static'), filename)
+    return get_static_assets().send('interface', filename)
 
 @interface_bp.route('/images/<filename>')
 def serve_images(filename):
-    return send_from_directory(os.path.join(interface_bp.root_path, 'static', 'images'), filename)
+    return get_static_assets().send('interface', f'images/{filename}')
 
 @interface_bp.route('/get_overlays')
 def get_overlays():
-    overlays_dir = os.path.join(os.path.dirname(__file__), '..', 'overlays')
-    overlays = []
-    for name in os.listdir(overlays_dir):
-        overlay_path = os.path.join(overlays_dir, name)
-        properties_path = os.path.join(overlay_path, 'properties.json')
-        if os.path.isdir(overlay_path) and os.path.exists(properties_path):
-            with open(properties_path, 'r') as properties_file:
-                properties = json.load(properties_file)
-                display_name = properties.get('display_name', name)
-                description = properties.get('description', 'No description available.')
-                position = properties.get('position', None)
-                dpi_info = properties.get('dpi_info', {'scale': 1.0})
-                
-                preview_gif = properties.get('preview_gif', None)
-                if not preview_gif:
-                    images_folder = os.path.join(overlay_path, 'static', 'images')
-                    if os.path.exists(images_folder):
-                        preview_file = os.path.join(images_folder, 'preview.gif')
-                        if os.path.exists(preview_file):
-                            preview_gif = f"/overlay/{name}/static/images/preview.gif"
-                    
-                    if not preview_gif:
-                        static_folder = os.path.join(overlay_path, 'static')
-                        if os.path.exists(static_folder):
-                            preview_file = os.path.join(static_folder, 'preview.gif')
-                            if os.path.exists(preview_file):
-                                preview_gif = f"/overlay/{name}/static/preview.gif"
-                
-                overlays.append({
-                    'display_name': display_name,
-                    'folder_name': name,
-                    'description': description,
-                    'url': f"http://127.0.0.1:8085/overlay/{name}",
-                    'position': position,
-                    'dpi_info': dpi_info,
-                    'preview_gif': preview_gif
-                })
-    return jsonify(overlays)
+    return jsonify(get_overlay_registry().list_overlays())
 
 @interface_bp.route('/launch', methods=['POST'])
 def launch_overlay():
@@ -78,43 +38,34 @@ def launch_overlay():
     overlay_name = data.get('overlay')
     is_transparent = data.get('transparent', True) 
     
-    folder_name = next((overlay['folder_name'] for overlay in get_overlays().json if overlay['display_name'] == overlay_name), None)
+    folder_name = get_overlay_registry().folder_for(overlay_name)
     
     if folder_name:
         logging.debug(f"Attempting to launch overlay: {folder_name}")
         
+        if switch_overlay_mode(folder_name, is_transparent):
+            return overlay_mode_response(folder_name, is_transparent)
+        
         if folder_name in opened_overlays and opened_overlays[folder_name] is not None and opened_overlays[folder_name].is_alive():
             logging.debug(f"Closing existing overlay: {folder_name}")
             opened_overlays[folder_name].terminate()
             opened_overlays[folder_name].join(timeout=1)
             del opened_overlays[folder_name]
-            time.sleep(0.5)
         
         overlay_url = f"http://127.0.0.1:8085/overlay/{folder_name}"
-        properties_path = os.path.join(os.path.dirname(__file__), '..', 'overlays', folder_name, 'properties.json')
+        properties = get_overlay_registry().properties(folder_name)
         
-        logging.debug(f"Properties path: {properties_path}")
-        
-        if os.path.exists(properties_path):
-            with open(properties_path, 'r') as properties_file:
-                properties = json.load(properties_file)
-                resolution = properties.get('resolution', {'width': 800, 'height': 600})
-                position = properties.get('position', None)
-                logging.debug(f"Overlay properties: {properties}")
+        if properties is not None:
+            resolution = properties.get('resolution', {'width': 800, 'height': 600})
+            position = properties.get('position', None)
+            logging.debug(f"Overlay properties: {properties}")
         else:
             logging.error(f"Overlay properties file not found for {folder_name}")
             return jsonify({'status': 'error', 'message': f'Overlay {folder_name} not found.'}), 404
         
-        exit_flag = multiprocessing.Value('i', 0)
-        
-        process = multiprocessing.Process(
-            target=launch_overlay_window, 
-            args=(overlay_url, resolution, exit_flag, is_transparent, position, folder_name)
+        opened_overlays[folder_name] = start_overlay_window(
+            overlay_url, resolution, is_transparent, position, folder_name
         )
-        process.daemon = True  
-        process.start()
-        
-        opened_overlays[folder_name] = process
         
         return jsonify({
             'status': 'success', 
@@ -128,21 +79,15 @@ def toggle_transparency():
     data = request.get_json()
     overlay_name = data.get('overlay')
     
-    folder_name = next((overlay['folder_name'] for overlay in get_overlays().json if overlay['display_name'] == overlay_name), None)
+    folder_name = get_overlay_registry().folder_for(overlay_name)
     
     if folder_name:
-        properties_path = os.path.join(os.path.dirname(__file__), '..', 'overlays', folder_name, 'properties.json')
-        position = None
-        
-        if os.path.exists(properties_path):
-            with open(properties_path, 'r') as properties_file:
-                properties = json.load(properties_file)
-                position = properties.get('position', None)
+        if switch_overlay_mode(folder_name, False):
+            return overlay_mode_response(folder_name, False)
         
         if folder_name in opened_overlays and opened_overlays[folder_name] is not None and opened_overlays[folder_name].is_alive():
             opened_overlays[folder_name].terminate()
             opened_overlays[folder_name].join(timeout=1)
-            time.sleep(0.5)
         
         return launch_overlay_with_transparency(folder_name, False)
     
@@ -154,16 +99,18 @@ def toggle_to_transparent():
     overlay_name = data.get('overlay')
     position = data.get('position')
     
-    folder_name = next((overlay['folder_name'] for overlay in get_overlays().json if overlay['display_name'] == overlay_name), None)
+    folder_name = get_overlay_registry().folder_for(overlay_name)
     
     if folder_name:
         if position:
             save_overlay_position(folder_name, position['x'], position['y'])
         
+        if switch_overlay_mode(folder_name, True):
+            return overlay_mode_response(folder_name, True)
+        
         if folder_name in opened_overlays and opened_overlays[folder_name] is not None and opened_overlays[folder_name].is_alive():
             opened_overlays[folder_name].terminate()
             opened_overlays[folder_name].join(timeout=1)
-            time.sleep(0.5)
         
         return launch_overlay_with_transparency(folder_name, True)
     
@@ -187,24 +134,14 @@ def report_window_position():
     
     logging.info(f"Saving position for {folder_name}: x={position['x']}, y={position['y']} with DPI scale: {dpi_scale}")
     
-    properties_path = os.path.join(os.path.dirname(__file__), '..', 'overlays', folder_name, 'properties.json')
-    
-    if os.path.exists(properties_path):
-        with open(properties_path, 'r') as properties_file:
-            properties = json.load(properties_file)
-            
-        properties['position'] = {'x': position['x'], 'y': position['y']}
-        properties['dpi_info'] = {'scale': dpi_scale}
-            
-        with open(properties_path, 'w') as properties_file:
-            json.dump(properties, properties_file, indent=4)
-    
-    if save_overlay_position(folder_name, position['x'], position['y']):
+    if save_overlay_position(folder_name, position['x'], position['y'], dpi_scale):
+        if switch_overlay_mode(folder_name, True):
+            return overlay_mode_response(folder_name, True)
+        
         if folder_name in opened_overlays and opened_overlays[folder_name] is not None and opened_overlays[folder_name].is_alive():
             try:
                 opened_overlays[folder_name].terminate()
                 opened_overlays[folder_name].join(timeout=1)
-                time.sleep(0.5)
                 
                 return launch_overlay_with_transparency(folder_name, True)
             except Exception as e:
@@ -220,29 +157,50 @@ def report_window_position():
     else:
         return jsonify({'status': 'error', 'message': 'Failed to save position'}), 500
 
+def start_overlay_window(overlay_url, resolution, is_transparent, position, folder_name):
+    """
+    Show an overlay window in the overlay host (RAH_OVERLAY_HOST) or in a pooled process.
+    Returns a handle with is_alive, terminate, join, move and set_positioning.
+    """
+    if HOST_MODE:
+        return get_overlay_host().open(overlay_url, resolution, is_transparent, position, folder_name,
+                                       in_place=IN_PLACE_TOGGLE)
+    return get_window_pool().launch(overlay_url, resolution, is_transparent, position, folder_name,
+                                    in_place=IN_PLACE_TOGGLE)
+
+def switch_overlay_mode(folder_name, is_transparent):
+    """
+    Switch an open overlay between transparent and positioning mode without
+    relaunching it (RAH_IN_PLACE_TOGGLE). Returns False if it has to be relaunched.
+    """
+    window = opened_overlays.get(folder_name)
+    if not IN_PLACE_TOGGLE or window is None or not window.is_alive():
+        return False
+    return window.set_positioning(not is_transparent)
+
+def overlay_mode_response(folder_name, is_transparent):
+    """Response of a route that switched an overlay in place"""
+    return jsonify({
+        'status': 'success',
+        'message': f'Overlay {folder_name} switched to transparency={is_transparent}.',
+        'transparent': is_transparent,
+        'in_place': True
+    }), 200
+
 def launch_overlay_with_transparency(folder_name, is_transparent):
     """Helper function to launch overlay with specified transparency"""
     overlay_url = f"http://127.0.0.1:8085/overlay/{folder_name}"
-    properties_path = os.path.join(os.path.dirname(__file__), '..', 'overlays', folder_name, 'properties.json')
+    properties = get_overlay_registry().properties(folder_name)
     
-    if os.path.exists(properties_path):
-        with open(properties_path, 'r') as properties_file:
-            properties = json.load(properties_file)
-            resolution = properties.get('resolution', {'width': 800, 'height': 600})
-            position = properties.get('position', None)
+    if properties is not None:
+        resolution = properties.get('resolution', {'width': 800, 'height': 600})
+        position = properties.get('position', None)
     else:
         return jsonify({'status': 'error', 'message': f'Overlay {folder_name} properties not found.'}), 404
     
-    exit_flag = multiprocessing.Value('i', 0)
-    
-    process = multiprocessing.Process(
-        target=launch_overlay_window, 
-        args=(overlay_url, resolution, exit_flag, is_transparent, position, folder_name)
+    opened_overlays[folder_name] = start_overlay_window(
+        overlay_url, resolution, is_transparent, position, folder_name
     )
-    process.daemon = True
-    process.start()
-    
-    opened_overlays[folder_name] = process
     
     return jsonify({
         'status': 'success', 
@@ -255,7 +213,7 @@ def save_position():
     data = request.get_json()
     overlay_name = data.get('overlay')
     
-    folder_name = next((overlay['folder_name'] for overlay in get_overlays().json if overlay['display_name'] == overlay_name), None)
+    folder_name = get_overlay_registry().folder_for(overlay_name)
     
     if folder_name:
         position = data.get('position')
@@ -273,27 +231,18 @@ def save_position():
     
     return jsonify({'status': 'error', 'message': 'Overlay not found.'}), 404
 
-def save_overlay_position(folder_name, x, y):
+def save_overlay_position(folder_name, x, y, dpi_scale=None):
     """
-    Save the overlay position to its properties.json file
+    Save the overlay position (and DPI scale, if given) to its properties.json file.
+    The file is written back in the background, see OverlayRegistry.
     """
-    properties_path = os.path.join(os.path.dirname(__file__), '..', 'overlays', folder_name, 'properties.json')
+    updates = {'position': {'x': x, 'y': y}}
+    if dpi_scale is not None:
+        updates['dpi_info'] = {'scale': dpi_scale}
     
-    if os.path.exists(properties_path):
-        with open(properties_path, 'r') as properties_file:
-            properties = json.load(properties_file)
-        
-        # Update position
-        properties['position'] = {'x': x, 'y': y}
-        
-        # Write back to file
-        with open(properties_path, 'w') as properties_file:
-            json.dump(properties, properties_file, indent=4)
-        
+    if get_overlay_registry().update_properties(folder_name, updates):
         logging.debug(f"Saved position for {folder_name}: {x}, {y}")
         return True
-    
-    logging.error(f"Could not find properties file for {folder_name}")
     return False
 
 @interface_bp.route('/close_overlay', methods=['POST'])
@@ -306,8 +255,7 @@ def close_overlay():
     folder_name = data.get('folder_name')
     
     if not folder_name:
-        folder_name = next((overlay['folder_name'] for overlay in get_overlays().json 
-                            if overlay['display_name'] == overlay_name), None)
+        folder_name = get_overlay_registry().folder_for(overlay_name)
     
     if folder_name:
         logging.debug(f"Attempting to close overlay: {folder_name}")
@@ -328,6 +276,21 @@ def close_overlay():
     
     return jsonify({'status': 'error', 'message': 'Invalid overlay name provided'}), 400
 
+def get_window_stats():
+    """
+    Return the JS bridge counters of every open overlay window by folder name.
+    The calls per second cover the time since the previous read.
+    """
+    stats = {}
+    for folder_name, process in list(opened_overlays.items()):
+        bridge_stats = getattr(process, 'bridge_stats', None)
+        if bridge_stats is None or not process.is_alive():
+            continue
+        window_stats = bridge_stats()
+        if window_stats is not None:
+            stats[folder_name] = window_stats
+    return stats
+
 @interface_bp.route('/get_active_overlays', methods=['GET'])
 def get_active_overlays():
     """
@@ -337,11 +300,7 @@ def get_active_overlays():
     
     for folder_name, process in opened_overlays.items():
         if process is not None and process.is_alive():
-            display_name = None
-            for overlay in get_overlays().json:
-                if overlay['folder_name'] == folder_name:
-                    display_name = overlay['display_name']
-                    break
+            display_name = get_overlay_registry().display_name_for(folder_name)
             
             active[folder_name] = {
                 'display_name': display_name,
@@ -354,35 +313,9 @@ def get_active_overlays():
         'active_overlays': active
     }), 200
 
-def launch_overlay_window(url, resolution, exit_flag=None, transparent=True, position=None, folder_name=None):
+def launch_overlay_window(url, resolution, transparent=True, position=None, folder_name=None):
     """
     Launch the overlay window in a separate process with the specified resolution.
+    Kept for callers that start their own process, the interface uses the window pool.
     """
-    try:
-        overlay_window = OverlayWindow(
-            url, 
-            width=resolution['width'], 
-            height=resolution['height'], 
-            transparent=transparent,
-            on_top=True
-        )
-        
-        if folder_name:
-            overlay_window.set_folder_name(folder_name)
-            
-        if position:
-            logging.info(f"Setting position for {folder_name}: {position}")
-            overlay_window.position = position
-        
-        def on_closed():
-            logging.debug(f"Window for {folder_name} closed")
-            if folder_name and folder_name in opened_overlays:
-                del opened_overlays[folder_name]
-            sys.exit(0)
-            
-        overlay_window.set_on_closed(on_closed)
-        
-        overlay_window.create_overlay_window()
-    except Exception as e:
-        logging.error(f"Error launching overlay window: {e}")
-        sys.exit(1)
\ No newline at end of file
+    run_overlay_window(url, resolution, transparent, position, folder_name)
@@ -0,0 +1,429 @@
+import math
+import logging
+import threading
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+# Sector splits stored per lap, tracks with more sectors keep the first ones
+MAX_SECTORS = 8
+# Valid laps covered by the rolling average and standard deviation
+ROLLING_WINDOW = 5
+# Seconds into the next lap after which a lap is stored even if iRacing has
+# not published a new LapLastLapTime for it (it lags the line crossing)
+LAST_LAP_TIME_TIMEOUT = 3.0
+# LapDistPct below which a lap counts as started, so a frame that still
+# reads ~1.0 right after the line cannot trigger every sector at once
+LAP_START_PCT = 0.1
+
+
+class LapStats:
+    """
+    Running statistics over the valid laps of a session.
+
+    Every update is O(1): the best lap is a running minimum, the overall
+    mean and standard deviation use Welford's algorithm, and the rolling
+    window keeps sums of the times and their squares, subtracting the lap
+    that falls out of the window.
+    """
+
+    def __init__(self, window: int = ROLLING_WINDOW) -> None:
+        """
+        Initialize empty statistics.
+
+        Args:
+            window: Number of valid laps in the rolling window
+        """
+        self.window = max(int(window), 1)
+        self.count = 0
+        self.best: Optional[float] = None
+        self.last: Optional[float] = None
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._window_sum = 0.0
+        self._window_sq_sum = 0.0
+
+    def add(self, lap_time: float, dropped: Optional[float] = None) -> None:
+        """
+        Add a valid lap.
+
+        Args:
+            lap_time: Lap time in seconds
+            dropped: Time of the lap that leaves the rolling window, None
+                while the window is not full yet
+        """
+        self.count += 1
+        self.last = lap_time
+        self.best = lap_time if self.best is None else min(self.best, lap_time)
+
+        delta = lap_time - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (lap_time - self._mean)
+
+        self._window_sum += lap_time
+        self._window_sq_sum += lap_time * lap_time
+        if dropped is not None:
+            self._window_sum -= dropped
+            self._window_sq_sum -= dropped * dropped
+
+    def to_dict(self) -> Dict[str, Optional[float]]:
+        """
+        Return the statistics.
+
+        Returns:
+            Dict[str, Optional[float]]: Lap count, best, last, mean and
+                standard deviation over all valid laps and over the rolling window
+        """
+        if not self.count:
+            return {'count': 0, 'best': None, 'last': None, 'mean': None, 'stddev': None,
+                    'rolling_average': None, 'rolling_stddev': None}
+
+        size = min(self.count, self.window)
+        rolling_mean = self._window_sum / size
+        rolling_var = max(self._window_sq_sum / size - rolling_mean * rolling_mean, 0.0)
+        return {
+            'count': self.count,
+            'best': self.best,
+            'last': self.last,
+            'mean': self._mean,
+            'stddev': math.sqrt(self._m2 / self.count),
+            'rolling_average': rolling_mean,
+            'rolling_stddev': math.sqrt(rolling_var),
+        }
+
+
+class SessionLaps:
+    """
+    Every completed lap of one session in compact, growable NumPy arrays.
+    """
+
+    INITIAL_CAPACITY = 64
+
+    def __init__(self, session_num: int, window: int = ROLLING_WINDOW) -> None:
+        """
+        Initialize an empty session.
+
+        Args:
+            session_num: iRacing SessionNum
+            window: Valid laps in the rolling statistics window
+        """
+        self.session_num = session_num
+        self.count = 0
+        capacity = self.INITIAL_CAPACITY
+        self.lap = np.zeros(capacity, dtype=np.int32)
+        self.time = np.zeros(capacity, dtype=np.float32)
+        self.sectors = np.full((capacity, MAX_SECTORS), np.nan, dtype=np.float32)
+        self.fuel_used = np.full(capacity, np.nan, dtype=np.float32)
+        self.valid = np.zeros(capacity, dtype=bool)
+        # Times of the valid laps only, so the lap leaving the rolling window
+        # is found by index
+        self._valid_times = np.zeros(capacity, dtype=np.float64)
+        self._valid_count = 0
+        self.stats = LapStats(window)
+
+    def _grow(self) -> None:
+        """Double the capacity of every array."""
+        capacity = len(self.lap) * 2
+        self.lap = np.resize(self.lap, capacity)
+        self.time = np.resize(self.time, capacity)
+        sectors = np.full((capacity, MAX_SECTORS), np.nan, dtype=np.float32)
+        sectors[:self.count] = self.sectors[:self.count]
+        self.sectors = sectors
+        self.fuel_used = np.resize(self.fuel_used, capacity)
+        self.valid = np.resize(self.valid, capacity)
+        self._valid_times = np.resize(self._valid_times, capacity)
+
+    def append(self, lap: int, lap_time: float, sectors: Sequence[float], fuel_used: float, valid: bool) -> None:
+        """
+        Store a completed lap and update the statistics.
+
+        Args:
+            lap: Lap number (LapCompleted after the line was crossed)
+            lap_time: Lap time in seconds, <= 0 if iRacing gave none
+            sectors: Sector split times, empty if unknown
+            fuel_used: Fuel used over the lap, NaN if unknown
+            valid: Whether the lap counts for the statistics
+        """
+        if self.count == len(self.lap):
+            self._grow()
+
+        index = self.count
+        self.lap[index] = lap
+        self.time[index] = lap_time
+        splits = list(sectors)[:MAX_SECTORS]
+        self.sectors[index, :len(splits)] = splits
+        self.fuel_used[index] = fuel_used
+        self.valid[index] = valid
+        self.count += 1
+
+        if valid:
+            window = self.stats.window
+            dropped = float(self._valid_times[self._valid_count - window]) if self._valid_count >= window else None
+            self._valid_times[self._valid_count] = lap_time
+            self._valid_count += 1
+            self.stats.add(float(lap_time), dropped)
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """
+        Return the laps as JSON-friendly dicts.
+
+        Returns:
+            List[Dict[str, Any]]: One entry per lap, oldest first
+        """
+        laps = []
+        for index in range(self.count):
+            sectors = self.sectors[index]
+            laps.append({
+                'lap': int(self.lap[index]),
+                'time': float(self.time[index]),
+                'sectors': [float(split) for split in sectors[~np.isnan(sectors)]],
+                'fuel_used': None if np.isnan(self.fuel_used[index]) else float(self.fuel_used[index]),
+                'valid': bool(self.valid[index]),
+            })
+        return laps
+
+
+class LapHistory:
+    """
+    Detects completed laps from telemetry frames and keeps every lap of
+    every session.
+
+    A lap is detected when ``LapCompleted`` increments. Its time is taken
+    from ``LapLastLapTime``, which iRacing updates on the same tick or a
+    moment after the line is crossed: a value that differs from the one
+    before the increment is taken at once, otherwise the lap is held back
+    until it changes or LAST_LAP_TIME_TIMEOUT seconds of the next lap have
+    passed. Sector splits
+    come from the ``LapCurrentLapTime`` at which ``LapDistPct`` crosses each
+    SectorStartPct, and fuel used from ``FuelLevel`` at both crossings. Laps
+    driven partly on pit road, laps observed only partially and laps without
+    a time are stored but marked invalid: a lap whose LapLastLapTime did not
+    change before the timeout is stored with a time of -1, and laps skipped
+    by a jump of ``LapCompleted`` (e.g. a stalled sim) get placeholder rows
+    so the lap numbers stay complete.
+
+    The history spans every session of one event and survives reconnects;
+    ``set_event`` clears it when the sim reports a different event.
+    """
+
+    def __init__(self, window: int = ROLLING_WINDOW) -> None:
+        """
+        Initialize an empty history.
+
+        Args:
+            window: Valid laps in the rolling statistics window
+        """
+        self.window = window
+        self._lock = threading.Lock()
+        self.event: Optional[Any] = None
+        self.clear()
+
+    def set_event(self, event: Optional[Any]) -> None:
+        """
+        Forget every lap when the sim moved to a different event.
+
+        Args:
+            event: Identifier of the event the frames come from, None if unknown
+        """
+        if event is None or event == self.event:
+            return
+        if self.event is not None:
+            logging.info(f"New event {event}, lap history cleared")
+            self.clear()
+        self.event = event
+
+    def interrupt(self) -> None:
+        """Mark the lap in progress as not observed entirely, e.g. after losing the sim."""
+        self._lap_observed = False
+
+    def clear(self) -> None:
+        """Forget every lap and the lap in progress."""
+        self.sessions: Dict[int, SessionLaps] = {}
+        self.session_num: Optional[int] = None
+        self._lap_completed: Optional[int] = None
+        self._pending: Optional[Dict[str, Any]] = None
+        self._last_lap_time: Optional[float] = None
+        self._start_lap(None, observed=False)
+
+    def _start_lap(self, fuel: Optional[float], observed: bool = True) -> None:
+        """Reset the tracking of the lap in progress."""
+        self._lap_fuel = fuel
+        self._lap_observed = observed
+        self._lap_pitted = False
+        self._lap_armed = False
+        self._sector_marks = [0.0]
+
+    def update(self, frame: Mapping[str, Any], sector_starts: Sequence[float] = ()) -> Optional[Dict[str, Any]]:
+        """
+        Feed one telemetry frame.
+
+        Args:
+            frame: Values of SessionNum, LapCompleted, LapLastLapTime,
+                LapCurrentLapTime, LapDistPct, FuelLevel and OnPitRoad;
+                missing values are tolerated
+            sector_starts: SectorStartPct of every sector, first one 0.0
+
+        Returns:
+            Optional[Dict[str, Any]]: The lap stored on this frame, if any
+        """
+        lap_completed = frame.get('LapCompleted')
+        if lap_completed is None:
+            return None
+        lap_completed = int(lap_completed)
+        session_num = int(frame.get('SessionNum') or 0)
+        current_time = frame.get('LapCurrentLapTime')
+        last_lap_time = frame.get('LapLastLapTime')
+        fuel = frame.get('FuelLevel')
+        stored = None
+        # LapLastLapTime as of the frame before this one
+        previous_lap_time = self._last_lap_time
+        self._last_lap_time = last_lap_time
+
+        if session_num != self.session_num or self._lap_completed is None:
+            # New session (or first frame): the lap in progress was not seen from its start
+            self.session_num = session_num
+            self._lap_completed = lap_completed
+            self._pending = None
+            self._start_lap(fuel, observed=False)
+            return None
+
+        if self._pending is not None:
+            if last_lap_time != self._pending['last_lap_time']:
+                stored = self._store(self._pending, last_lap_time)
+                self._pending = None
+            elif current_time is None or current_time >= LAST_LAP_TIME_TIMEOUT:
+                # The value still belongs to the lap before, the time is unknown
+                stored = self._store(self._pending, None)
+                self._pending = None
+
+        if lap_completed > self._lap_completed:
+            if self._pending is not None:
+                # Another lap finished before the time of the previous arrived
+                stored = self._store(self._pending, None)
+            for skipped in range(self._lap_completed + 1, lap_completed):
+                stored = self._store(self._placeholder(skipped), None)
+            # The sim may publish the new time on the same tick as the lap counter,
+            # so compare against the value from before the increment
+            self._pending = {
+                'lap': lap_completed,
+                'last_lap_time': previous_lap_time,
+                'marks': self._sector_marks,
+                'sector_count': len(sector_starts),
+                'fuel_used': (self._lap_fuel - fuel
+                              if self._lap_observed and self._lap_fuel is not None and fuel is not None else None),
+                # Skipped laps (e.g. a gap in the data) were not observed either
+                'observed': self._lap_observed and lap_completed == self._lap_completed + 1,
+                'pitted': self._lap_pitted,
+            }
+            self._lap_completed = lap_completed
+            self._start_lap(fuel)
+            if last_lap_time != previous_lap_time:
+                stored = self._store(self._pending, last_lap_time)
+                self._pending = None
+        elif lap_completed < self._lap_completed:
+            # Lap counter reset within the session (e.g. a reset to the pits)
+            self._lap_completed = lap_completed
+            self._pending = None
+            self._start_lap(fuel, observed=False)
+
+        if frame.get('OnPitRoad'):
+            self._lap_pitted = True
+        self._track_sectors(frame.get('LapDistPct'), current_time, sector_starts)
+        return stored
+
+    def _track_sectors(self, pct: Optional[float], current_time: Optional[float],
+                       sector_starts: Sequence[float]) -> None:
+        """Record the lap time at which the next sector boundary is crossed."""
+        if pct is None or current_time is None:
+            return
+        if not self._lap_armed:
+            self._lap_armed = pct < LAP_START_PCT
+            if not self._lap_armed:
+                return
+
+        marks = self._sector_marks
+        while len(marks) < len(sector_starts) and pct >= sector_starts[len(marks)]:
+            marks.append(float(current_time))
+
+    @staticmethod
+    def _placeholder(lap: int) -> Dict[str, Any]:
+        """Return a finished lap that was never observed, stored without time."""
+        return {'lap': lap, 'last_lap_time': None, 'marks': [], 'sector_count': 0,
+                'fuel_used': None, 'observed': False, 'pitted': False}
+
+    def _store(self, pending: Dict[str, Any], lap_time: Optional[float]) -> Dict[str, Any]:
+        """Store a finished lap in its session."""
+        lap_time = float(lap_time) if lap_time is not None else -1.0
+        marks = pending['marks']
+        sectors: List[float] = []
+        if pending['observed'] and lap_time > 0 and pending['sector_count'] > 1 \
+                and len(marks) == pending['sector_count']:
+            bounds = marks + [lap_time]
+            sectors = [bounds[i + 1] - bounds[i] for i in range(len(marks))]
+
+        fuel_used = pending['fuel_used']
+        if fuel_used is None or fuel_used < 0:
+            # Unknown, or refuelled during the lap
+            fuel_used = math.nan
+        valid = lap_time > 0 and pending['observed'] and not pending['pitted']
+
+        with self._lock:
+            session = self.sessions.get(self.session_num)
+            if session is None:
+                session = self.sessions[self.session_num] = SessionLaps(self.session_num, self.window)
+            session.append(pending['lap'], lap_time, sectors, fuel_used, valid)
+
+        logging.debug(f"Lap {pending['lap']} stored: {lap_time:.3f}s (valid: {valid}, sectors: {sectors})")
+        return {'lap': pending['lap'], 'time': lap_time, 'sectors': sectors,
+                'fuel_used': None if math.isnan(fuel_used) else fuel_used, 'valid': valid}
+
+    def _session(self, session_num: Optional[int]) -> Optional[SessionLaps]:
+        """Return a session's laps, the current session by default."""
+        return self.sessions.get(self.session_num if session_num is None else session_num)
+
+    def lap_times(self, session_num: Optional[int] = None) -> List[float]:
+        """
+        Return the time of every lap of a session.
+
+        Args:
+            session_num: SessionNum, None for the current session
+
+        Returns:
+            List[float]: Lap times in seconds, oldest first
+        """
+        with self._lock:
+            session = self._session(session_num)
+            return session.time[:session.count].tolist() if session else []
+
+    def stats(self, session_num: Optional[int] = None) -> Dict[str, Optional[float]]:
+        """
+        Return the lap statistics of a session.
+
+        Args:
+            session_num: SessionNum, None for the current session
+
+        Returns:
+            Dict[str, Optional[float]]: See LapStats.to_dict
+        """
+        with self._lock:
+            session = self._session(session_num)
+            return (session.stats if session else LapStats(self.window)).to_dict()
+
+    def to_dict(self, session_num: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Return every lap and the statistics of a session.
+
+        Args:
+            session_num: SessionNum, None for the current session
+
+        Returns:
+            Dict[str, Any]: Session number, laps and statistics
+        """
+        with self._lock:
+            session = self._session(session_num)
+            return {
+                'session_num': self.session_num if session_num is None else session_num,
+                'sessions': sorted(self.sessions),
+                'laps': session.to_list() if session else [],
+                'stats': (session.stats if session else LapStats(self.window)).to_dict(),
+            }
@@ -0,0 +1,176 @@
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from telemetry_metrics import LatencyHistogram
+
+# Parts of the sim-to-screen latency of a frame:
+#   server   frame decode started until the channel emitted it
+#   network  one way between server and overlay, half the round trip
+#   client   arrived in the overlay until the paint after it was applied
+#   total    the sum, from the server reading the tick to pixels
+LATENCY_COMPONENTS = ('total', 'server', 'network', 'client')
+
+# Echoes of probes older than this are stale (a suspended window) and skipped
+MAX_ECHO_AGE_US = 60_000_000
+
+# Fields of a latency echo, all integer microseconds. frame and emit come
+# from the probe stamp on the server clock, the rest are the client clock.
+ECHO_FIELDS = ('tick', 'frame', 'emit', 'received', 'rendered', 'echoed')
+
+
+def latency_components(echo: Dict[str, Any], now_us: int) -> Optional[Dict[str, int]]:
+    """
+    Split the latency of an echoed probe frame into its components.
+
+    The server and client clocks are unrelated, so each side only measures
+    its own intervals. The network time is what is left of the round trip
+    from the emit to the echo arriving, minus the time the client held the
+    frame, split evenly between both ways.
+
+    Args:
+        echo: The echo sent by the client, see ECHO_FIELDS
+        now_us: Server time the echo arrived, in microseconds
+
+    Returns:
+        Optional[Dict[str, int]]: Microseconds by component, None for
+            malformed, inconsistent or stale echoes
+    """
+    try:
+        frame, emit, received, rendered, echoed = (int(echo[field]) for field in ECHO_FIELDS[1:])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    server = emit - frame
+    client = rendered - received
+    round_trip = (now_us - emit) - (echoed - received)
+    if server < 0 or client < 0 or echoed < rendered or round_trip < 0 or now_us - emit > MAX_ECHO_AGE_US:
+        return None
+    network = round_trip // 2
+    return {
+        'total': server + network + client,
+        'server': server,
+        'network': network,
+        'client': client,
+    }
+
+
+def _new_histograms() -> Dict[str, LatencyHistogram]:
+    return {component: LatencyHistogram() for component in LATENCY_COMPONENTS}
+
+
+def _summarize(histograms: Dict[str, LatencyHistogram]) -> Dict[str, Dict[str, float]]:
+    """Count, p50, p99 and max in milliseconds by component."""
+    summary = {}
+    for component, histogram in histograms.items():
+        p50, p99 = histogram.quantiles((0.5, 0.99))
+        summary[component] = {
+            'count': histogram.count,
+            'p50_ms': round(p50 / 1e6, 3),
+            'p99_ms': round(p99 / 1e6, 3),
+            'max_ms': round(histogram.max / 1e6, 3),
+        }
+    return summary
+
+
+class LatencyTracker:
+    """
+    Sim-to-screen latency of one channel's clients.
+
+    Echoes of probe frames are aggregated per wire encoding, which outlives
+    the clients, and per connected client.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the tracker without samples."""
+        self._lock = threading.Lock()
+        self.by_encoding: Dict[str, Dict[str, LatencyHistogram]] = {}
+        self.by_client: Dict[str, Dict[str, LatencyHistogram]] = {}
+        self._client_encodings: Dict[str, str] = {}
+        self.echoes = 0
+        self.rejected = 0
+
+    def record_echo(self, sid: str, encoding: str, echo: Dict[str, Any], now_us: int) -> bool:
+        """
+        Add the latency of an echoed probe frame.
+
+        Args:
+            sid: Socket.IO session id of the client
+            encoding: Wire encoding the client receives
+            echo: The echo sent by the client, see ECHO_FIELDS
+            now_us: Server time the echo arrived, in microseconds
+
+        Returns:
+            bool: False if the echo was rejected
+        """
+        components = latency_components(echo, now_us) if isinstance(echo, dict) else None
+        with self._lock:
+            if components is None:
+                self.rejected += 1
+                return False
+            self.echoes += 1
+            by_encoding = self.by_encoding.setdefault(encoding, _new_histograms())
+            by_client = self.by_client.setdefault(sid, _new_histograms())
+            self._client_encodings[sid] = encoding
+            for component, value in components.items():
+                by_encoding[component].record(value * 1000)
+                by_client[component].record(value * 1000)
+        return True
+
+    def remove_client(self, sid: str) -> None:
+        """
+        Drop the figures of a disconnected client, its encoding keeps them.
+
+        Args:
+            sid: Socket.IO session id
+        """
+        with self._lock:
+            self.by_client.pop(sid, None)
+            self._client_encodings.pop(sid, None)
+
+    def reset(self) -> None:
+        """Drop every sample."""
+        with self._lock:
+            self.by_encoding.clear()
+            self.by_client.clear()
+            self._client_encodings.clear()
+            self.echoes = 0
+            self.rejected = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return the latency figures.
+
+        Returns:
+            Dict[str, Any]: Echo counts, then count, p50, p99 and max in
+                milliseconds of every component by encoding and by client
+        """
+        with self._lock:
+            return {
+                'echoes': self.echoes,
+                'rejected': self.rejected,
+                'encodings': {encoding: _summarize(histograms)
+                              for encoding, histograms in self.by_encoding.items()},
+                'clients': {sid: dict(encoding=self._client_encodings[sid], **_summarize(histograms))
+                            for sid, histograms in self.by_client.items()},
+            }
+
+    def quantile_samples(self, labels: Dict[str, str],
+                         quantiles: Tuple[float, ...] = (0.5, 0.99)) -> List[Tuple[Dict[str, str], float]]:
+        """
+        Return the latency quantiles by encoding and component for format_metric.
+
+        Args:
+            labels: Labels added to every sample, e.g. the namespace
+            quantiles: Fractions between 0 and 1
+
+        Returns:
+            List[Tuple[Dict[str, str], float]]: (labels, seconds) pairs
+        """
+        samples = []
+        with self._lock:
+            for encoding, histograms in sorted(self.by_encoding.items()):
+                for component, histogram in histograms.items():
+                    for quantile, value in zip(quantiles, histogram.quantiles(quantiles)):
+                        samples.append((dict(labels, encoding=encoding, component=component,
+                                             quantile=f'{quantile:g}'), value / 1e9))
+        return samples
@@ -0,0 +1,372 @@
+import os
+import time
+import logging
+import threading
+import multiprocessing
+from typing import Any, Dict, Optional, Set
+
+import startup_profile
+
+# Show every overlay window from one host process instead of one process each
+HOST_MODE = os.environ.get('RAH_OVERLAY_HOST', 'false').lower() == 'true'
+
+# Same reasoning as the window pool: never fork from a server thread
+_context = multiprocessing.get_context('spawn')
+
+
+class OverlayHost:
+    """
+    Owns every overlay window of the application in a single process.
+
+    Commands arrive over a pipe and are answered on it with ``('reply',
+    value)``; a window closed by the user is reported unasked with
+    ``('closed', window_id)``. pywebview needs a
+    window before webview.start and ends its GUI loop with the last window,
+    so the host keeps a hidden window open for its whole life. Overlay
+    windows are then created and destroyed from the command thread while the
+    loop runs, which pywebview supports.
+    """
+
+    def __init__(self, conn: Any) -> None:
+        """
+        Initialize the host.
+
+        Args:
+            conn: Host end of the command pipe
+        """
+        self.conn = conn
+        self._lock = threading.Lock()
+        # Replies come from the command thread, closed events from the GUI thread
+        self._send_lock = threading.Lock()
+        self._windows: Dict[int, Any] = {}
+        self._keeper: Any = None
+
+    def run(self) -> None:
+        """Run the GUI loop and serve commands until ``quit`` or the pipe closes."""
+        # Only the host process loads the GUI toolkit, not the web server
+        import webview
+        startup_profile.log_report('overlay host ready')
+
+        self._keeper = webview.create_window('RAH Overlay Host', html='<html></html>', hidden=True)
+        try:
+            webview.start(self._serve, gui='edgechromium', debug=False)
+        except Exception as e:
+            logging.error(f"Error in overlay host GUI loop: {e}")
+
+    def _serve(self) -> None:
+        """Command thread: read a command, execute it, send the reply."""
+        while True:
+            try:
+                command, *args = self.conn.recv()
+            except (EOFError, OSError):
+                break
+            if command == 'quit':
+                break
+            try:
+                reply = getattr(self, f'_cmd_{command}')(*args)
+            except Exception as e:
+                logging.error(f"Overlay host command {command} failed: {e}")
+                reply = None
+            if not self._send('reply', reply):
+                break
+
+        self._close_all()
+        self._keeper.destroy()
+
+    def _send(self, *message: Any) -> bool:
+        """Send a message to the client, False if the pipe is closed."""
+        try:
+            with self._send_lock:
+                self.conn.send(message)
+            return True
+        except (EOFError, OSError):
+            return False
+
+    def _cmd_open(self, window_id: int, request: Dict[str, Any]) -> int:
+        """Create an overlay window, returns its id."""
+        from overlay_window import OverlayWindow
+
+        overlay_window = OverlayWindow(
+            request['url'],
+            width=request['resolution']['width'],
+            height=request['resolution']['height'],
+            transparent=request['transparent'],
+            on_top=True,
+            in_place=request.get('in_place', False)
+        )
+        if request.get('folder_name'):
+            overlay_window.set_folder_name(request['folder_name'])
+        if request.get('position'):
+            overlay_window.position = request['position']
+        overlay_window.requested_at = request.get('requested_at')
+        overlay_window.set_on_closed(lambda: self._forget(window_id))
+
+        with self._lock:
+            self._windows[window_id] = overlay_window
+        overlay_window.open_window()
+        return window_id
+
+    def _cmd_close(self, window_id: int) -> bool:
+        """Close an overlay window."""
+        with self._lock:
+            overlay_window = self._windows.pop(window_id, None)
+        if overlay_window is None:
+            return False
+        if overlay_window.window is not None and not overlay_window.window_closed.is_set():
+            overlay_window.window.destroy()
+        return True
+
+    def _cmd_move(self, window_id: int, x: int, y: int) -> bool:
+        """Move an overlay window, coordinates are in physical pixels."""
+        with self._lock:
+            overlay_window = self._windows.get(window_id)
+        if overlay_window is None:
+            return False
+        overlay_window.set_position(x, y)
+        return True
+
+    def _cmd_mode(self, window_id: int, positioning: bool) -> bool:
+        """Switch an in-place window between positioning and transparent mode."""
+        with self._lock:
+            overlay_window = self._windows.get(window_id)
+        if overlay_window is None:
+            return False
+        overlay_window.set_positioning(positioning)
+        return True
+
+    def _cmd_stats(self) -> Dict[int, Dict[str, Any]]:
+        """Return the JS bridge counters of every open window by id."""
+        with self._lock:
+            windows = dict(self._windows)
+        return {window_id: overlay_window.bridge_stats() for window_id, overlay_window in windows.items()}
+
+    def _forget(self, window_id: int) -> None:
+        """Closed event of a window, tells the client unless it closed the window itself."""
+        with self._lock:
+            closed = self._windows.pop(window_id, None) is not None
+        if closed:
+            self._send('closed', window_id)
+
+    def _close_all(self) -> None:
+        """Close every overlay window."""
+        with self._lock:
+            window_ids = list(self._windows)
+        for window_id in window_ids:
+            self._cmd_close(window_id)
+
+
+def _host_main(conn: Any, parent_conn: Any) -> None:
+    """Entry point of the host process."""
+    parent_conn.close()
+    OverlayHost(conn).run()
+
+
+class HostedWindow:
+    """
+    Handle of a window shown by the overlay host.
+
+    Has the subset of the multiprocessing.Process interface the interface
+    uses on its overlay processes, so both can be kept in opened_overlays.
+    """
+
+    def __init__(self, client: 'OverlayHostClient', window_id: int) -> None:
+        self.client = client
+        self.window_id = window_id
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.client.pid
+
+    def is_alive(self) -> bool:
+        # Answered from the client's state, no round trip to the host
+        return self.client.is_open(self.window_id)
+
+    def terminate(self) -> None:
+        self.client.close(self.window_id)
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.is_alive():
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+            time.sleep(0.02)
+
+    def move(self, x: int, y: int) -> bool:
+        return self.client.move(self.window_id, x, y)
+
+    def set_positioning(self, enabled: bool) -> bool:
+        return self.client.set_positioning(self.window_id, enabled)
+
+    def bridge_stats(self) -> Optional[Dict[str, Any]]:
+        return (self.client.bridge_stats() or {}).get(self.window_id)
+
+
+class OverlayHostClient:
+    """
+    Controls the overlay host process from the web server.
+
+    Every call is a synchronous request and reply over the pipe. The host is
+    started on the first open and restarted if it died. The ids of the open
+    windows are kept here, updated from the replies and from the closed
+    events the host sends, so checking a window needs no round trip.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._process: Optional[multiprocessing.Process] = None
+        self._conn: Any = None
+        self._next_id = 0
+        self._open: Set[int] = set()
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self._process.pid if self._process is not None else None
+
+    def _ensure_running(self) -> None:
+        """Start the host process if it is not running, the caller holds the lock."""
+        if self._process is not None and self._process.is_alive():
+            return
+        if self._conn is not None:
+            self._conn.close()
+        parent_conn, child_conn = _context.Pipe()
+        self._process = _context.Process(target=_host_main, args=(child_conn, parent_conn),
+                                         name='overlay-host')
+        self._process.daemon = True
+        self._process.start()
+        child_conn.close()
+        self._conn = parent_conn
+        self._open.clear()
+        logging.info(f"Started overlay host process {self._process.pid}")
+
+    def start(self) -> None:
+        """Start the host ahead of the first overlay."""
+        with self._lock:
+            self._ensure_running()
+
+    def _call(self, *command: Any) -> Any:
+        """Send a command and wait for the reply, None if the host is gone."""
+        with self._lock:
+            if command[0] == 'open':
+                self._ensure_running()
+            elif self._process is None or not self._process.is_alive():
+                return None
+            try:
+                self._conn.send(command)
+                while True:
+                    kind, value = self._conn.recv()
+                    if kind == 'reply':
+                        return value
+                    self._handle_event(kind, value)
+            except (EOFError, OSError) as e:
+                logging.error(f"Lost the overlay host process: {e}")
+                self._open.clear()
+                return None
+
+    def _handle_event(self, kind: str, value: Any) -> None:
+        """Apply a message the host sent unasked, the caller holds the lock."""
+        if kind == 'closed':
+            self._open.discard(value)
+
+    def _drain_events(self) -> None:
+        """Apply the events already waiting in the pipe, the caller holds the lock."""
+        try:
+            while self._conn.poll():
+                self._handle_event(*self._conn.recv())
+        except (EOFError, OSError):
+            self._open.clear()
+
+    def open(self, url: str, resolution: Dict[str, int], transparent: bool = True,
+             position: Optional[Dict[str, int]] = None,
+             folder_name: Optional[str] = None, in_place: bool = False) -> HostedWindow:
+        """
+        Show an overlay window in the host process.
+
+        Args:
+            url: URL of the overlay page
+            resolution: Window width and height
+            transparent: Create a transparent, click-through window
+            position: Saved window position
+            folder_name: Overlay folder name
+            in_place: Switch between positioning and transparent mode in place
+
+        Returns:
+            HostedWindow: Handle of the window
+        """
+        with self._lock:
+            self._next_id += 1
+            window_id = self._next_id
+        opened = self._call('open', window_id, {
+            'url': url,
+            'resolution': resolution,
+            'transparent': transparent,
+            'position': position,
+            'folder_name': folder_name,
+            'requested_at': time.time(),
+            'in_place': in_place,
+        })
+        if opened == window_id:
+            with self._lock:
+                self._open.add(window_id)
+        return HostedWindow(self, window_id)
+
+    def close(self, window_id: int) -> bool:
+        """Close a window, True if it was open."""
+        closed = bool(self._call('close', window_id))
+        with self._lock:
+            self._open.discard(window_id)
+        return closed
+
+    def move(self, window_id: int, x: int, y: int) -> bool:
+        """Move a window, True if it is open."""
+        return bool(self._call('move', window_id, x, y))
+
+    def set_positioning(self, window_id: int, enabled: bool) -> bool:
+        """Switch an in-place window's mode, True if it is open."""
+        return bool(self._call('mode', window_id, enabled))
+
+    def bridge_stats(self) -> Optional[Dict[int, Dict[str, Any]]]:
+        """Return the JS bridge counters of every open window by id, None if the host is gone."""
+        return self._call('stats')
+
+    def is_open(self, window_id: int) -> bool:
+        """Check whether a window is still open, from the state kept here."""
+        with self._lock:
+            if self._process is None or not self._process.is_alive():
+                return False
+            self._drain_events()
+            return window_id in self._open
+
+    def shutdown(self) -> None:
+        """Close every window and stop the host."""
+        with self._lock:
+            if self._process is None:
+                return
+            try:
+                self._conn.send(('quit',))
+            except (EOFError, OSError):
+                pass
+            self._process.join(timeout=2)
+            if self._process.is_alive():
+                self._process.terminate()
+            self._conn.close()
+            self._process = None
+            self._conn = None
+            self._open.clear()
+
+
+_client: Optional[OverlayHostClient] = None
+_client_lock = threading.Lock()
+
+
+def get_overlay_host() -> OverlayHostClient:
+    """
+    Return the client of this process's overlay host.
+
+    Returns:
+        OverlayHostClient: The shared client, created on first use
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = OverlayHostClient()
+        return _client
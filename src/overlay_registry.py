@@ -0,0 +1,278 @@
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from properties_writer import DebouncedJsonWriter
+
+# Default port of the web server, used to build the overlay URLs
+OVERLAY_BASE_URL = "http://127.0.0.1:8085/overlay"
+
+
+def resource_path(relative_path: str) -> str:
+    """
+    Get absolute path to resource, works for dev and for PyInstaller.
+
+    Args:
+        relative_path: The relative path to the resource
+
+    Returns:
+        The absolute path to the resource
+    """
+    try:
+        base_path = sys._MEIPASS
+    except Exception:
+        base_path = os.path.abspath(os.path.dirname(__file__))
+    return os.path.join(base_path, relative_path)
+
+
+class OverlayRegistry:
+    """
+    In-memory index of the overlays folder.
+
+    The folder is scanned once and every overlay's properties.json is read
+    once. Lookups by folder name or display name are dict hits after that.
+    At most every ``check_interval`` seconds a lookup compares the mtimes of
+    the folder and of every properties.json with the ones seen at load time
+    and rescans if anything changed on disk. Property updates made through
+    the registry apply to the cache at once and are written back by a
+    DebouncedJsonWriter, off the request thread and atomically.
+    """
+
+    def __init__(self, overlays_dir: str, check_interval: float = 2.0) -> None:
+        """
+        Initialize the registry, the folder is scanned on first use.
+
+        Args:
+            overlays_dir: Path of the overlays folder
+            check_interval: Minimum seconds between two mtime checks
+        """
+        self.overlays_dir = overlays_dir
+        self.check_interval = check_interval
+        self._lock = threading.RLock()
+        self._by_folder: Dict[str, Dict[str, Any]] = {}
+        self._by_display_name: Dict[str, Dict[str, Any]] = {}
+        self._stamp: Optional[Tuple[Any, ...]] = None
+        self._checked_at = 0.0
+        self.load_count = 0
+        self.writer = DebouncedJsonWriter(on_written=self._written)
+
+    def _properties_path(self, folder_name: str) -> str:
+        return os.path.join(self.overlays_dir, folder_name, 'properties.json')
+
+    def _scan_stamp(self) -> Tuple[Any, ...]:
+        """Collect the mtimes that invalidate the cache."""
+        stamp: List[Any] = [os.stat(self.overlays_dir).st_mtime_ns]
+        for folder_name in sorted(self._by_folder):
+            try:
+                stamp.append(os.stat(self._properties_path(folder_name)).st_mtime_ns)
+            except OSError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def _preview_gif(self, folder_name: str, properties: Dict[str, Any]) -> Optional[str]:
+        """Find the preview animation of an overlay."""
+        preview_gif = properties.get('preview_gif', None)
+        if preview_gif:
+            return preview_gif
+
+        overlay_path = os.path.join(self.overlays_dir, folder_name)
+        if os.path.exists(os.path.join(overlay_path, 'static', 'images', 'preview.gif')):
+            return f"/overlay/{folder_name}/static/images/preview.gif"
+        if os.path.exists(os.path.join(overlay_path, 'static', 'preview.gif')):
+            return f"/overlay/{folder_name}/static/preview.gif"
+        return None
+
+    def _load_entry(self, folder_name: str) -> Dict[str, Any]:
+        """Read everything known about one overlay folder."""
+        overlay_path = os.path.join(self.overlays_dir, folder_name)
+        properties_path = self._properties_path(folder_name)
+        properties: Optional[Dict[str, Any]] = None
+        if os.path.exists(properties_path):
+            try:
+                with open(properties_path, 'r') as properties_file:
+                    properties = json.load(properties_file)
+            except (OSError, ValueError) as e:
+                logging.error(f"Cannot read properties of overlay {folder_name}: {e}")
+
+        return {
+            'folder_name': folder_name,
+            'display_name': (properties or {}).get('display_name', folder_name),
+            'properties': properties,
+            'has_page': os.path.exists(os.path.join(overlay_path, f'{folder_name}.html')),
+            'preview_gif': self._preview_gif(folder_name, properties) if properties is not None else None,
+        }
+
+    def reload(self) -> None:
+        """Rescan the overlays folder and reread every properties.json."""
+        with self._lock:
+            by_folder: Dict[str, Dict[str, Any]] = {}
+            try:
+                for name in sorted(os.listdir(self.overlays_dir)):
+                    if os.path.isdir(os.path.join(self.overlays_dir, name)) and not name.startswith('__'):
+                        by_folder[name] = self._load_entry(name)
+            except OSError as e:
+                logging.error(f"Error scanning overlays directory: {e}")
+
+            self._by_folder = by_folder
+            self._by_display_name = {entry['display_name']: entry for entry in by_folder.values()
+                                     if entry['properties'] is not None}
+            self._stamp = self._scan_stamp()
+            self._checked_at = time.monotonic()
+            self.load_count += 1
+            logging.debug(f"Overlay registry loaded: {list(by_folder)}")
+
+    def _ensure_fresh(self) -> None:
+        """Load on first use, then reload if the files changed on disk."""
+        if self._stamp is None:
+            self.reload()
+            return
+
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval or self.writer.pending:
+            # Files with pending updates are stale on disk, not in the cache
+            return
+        with self._lock:
+            self._checked_at = now
+            try:
+                changed = self._scan_stamp() != self._stamp
+            except OSError:
+                changed = True
+            if changed:
+                self.reload()
+
+    def folder_names(self, with_page: bool = False) -> List[str]:
+        """
+        Return the folder name of every overlay.
+
+        Args:
+            with_page: Only overlays that have an ``<name>.html`` page
+
+        Returns:
+            List[str]: Folder names
+        """
+        self._ensure_fresh()
+        return [name for name, entry in self._by_folder.items() if entry['has_page'] or not with_page]
+
+    def has_page(self, folder_name: str) -> bool:
+        """Check whether an overlay folder has its ``<name>.html`` page."""
+        self._ensure_fresh()
+        entry = self._by_folder.get(folder_name)
+        return bool(entry and entry['has_page'])
+
+    def folder_for(self, display_name: str) -> Optional[str]:
+        """
+        Map a display name to the overlay folder name.
+
+        Args:
+            display_name: The display_name from properties.json
+
+        Returns:
+            Optional[str]: The folder name, None if unknown
+        """
+        self._ensure_fresh()
+        entry = self._by_display_name.get(display_name)
+        return entry['folder_name'] if entry else None
+
+    def display_name_for(self, folder_name: str) -> Optional[str]:
+        """Map an overlay folder name to its display name, None if unknown."""
+        self._ensure_fresh()
+        entry = self._by_folder.get(folder_name)
+        return entry['display_name'] if entry and entry['properties'] is not None else None
+
+    def properties(self, folder_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Return a copy of an overlay's properties.json.
+
+        Args:
+            folder_name: Overlay folder name
+
+        Returns:
+            Optional[Dict[str, Any]]: The properties, None if the overlay has none
+        """
+        self._ensure_fresh()
+        entry = self._by_folder.get(folder_name)
+        if entry is None or entry['properties'] is None:
+            return None
+        return dict(entry['properties'])
+
+    def list_overlays(self) -> List[Dict[str, Any]]:
+        """
+        Describe every overlay with a properties.json for the interface.
+
+        Returns:
+            List[Dict[str, Any]]: Display name, folder, description, URL,
+                position, DPI info and preview of every overlay
+        """
+        self._ensure_fresh()
+        overlays = []
+        for entry in self._by_folder.values():
+            properties = entry['properties']
+            if properties is None:
+                continue
+            overlays.append({
+                'display_name': entry['display_name'],
+                'folder_name': entry['folder_name'],
+                'description': properties.get('description', 'No description available.'),
+                'url': f"{OVERLAY_BASE_URL}/{entry['folder_name']}",
+                'position': properties.get('position', None),
+                'dpi_info': properties.get('dpi_info', {'scale': 1.0}),
+                'preview_gif': entry['preview_gif'],
+            })
+        return overlays
+
+    def update_properties(self, folder_name: str, updates: Dict[str, Any]) -> bool:
+        """
+        Merge values into an overlay's properties and schedule the write-back.
+
+        Args:
+            folder_name: Overlay folder name
+            updates: Top-level keys to set
+
+        Returns:
+            bool: True if the overlay exists and the update was accepted
+        """
+        self._ensure_fresh()
+        with self._lock:
+            entry = self._by_folder.get(folder_name)
+            if entry is None or entry['properties'] is None:
+                logging.error(f"Could not find properties file for {folder_name}")
+                return False
+
+            properties = {**entry['properties'], **updates}
+            entry['properties'] = properties
+            self.writer.schedule(self._properties_path(folder_name), properties)
+            return True
+
+    def flush(self) -> None:
+        """Write pending property updates now."""
+        self.writer.flush()
+
+    def _written(self, path: str) -> None:
+        """Our own write-back must not look like an external change."""
+        with self._lock:
+            try:
+                self._stamp = self._scan_stamp()
+            except OSError:
+                self._stamp = None
+
+
+_registry: Optional[OverlayRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_overlay_registry() -> OverlayRegistry:
+    """
+    Return the registry of the application's overlays folder.
+
+    Returns:
+        OverlayRegistry: The shared registry, created on first use
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = OverlayRegistry(resource_path('overlays'))
+        return _registry
@@ -7,6 +7,14 @@ import ctypes
 import logging
 import os
 
+# Minimum seconds between two position updates pushed to the page while dragging
+POSITION_PUSH_DELAY = 0.1
+
+# Win32 extended window styles used for click-through
+GWL_EXSTYLE = -20
+WS_EX_LAYERED = 0x00080000
+WS_EX_TRANSPARENT = 0x00000020
+
 def get_windows_dpi_scaling():
     """Get the Windows DPI scaling factor.
     
@@ -57,7 +65,7 @@ class OverlayWindow:
     for telemetry overlays.
     """
     
-    def __init__(self, url, width, height, frameless=True, transparent=False, on_top=False):
+    def __init__(self, url, width, height, frameless=True, transparent=False, on_top=False, in_place=False):
         """Initialize the overlay window.
         
         Args:
@@ -66,6 +74,8 @@ class OverlayWindow:
             height (int): Window height
             frameless (bool): Whether to create a window without frame
             transparent (bool): Whether to create a transparent window
+            in_place (bool): Always create a transparent window and switch
+                between positioning and click-through mode with set_positioning
         """
         self.url = url
         self.window = None
@@ -74,14 +84,22 @@ class OverlayWindow:
         self.frameless = frameless
         self.transparent = transparent
         self.on_top = on_top
+        self.in_place = in_place
+        self.positioning = not transparent
         self.on_closed = None
         self.position = None
         self.folder_name = None  
-        self.position_tracker_thread = None
         self.position_offset = {'x': 0, 'y': 0} 
+        self._move_lock = threading.Lock()
+        self._move_timer = None
+        self._pushed_position = None
+        self.bridge_calls = 0
+        self._bridge_read_calls = 0
+        self._bridge_read_at = time.monotonic()
         self.dpi_scale = get_windows_dpi_scaling() 
         logging.info(f"Windows DPI scaling detected: {self.dpi_scale}")
         self.window_closed = threading.Event()
+        self.requested_at = None
 
     def set_folder_name(self, folder_name):
         """Set the folder name for position reporting.
@@ -105,24 +123,101 @@ class OverlayWindow:
         This initializes the webview window with the configured settings and
         starts position tracking if appropriate.
         """
+        try:
+            self.open_window()
+            webview.start(gui='edgechromium', debug=False)
+        except Exception as e:
+            logging.error(f"Error creating overlay window: {e}")
+    
+    def open_window(self):
+        """Create the webview window without starting the GUI loop.
+        
+        Before webview.start the window is shown once the loop starts, after
+        it the window is shown right away. This lets one process own several
+        overlay windows.
+        
+        Returns:
+            webview.Window: The created window
+        """
         self.window_closed.clear()
         adjusted_position = self._calculate_dpi_adjusted_position()
         window_args = self._prepare_window_arguments(adjusted_position)
         
-        try:
-            self.window = webview.create_window(**window_args)
-            
-            if self.on_closed:
-                self.window.events.closed += self.on_closed_handler
-                
-            if not self.transparent and self.folder_name:
-                # Load external JS files after window is loaded
-                self.window.events.loaded += self.inject_scripts
-                self._start_position_tracking()
+        self.window = webview.create_window(**window_args)
+        
+        # Always tracked, the position tracker and hosts rely on window_closed
+        self.window.events.closed += self.on_closed_handler
+        
+        if self.in_place:
+            self.window.events.shown += self._apply_click_through
+        
+        if self.requested_at is not None:
+            self.window.events.loaded += self._log_launch_latency
             
-            webview.start(gui='edgechromium', debug=False)
+        if self.folder_name and (self.positioning or self.in_place):
+            # Load external JS files after window is loaded
+            self.window.events.loaded += self.inject_scripts
+            self._start_position_tracking()
+        
+        return self.window
+    
+    def set_positioning(self, enabled):
+        """Switch an in-place window between positioning and click-through mode.
+        
+        The window is kept, only the page state and the window's hit testing
+        change, so the overlay keeps its socket connection and its data.
+        
+        Args:
+            enabled (bool): True for positioning mode, False for transparent
+                click-through mode
+        """
+        self.positioning = enabled
+        if not self.window or self.window_closed.is_set():
+            return
+        
+        self._set_click_through(not enabled)
+        if enabled:
+            self._inject_dpi_scale_info()
+            self._update_position_in_window(force=True)
+        self._evaluate_js(
+            "if (typeof setPositioningMode === 'function') { setPositioningMode(%s, %s); }"
+            % ('true' if enabled else 'false', json.dumps(self.folder_name))
+        )
+        logging.info(f"Overlay {self.folder_name} switched to {'positioning' if enabled else 'transparent'} mode")
+    
+    def _apply_click_through(self):
+        """Apply the initial mode's hit testing once the window exists."""
+        self._set_click_through(not self.positioning)
+    
+    def _set_click_through(self, enabled):
+        """Let mouse input pass through the window to whatever is below it.
+        
+        Uses the WS_EX_TRANSPARENT extended style, only supported on Windows.
+        
+        Args:
+            enabled (bool): Whether clicks pass through
+        """
+        if sys.platform != 'win32' or not self.window:
+            return
+        
+        try:
+            hwnd = self.window.native.Handle.ToInt64()
+            user32 = ctypes.windll.user32
+            style = user32.GetWindowLongW(hwnd, GWL_EXSTYLE)
+            if enabled:
+                style |= WS_EX_LAYERED | WS_EX_TRANSPARENT
+            else:
+                style &= ~WS_EX_TRANSPARENT
+            user32.SetWindowLongW(hwnd, GWL_EXSTYLE, style)
         except Exception as e:
-            logging.error(f"Error creating overlay window: {e}")
+            logging.error(f"Error changing click-through of {self.folder_name}: {e}")
+    
+    def _log_launch_latency(self):
+        """Log the time from the launch request to the first loaded page."""
+        if self.requested_at is not None:
+            elapsed = (time.time() - self.requested_at) * 1000
+            logging.info(f"Overlay {self.folder_name} loaded {elapsed:.0f} ms after the launch request")
+            self.requested_at = None
     
     def _calculate_dpi_adjusted_position(self):
         """Calculate DPI-adjusted position for the window.
@@ -155,7 +250,7 @@ class OverlayWindow:
             "width": self.width,
             "height": self.height,
             "frameless": self.frameless,
-            "transparent": self.transparent,
+            "transparent": self.transparent or self.in_place,
             "on_top": self.on_top,
             "easy_drag": True,
             "min_size": (200, 100),
@@ -170,29 +265,73 @@ class OverlayWindow:
         return window_args
     
     def _start_position_tracking(self):
-        """Start the position tracking thread."""
-        self.position_tracker_thread = threading.Thread(target=self.track_window_position)
-        self.position_tracker_thread.daemon = True
-        self.position_tracker_thread.start()
+        """Push the window position to the page whenever the window moves."""
+        self.window.events.moved += self._on_moved
+        self.window.events.loaded += self._push_initial_position
+    
+    def _push_initial_position(self):
+        """Expose the DPI scale and the starting position to a freshly loaded page."""
+        self._pushed_position = None
+        if self.positioning:
+            self._inject_dpi_scale_info()
+            self._update_position_in_window()
     
-    def track_window_position(self):
-        """Continuously track window position and expose it to the window."""
-        if not self.window:
+    def _on_moved(self, x=None, y=None):
+        """Moved event, pushes are throttled to one per POSITION_PUSH_DELAY."""
+        if not self.positioning or self.window_closed.is_set():
+            return
+        with self._move_lock:
+            if self._move_timer is not None:
+                return
+            # The timer reads the position when it fires, so the last move of
+            # a drag is always pushed
+            self._move_timer = threading.Timer(POSITION_PUSH_DELAY, self._push_moved_position)
+            self._move_timer.daemon = True
+            self._move_timer.start()
+    
+    def _push_moved_position(self):
+        """Timer callback of _on_moved."""
+        with self._move_lock:
+            self._move_timer = None
+        if self.window_closed.is_set():
             return
-            
         try:
-            time.sleep(1)
-            self._inject_dpi_scale_info()
-            
-            while self.window and not self.window_closed.is_set():
-                try:
-                    self._update_position_in_window()
-                except Exception as e:
-                    logging.error(f"Error updating position in JavaScript: {e}")
-                    
-                time.sleep(0.1)
+            self._update_position_in_window()
         except Exception as e:
-            logging.error(f"Error in position tracker thread: {e}")
+            logging.error(f"Error updating position in JavaScript: {e}")
+    
+    def _evaluate_js(self, script):
+        """Run a script in the page and count the bridge call.
+        
+        Args:
+            script (str): JavaScript to run
+            
+        Returns:
+            The result of the script
+        """
+        self.bridge_calls += 1
+        return self.window.evaluate_js(script)
+
+    def bridge_stats(self):
+        """Return the JS bridge call counters of this window.
+        
+        The rate covers the time since the previous read, so an idle window
+        reports 0 instead of its last busy second.
+        
+        Returns:
+            dict: Folder name, total bridge calls and calls per second
+        """
+        now = time.monotonic()
+        calls = self.bridge_calls
+        elapsed = now - self._bridge_read_at
+        rate = (calls - self._bridge_read_calls) / elapsed if elapsed > 0 else 0.0
+        self._bridge_read_calls = calls
+        self._bridge_read_at = now
+        return {
+            'folder_name': self.folder_name,
+            'bridge_calls': calls,
+            'bridge_calls_per_second': round(rate, 2)
+        }
     
     def _inject_dpi_scale_info(self):
         """Inject DPI scale information into the window."""
@@ -203,14 +342,21 @@ class OverlayWindow:
         window.pywebview.dpiScale = {self.dpi_scale};
         console.log("DPI Scale:", {self.dpi_scale});
         """
-        self.window.evaluate_js(js_dpi)
+        self._evaluate_js(js_dpi)
     
-    def _update_position_in_window(self):
-        """Update the window position in JavaScript."""
+    def _update_position_in_window(self, force=False):
+        """Update the window position in JavaScript if it changed.
+        
+        Args:
+            force (bool): Push even if the page already has this position
+        """
         x, y = self.window.x, self.window.y
         
         scaled_x = int(x * self.dpi_scale)
         scaled_y = int(y * self.dpi_scale)
+        if not force and self._pushed_position == (scaled_x, scaled_y):
+            return
+        self._pushed_position = (scaled_x, scaled_y)
         
         js = f"""
         if (!window.pywebview) {{
@@ -226,7 +372,7 @@ class OverlayWindow:
             updatePositionDisplay({scaled_x}, {scaled_y}, {self.dpi_scale});
         }}
         """
-        self.window.evaluate_js(js)
+        self._evaluate_js(js)
     
     def _load_external_js_files(self):
         """Load the external JavaScript files into the window."""
@@ -266,17 +412,13 @@ class OverlayWindow:
         ], function() {
             // Call initializers after all scripts are loaded
             console.log('All scripts loaded, initializing...');
-            if (typeof initPositioningMode === 'function') {
-                initPositioningMode();
-            }
-            
-            if (typeof initPositionReporter === 'function') {
-                initPositionReporter('%s');
+            if (typeof setPositioningMode === 'function') {
+                setPositioningMode(%s, '%s');
             }
         });
-        """ % (js_files[0], js_files[1], self.folder_name)
+        """ % (js_files[0], js_files[1], 'true' if self.positioning else 'false', self.folder_name)
         
-        self.window.evaluate_js(js_loader)
+        self._evaluate_js(js_loader)
 
     def inject_scripts(self):
         """Inject all necessary JavaScript files and initialize them."""
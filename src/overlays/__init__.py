@@ -1,7 +1,11 @@
-from flask import Blueprint, render_template, send_from_directory, Response
+from flask import Blueprint, render_template, send_from_directory, request, Response
 import os
 import sys
 
+from overlay_registry import get_overlay_registry
+from static_assets import get_static_assets
+from page_cache import PageCache
+
 def resource_path(relative_path):
     """Get absolute path to resource, works for dev and for PyInstaller"""
     try:
@@ -17,21 +21,28 @@ overlays_bp = Blueprint(
     static_folder=None 
 )
 
+page_cache = PageCache()
+
 @overlays_bp.route('/<overlay_name>')
 def serve_overlay(overlay_name):
-    html_file_path = os.path.join(resource_path('overlays'), overlay_name, f'{overlay_name}.html')
-    if os.path.exists(html_file_path):
-        # Render the template with transparency support
-        rendered_html = render_template(f'{overlay_name}/{overlay_name}.html')
+    if get_overlay_registry().has_page(overlay_name):
+        template = f'{overlay_name}/{overlay_name}.html'
+        page = page_cache.get(overlay_name, os.path.join(resource_path('overlays'), template),
+                              lambda: render_template(template))
         
         # Return with appropriate headers
-        response = Response(rendered_html)
+        response = Response(page.body)
         response.headers['Content-Type'] = 'text/html; charset=utf-8'
-        return response
+        response.set_etag(page.etag)
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
     else:
         return "Overlay not found", 404
 
 @overlays_bp.route('/<overlay_name>/static/<path:filename>')
 def serve_static(overlay_name, filename):
+    assets = get_static_assets()
+    if assets.get(f'overlays/{overlay_name}', filename) is not None:
+        return assets.send(f'overlays/{overlay_name}', filename)
     static_folder = os.path.join(resource_path('overlays'), overlay_name, 'static')
     return send_from_directory(static_folder, filename)
\ No newline at end of file
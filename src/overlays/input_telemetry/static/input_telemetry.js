@@ -1,5 +1,6 @@
 document.addEventListener("DOMContentLoaded", function() {
     var socket = io('/input_telemetry', {
+        query: { encoding: 'delta' },
         reconnection: true,
         reconnectionAttempts: Infinity,
         reconnectionDelay: 1000,
@@ -19,6 +20,8 @@ document.addEventListener("DOMContentLoaded", function() {
     let throttleData = [];
     let brakeData = [];
     let clutchData = [];
+    let latestInputs = null;
+    let lastTick = null;
 
     socket.on('connect', function() {
         console.log("Connected to telemetry namespace");
@@ -26,9 +29,31 @@ document.addEventListener("DOMContentLoaded", function() {
         clearTimeout(reconnectTimer);
     });
 
-    socket.on('telemetry_update', function(data) {
-        console.log("Received telemetry update");
-        updateTelemetryData(data);
+    // Only changed fields are sent, the stream rebuilds the full payload
+    subscribeDeltaStream(socket, 'telemetry_update', updateTelemetryData);
+
+    // Recent inputs kept by the server, so a reloaded overlay does not
+    // start with an empty graph
+    socket.on('telemetry_history', function(history) {
+        if (!history || !history.values || !history.count) return;
+
+        const toPercent = (buffer) => {
+            if (!buffer) return [];
+            const values = Array.from(new Float32Array(buffer)).slice(-canvas.width);
+            return values.map(value => Math.max(0, Math.min(1, value)) * 100);
+        };
+
+        throttleData = toPercent(history.values.throttle);
+        brakeData = toPercent(history.values.brake);
+        clutchData = toPercent(history.values.clutch);
+        if (history.tick && history.tick.length) {
+            lastTick = history.tick[history.tick.length - 1];
+            latestInputs = {
+                throttle: throttleData[throttleData.length - 1],
+                brake: brakeData[brakeData.length - 1],
+                clutch: clutchData[clutchData.length - 1]
+            };
+        }
     });
 
     // Handle heartbeats to ensure connection is alive
@@ -39,6 +64,7 @@ document.addEventListener("DOMContentLoaded", function() {
     socket.on('disconnect', function() {
         console.log("Disconnected from telemetry namespace");
         isConnected = false;
+        lastTick = null;
         
         // Try to reconnect manually if socket.io reconnection fails
         reconnectTimer = setTimeout(function() {
@@ -61,7 +87,7 @@ document.addEventListener("DOMContentLoaded", function() {
         console.log("Reconnected after", attemptNumber, "attempts");
     });
 
-    function updateTelemetryData(data) {
+    function updateTelemetryData(data, tick) {
         // Validate input data
         if (!data || typeof data !== 'object') {
             console.error('Invalid telemetry data received:', data);
@@ -93,15 +119,38 @@ document.addEventListener("DOMContentLoaded", function() {
         let steeringAngleDegrees = -steeringAngleRadians * (180 / Math.PI);
         steeringWheelImage.style.transform = `rotate(${steeringAngleDegrees}deg)`;
 
-        // Update graph data with validation
-        throttleData.push(throttleValue * 100);
-        brakeData.push(brakeValue * 100);
-        clutchData.push(clutchValue * 100);
+        sampleGraph(tick, {
+            throttle: throttleValue * 100,
+            brake: brakeValue * 100,
+            clutch: clutchValue * 100
+        });
+    }
+
+    function sampleGraph(tick, inputs) {
+        // One graph sample per sim tick, like the server's history. Ticks
+        // the server did not send (unchanged inputs, emit rate limit) repeat
+        // the previous values.
+        if (latestInputs && tick !== null && lastTick !== null && tick > lastTick) {
+            const skipped = Math.min(tick - lastTick - 1, canvas.width);
+            for (let i = 0; i < skipped; i++) {
+                pushSample(latestInputs);
+            }
+        }
+        pushSample(inputs);
+        latestInputs = inputs;
+        lastTick = tick;
+    }
+
+    function pushSample(inputs) {
+        throttleData.push(inputs.throttle);
+        brakeData.push(inputs.brake);
+        clutchData.push(inputs.clutch);
 
         if (throttleData.length > canvas.width) {
-            throttleData.shift();
-            brakeData.shift();
-            clutchData.shift();
+            const excess = throttleData.length - canvas.width;
+            throttleData.splice(0, excess);
+            brakeData.splice(0, excess);
+            clutchData.splice(0, excess);
         }
     }
 
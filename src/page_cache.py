@@ -0,0 +1,98 @@
+import os
+import time
+import hashlib
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+from static_assets import get_static_assets
+
+# Render every request instead of caching, for editing overlays
+DEV_MODE = os.environ.get('RAH_DEV_MODE', 'false').lower() == 'true'
+
+
+class RenderedPage:
+    """The rendered bytes of a page and what they were rendered from."""
+
+    def __init__(self, body: bytes, stamp: Optional[Tuple[int, int]], assets_version: int) -> None:
+        self.body = body
+        self.etag = hashlib.sha256(body).hexdigest()[:16]
+        self.stamp = stamp
+        self.assets_version = assets_version
+        self.checked_at = time.monotonic()
+
+
+class PageCache:
+    """
+    Keeps rendered template pages in memory.
+
+    Overlay pages only change when their template or a static file they link
+    to changes (the links carry content hashes). A cached page is reused
+    until the template's mtime or size differs, or the static assets version
+    moved on. Both are checked at most every ``check_interval`` seconds, so a
+    hot page costs a dict lookup. With RAH_DEV_MODE every request renders.
+    """
+
+    def __init__(self, check_interval: float = 1.0, enabled: bool = not DEV_MODE) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            check_interval: Minimum seconds between two staleness checks of a page
+            enabled: False renders on every request
+        """
+        self.check_interval = check_interval
+        self.enabled = enabled
+        self._pages: Dict[str, RenderedPage] = {}
+        self._lock = threading.Lock()
+        self.render_count = 0
+        self.hit_count = 0
+
+    @staticmethod
+    def _stamp(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _is_fresh(self, page: RenderedPage, path: str) -> bool:
+        """Check a cached page, touching the disk at most every check_interval."""
+        now = time.monotonic()
+        if now - page.checked_at < self.check_interval:
+            return True
+        if self._stamp(path) != page.stamp or get_static_assets().refresh() != page.assets_version:
+            return False
+        page.checked_at = now
+        return True
+
+    def get(self, key: str, path: str, render: Callable[[], str]) -> RenderedPage:
+        """
+        Return a cached page, rendering it if needed.
+
+        Args:
+            key: Cache key of the page
+            path: Template file, its changes invalidate the page
+            render: Renders the page
+
+        Returns:
+            RenderedPage: The page
+        """
+        page = self._pages.get(key) if self.enabled else None
+        if page is not None and self._is_fresh(page, path):
+            self.hit_count += 1
+            return page
+
+        # Stamp before rendering so a change during the render is seen next time
+        stamp = self._stamp(path)
+        assets_version = get_static_assets().refresh() if self.enabled else 0
+        page = RenderedPage(render().encode('utf-8'), stamp, assets_version)
+        self.render_count += 1
+        if self.enabled:
+            with self._lock:
+                self._pages[key] = page
+        return page
+
+    def clear(self) -> None:
+        """Drop every cached page."""
+        with self._lock:
+            self._pages.clear()
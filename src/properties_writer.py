@@ -0,0 +1,136 @@
+import os
+import json
+import time
+import atexit
+import logging
+import tempfile
+import threading
+from typing import Any, Callable, Dict, Optional
+
+
+def write_json_atomic(path: str, data: Any) -> None:
+    """
+    Write a JSON file so readers only ever see the old or the new content.
+
+    The data goes to a temporary file in the same folder, is flushed to disk
+    and then renamed over the target, which is atomic on both Windows and
+    POSIX. The permissions of an existing target are kept.
+
+    Args:
+        path: Target file
+        data: JSON-serializable data
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as temp_file:
+            json.dump(data, temp_file, indent=4)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        if os.path.exists(path):
+            os.chmod(temp_path, os.stat(path).st_mode & 0o7777)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+class DebouncedJsonWriter:
+    """
+    Writes JSON files in the background, coalescing rapid updates.
+
+    ``schedule`` only records the latest content of a file and returns. A
+    worker thread writes it once no update arrived for ``delay`` seconds, or
+    at the latest ``max_delay`` seconds after the first pending update, so a
+    window being dragged around produces one write instead of hundreds.
+    Every write is atomic, see write_json_atomic. Pending writes are flushed
+    at interpreter exit.
+    """
+
+    def __init__(self, delay: float = 0.5, max_delay: float = 2.0,
+                 on_written: Optional[Callable[[str], None]] = None) -> None:
+        """
+        Initialize the writer, the worker thread starts on first use.
+
+        Args:
+            delay: Quiet time after the last update before writing
+            max_delay: Longest time an update may stay pending
+            on_written: Called with the path after each successful write
+        """
+        self.delay = delay
+        self.max_delay = max_delay
+        self.on_written = on_written
+        self.write_count = 0
+        self._pending: Dict[str, Any] = {}
+        self._first_update: Optional[float] = None
+        self._last_update = 0.0
+        self._condition = threading.Condition()
+        # Held from taking a batch until it is written, so an older batch can
+        # never land on disk after a newer one
+        self._write_lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        atexit.register(self.flush)
+
+    @property
+    def pending(self) -> bool:
+        """True while updates are waiting to be written."""
+        return bool(self._pending)
+
+    def schedule(self, path: str, data: Any) -> None:
+        """
+        Queue the new content of a file, replacing any pending content.
+
+        Args:
+            path: Target file
+            data: JSON-serializable data, must not be mutated afterwards
+        """
+        with self._condition:
+            now = time.monotonic()
+            self._pending[path] = data
+            self._last_update = now
+            if self._first_update is None:
+                self._first_update = now
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='properties-writer', daemon=True)
+                self._worker.start()
+            self._condition.notify()
+
+    def flush(self) -> None:
+        """Write every pending file now, on the calling thread."""
+        with self._write_lock:
+            with self._condition:
+                pending, self._pending = self._pending, {}
+                self._first_update = None
+            self._write(pending)
+
+    def _run(self) -> None:
+        """Worker loop: wait for the debounce deadline, then write the batch."""
+        while True:
+            with self._condition:
+                while not self._pending:
+                    if not self._condition.wait(timeout=30.0) and not self._pending:
+                        # Idle for a while, let the thread go until the next update
+                        self._worker = None
+                        return
+
+                deadline = min(self._last_update + self.delay, self._first_update + self.max_delay)
+                remaining = deadline - time.monotonic()
+                if remaining > 0:
+                    self._condition.wait(timeout=remaining)
+                    continue
+            self.flush()
+
+    def _write(self, pending: Dict[str, Any]) -> None:
+        """Write a batch of files."""
+        for path, data in pending.items():
+            try:
+                write_json_atomic(path, data)
+                self.write_count += 1
+            except (OSError, TypeError, ValueError) as e:
+                logging.error(f"Cannot write {path}: {e}")
+                continue
+            if self.on_written is not None:
+                self.on_written(path)
@@ -0,0 +1,50 @@
+import os
+import sys
+import platform
+import logging
+
+# Decides how the Socket.IO server runs and applies the eventlet monkey patch
+# when it is used. Kept free of Flask, Socket.IO and numpy so the main process
+# can read the mode without loading the web server, and imported before
+# threading, multiprocessing or signal so the patch sees them unused.
+
+using_fallback_mode = False
+
+# Socket.IO server mode: 'asyncio' serves python-socketio's AsyncServer as an
+# ASGI app with uvicorn and patches nothing, 'threading' forces the fallback,
+# anything else tries eventlet first
+SERVER_MODE = os.environ.get('RAH_SERVER_MODE', '').lower()
+using_asyncio_mode = SERVER_MODE == 'asyncio'
+
+force_threading = SERVER_MODE == 'threading' or os.environ.get('FORCE_THREADING_MODE', 'false').lower() == 'true'
+
+if using_asyncio_mode:
+    logging.info("Using asyncio mode due to RAH_SERVER_MODE environment variable")
+
+elif force_threading:
+    using_fallback_mode = True
+    logging.info("Using threading mode due to FORCE_THREADING_MODE environment variable")
+
+elif platform.system() == 'Windows':
+    os.environ['EVENTLET_NO_GREENDNS'] = 'yes'
+
+    if getattr(sys, 'frozen', False):
+        os.environ['EVENTLET_THREADPOOL_SIZE'] = '30'
+
+if not using_fallback_mode and not using_asyncio_mode:
+    try:
+        import eventlet
+        if platform.system() == 'Windows':
+            eventlet.monkey_patch(os=False, thread=False, time=False)
+        else:
+            eventlet.monkey_patch()
+    except ImportError as e:
+        logging.warning(f"Cannot import eventlet: {e}")
+        logging.info("Falling back to pure threading mode")
+        using_fallback_mode = True
+    except Exception as e:
+        logging.warning(f"Error initializing eventlet: {e}")
+        if platform.system() == 'Windows' and getattr(sys, 'frozen', False):
+            logging.info("This is likely due to PyInstaller packaging issues with eventlet.")
+            logging.info("Falling back to pure threading mode")
+        using_fallback_mode = True
@@ -0,0 +1,171 @@
+import logging
+import yaml
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class SessionInfoCache:
+    """
+    Parsed view of iRacing's SessionInfo YAML, rebuilt only when it changes.
+
+    iRacing bumps the ``SessionInfoUpdate`` counter every time it rewrites
+    the SessionInfo string. The cache compares that counter on every frame
+    and only re-parses and re-indexes when it moves, so hot-path lookups are
+    plain dict hits:
+
+    • sessions_by_num   SessionNum  -> session entry
+    • drivers_by_car_idx CarIdx     -> driver entry
+    • classes_by_id     CarClassID  -> class entry with the CarIdx list
+    • sector_starts     SectorStartPct of every sector, in track order
+    • event_id          (SubSessionID, SessionID, TrackID) of the event
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty cache."""
+        self.clear()
+
+    def clear(self) -> None:
+        """Forget everything, the next refresh will parse from scratch."""
+        self.update_count: Optional[int] = None
+        self.loaded = False
+        self.parse_count = 0
+        self.player_car_idx: Optional[int] = None
+        self.sessions_by_num: Dict[int, Dict[str, Any]] = {}
+        self.drivers_by_car_idx: Dict[int, Dict[str, Any]] = {}
+        self.classes_by_id: Dict[int, Dict[str, Any]] = {}
+        self.sector_starts: List[float] = []
+        self.event_id: Optional[Tuple[Any, ...]] = None
+
+    def refresh(self, source: Any) -> bool:
+        """
+        Re-parse the SessionInfo if iRacing reports a new version.
+
+        Args:
+            source: Telemetry source exposing ``session_info_update`` and
+                SessionInfo sections through item access
+
+        Returns:
+            bool: True if the indexes were rebuilt
+        """
+        update = source.session_info_update
+        if self.loaded and update == self.update_count:
+            return False
+
+        try:
+            session_info = self._load_section(source['SessionInfo'], 'SessionInfo')
+            driver_info = self._load_section(source['DriverInfo'], 'DriverInfo')
+            split_time_info = self._load_section(source['SplitTimeInfo'], 'SplitTimeInfo')
+            weekend_info = self._load_section(source['WeekendInfo'], 'WeekendInfo')
+        except Exception as e:
+            logging.debug(f"Could not parse SessionInfo: {e}")
+            return False
+
+        self._build_indexes(session_info, driver_info)
+        self.sector_starts = self._sector_starts(split_time_info)
+        self.event_id = self._event_id(weekend_info)
+        self.update_count = update
+        self.loaded = True
+        self.parse_count += 1
+        logging.debug(f"SessionInfo re-indexed (update {update}): {len(self.sessions_by_num)} sessions, "
+                      f"{len(self.drivers_by_car_idx)} drivers, {len(self.classes_by_id)} classes")
+        return True
+
+    @staticmethod
+    def _load_section(raw: Any, key: str) -> Dict[str, Any]:
+        """
+        Normalize a SessionInfo section to a dict.
+
+        Works whether irsdk delivers the section as:
+        • an already‑parsed dict  **or**
+        • a YAML string (either the section itself or the whole document)
+        """
+        if isinstance(raw, dict):
+            return raw
+        info = yaml.safe_load(raw or "") or {}
+        section = info.get(key, info) if isinstance(info, dict) else None
+        return section if isinstance(section, dict) else {}
+
+    def _build_indexes(self, session_info: Dict[str, Any], driver_info: Dict[str, Any]) -> None:
+        """Build the lookup tables from freshly parsed sections."""
+        sessions: Dict[int, Dict[str, Any]] = {}
+        for sess in session_info.get('Sessions') or []:
+            try:
+                sessions[int(sess.get('SessionNum', -1))] = sess
+            except (TypeError, ValueError):
+                continue
+
+        drivers: Dict[int, Dict[str, Any]] = {}
+        classes: Dict[int, Dict[str, Any]] = {}
+        for driver in driver_info.get('Drivers') or []:
+            try:
+                car_idx = int(driver.get('CarIdx', -1))
+            except (TypeError, ValueError):
+                continue
+            drivers[car_idx] = driver
+
+            class_id = driver.get('CarClassID')
+            if class_id is None:
+                continue
+            car_class = classes.get(int(class_id))
+            if car_class is None:
+                car_class = {
+                    'CarClassID': int(class_id),
+                    'CarClassShortName': driver.get('CarClassShortName', ''),
+                    'CarClassRelSpeed': driver.get('CarClassRelSpeed', 0),
+                    'CarClassEstLapTime': driver.get('CarClassEstLapTime', 0.0),
+                    'car_idxs': [],
+                }
+                classes[int(class_id)] = car_class
+            car_class['car_idxs'].append(car_idx)
+
+        player_idx = driver_info.get('DriverCarIdx')
+        self.player_car_idx = int(player_idx) if player_idx is not None else None
+        self.sessions_by_num = sessions
+        self.drivers_by_car_idx = drivers
+        self.classes_by_id = classes
+
+    @staticmethod
+    def _event_id(weekend_info: Dict[str, Any]) -> Optional[Tuple[Any, ...]]:
+        """Return what identifies the event, None if the sim did not say."""
+        if not weekend_info:
+            return None
+        return (weekend_info.get('SubSessionID'), weekend_info.get('SessionID'), weekend_info.get('TrackID'))
+
+    @staticmethod
+    def _sector_starts(split_time_info: Dict[str, Any]) -> List[float]:
+        """Return the sorted SectorStartPct values of the track."""
+        starts = []
+        for sector in split_time_info.get('Sectors') or []:
+            try:
+                starts.append(float(sector.get('SectorStartPct', 0.0)))
+            except (TypeError, ValueError):
+                continue
+        return sorted(starts)
+
+    def session(self, session_num: int) -> Optional[Dict[str, Any]]:
+        """Return the session entry for a SessionNum, if known."""
+        return self.sessions_by_num.get(session_num)
+
+    def session_type(self, session_num: int) -> Optional[str]:
+        """Return the SessionType ('Race', 'Practice', …) for a SessionNum, if known."""
+        sess = self.sessions_by_num.get(session_num)
+        return str(sess.get('SessionType', 'Race')) if sess else None
+
+    def driver(self, car_idx: int) -> Optional[Dict[str, Any]]:
+        """Return the driver entry for a CarIdx, if known."""
+        return self.drivers_by_car_idx.get(car_idx)
+
+    def car_class(self, class_id: int) -> Optional[Dict[str, Any]]:
+        """Return the class entry for a CarClassID, if known."""
+        return self.classes_by_id.get(class_id)
+
+    def class_of_car(self, car_idx: int) -> Optional[Dict[str, Any]]:
+        """Return the class entry of the car at a CarIdx, if known."""
+        driver = self.drivers_by_car_idx.get(car_idx)
+        if driver is None or driver.get('CarClassID') is None:
+            return None
+        return self.classes_by_id.get(int(driver['CarClassID']))
+
+    def car_idxs_in_class(self, class_id: int) -> List[int]:
+        """Return the CarIdx of every car in a class."""
+        car_class = self.classes_by_id.get(class_id)
+        return car_class['car_idxs'] if car_class else []
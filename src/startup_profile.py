@@ -0,0 +1,153 @@
+import os
+import sys
+import time
+import logging
+import threading
+from importlib.abc import MetaPathFinder
+from typing import Any, Dict, List, Optional, Tuple
+
+# Log an import and startup timing report in every process of the app
+PROFILE_ENABLED = os.environ.get('RAH_STARTUP_PROFILE', 'false').lower() == 'true'
+
+# Reference point of the marks, as close to the interpreter start as this
+# module gets imported
+START = time.perf_counter()
+
+
+class _TimedLoader:
+    """Wraps a module loader to time executing the module."""
+
+    def __init__(self, loader: Any, name: str, timer: 'ImportTimer') -> None:
+        self.loader = loader
+        self.name = name
+        self.timer = timer
+
+    def create_module(self, spec: Any) -> Any:
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module: Any) -> None:
+        # Code that inspects __loader__ must see the real loader
+        module.__loader__ = self.loader
+        if getattr(module, '__spec__', None) is not None:
+            module.__spec__.loader = self.loader
+
+        stack = self.timer.stack()
+        stack.append(0.0)
+        started = time.perf_counter()
+        try:
+            self.loader.exec_module(module)
+        finally:
+            elapsed = time.perf_counter() - started
+            nested = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            self.timer.record(self.name, elapsed - nested, elapsed, outermost=not stack)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.loader, name)
+
+
+class ImportTimer(MetaPathFinder):
+    """
+    Meta path finder that measures how long every module takes to import.
+
+    It asks the other finders for the spec and wraps the loader, so each
+    module records its own time and its time including nested imports, the
+    same numbers ``python -X importtime`` prints.
+    """
+
+    def __init__(self) -> None:
+        self.imports: List[Tuple[str, float, float]] = []
+        # Time spent in imports that were not nested in another timed import
+        self.total = 0.0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def stack(self) -> List[float]:
+        """Nested import times of the current thread."""
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    def record(self, name: str, self_time: float, cumulative: float, outermost: bool) -> None:
+        with self._lock:
+            self.imports.append((name, self_time, cumulative))
+            if outermost:
+                self.total += cumulative
+
+    def find_spec(self, fullname: str, path: Any, target: Any = None) -> Any:
+        if getattr(self._local, 'finding', False):
+            return None
+        self._local.finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, 'find_spec'):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                        spec.loader = _TimedLoader(spec.loader, fullname, self)
+                    return spec
+            return None
+        finally:
+            self._local.finding = False
+
+
+_timer: Optional[ImportTimer] = None
+_marks: Dict[str, float] = {}
+
+
+def install() -> None:
+    """Start timing imports if RAH_STARTUP_PROFILE is set, call it first thing in a process."""
+    global _timer
+    if PROFILE_ENABLED and _timer is None:
+        _timer = ImportTimer()
+        sys.meta_path.insert(0, _timer)
+
+
+def mark(event: str) -> None:
+    """
+    Record the time of a startup milestone, only its first occurrence counts.
+
+    Args:
+        event: Name of the milestone
+    """
+    if PROFILE_ENABLED and event not in _marks:
+        _marks[event] = time.perf_counter() - START
+
+
+def report(top: int = 20) -> str:
+    """
+    Format the startup milestones and the slowest imports of this process.
+
+    Args:
+        top: Number of modules to list
+
+    Returns:
+        str: The report
+    """
+    lines = [f"Startup profile of process {os.getpid()}:"]
+    for event, elapsed in sorted(_marks.items(), key=lambda item: item[1]):
+        lines.append(f"  {elapsed * 1000:9.1f} ms  {event}")
+
+    if _timer is not None and _timer.imports:
+        with _timer._lock:
+            imports = list(_timer.imports)
+        lines.append(f"  {len(imports)} modules imported in {_timer.total * 1000:.1f} ms, slowest (self / cumulative):")
+        for name, self_time, cumulative in sorted(imports, key=lambda item: item[2], reverse=True)[:top]:
+            lines.append(f"  {self_time * 1000:9.1f} / {cumulative * 1000:9.1f} ms  {name}")
+    return '\n'.join(lines)
+
+
+def log_report(event: Optional[str] = None) -> None:
+    """
+    Mark a milestone and log the report, if profiling is enabled.
+
+    Args:
+        event: Milestone to mark first
+    """
+    if not PROFILE_ENABLED:
+        return
+    if event is not None:
+        mark(event)
+    logging.info(report())
@@ -0,0 +1,224 @@
+import os
+import gzip
+import hashlib
+import logging
+import mimetypes
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from flask import Response, request, send_from_directory
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Only text assets are worth compressing, images are compressed already
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+MIN_COMPRESS_SIZE = 256
+
+# A fingerprinted URL never changes content, browsers may keep it forever
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+class StaticAsset:
+    """One static file with its content hash and precompressed variants."""
+
+    def __init__(self, path: str) -> None:
+        """
+        Read and compress a file.
+
+        Args:
+            path: Path of the file
+        """
+        stat = os.stat(path)
+        with open(path, 'rb') as asset_file:
+            data = asset_file.read()
+
+        self.path = path
+        self.stamp = (stat.st_mtime_ns, stat.st_size)
+        self.fingerprint = hashlib.sha256(data).hexdigest()[:16]
+        self.mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        self.variants: Dict[str, bytes] = {'identity': data}
+
+        if len(data) >= MIN_COMPRESS_SIZE and self.mimetype.startswith(COMPRESSIBLE_TYPES):
+            # mtime=0 keeps the gzip bytes identical between builds
+            gzipped = gzip.compress(data, compresslevel=9, mtime=0)
+            if len(gzipped) < len(data):
+                self.variants['gzip'] = gzipped
+            if brotli is not None:
+                compressed = brotli.compress(data, quality=11)
+                if len(compressed) < len(data):
+                    self.variants['br'] = compressed
+
+    def is_stale(self) -> bool:
+        """Check whether the file changed on disk since it was read."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return True
+        return (stat.st_mtime_ns, stat.st_size) != self.stamp
+
+
+class StaticAssets:
+    """
+    Serves static files from memory with fingerprints and precompression.
+
+    Every file of the registered folders is read, hashed and compressed with
+    gzip (and brotli when the brotli package is installed) once at startup.
+    Requests get the best encoding the client accepts, an ETag and a 304 when
+    the client's copy is current. URLs built with url_for carry the content
+    hash as ``v``; a request with the current hash is cached as immutable, so
+    relaunched overlays load their assets from the browser cache. A file
+    changed on disk is reread on its next request, which gives it a new hash.
+    """
+
+    def __init__(self) -> None:
+        self._folders: Dict[str, str] = {}
+        self._assets: Dict[Tuple[str, str], StaticAsset] = {}
+        self._lock = threading.Lock()
+        # Changes whenever a file's content hash may have changed, pages
+        # rendered with the old fingerprints are stale from then on
+        self.version = 0
+
+    def add_folder(self, bundle: str, folder: str) -> None:
+        """
+        Register a folder of static files.
+
+        Args:
+            bundle: Name used to look the files up
+            folder: Folder path
+        """
+        self._folders[bundle] = folder
+
+    def build(self) -> None:
+        """Read and compress every file of the registered folders."""
+        assets: Dict[Tuple[str, str], StaticAsset] = {}
+        raw_size = compressed_size = 0
+        for bundle, folder in self._folders.items():
+            for directory, _, filenames in os.walk(folder):
+                for filename in filenames:
+                    path = os.path.join(directory, filename)
+                    relative = os.path.relpath(path, folder).replace(os.sep, '/')
+                    try:
+                        asset = StaticAsset(path)
+                    except OSError as e:
+                        logging.error(f"Cannot read static file {path}: {e}")
+                        continue
+                    assets[(bundle, relative)] = asset
+                    raw_size += len(asset.variants['identity'])
+                    compressed_size += min(len(variant) for variant in asset.variants.values())
+
+        with self._lock:
+            self._assets = assets
+            self.version += 1
+        logging.info(f"Static assets: {len(assets)} files, {raw_size} bytes, {compressed_size} bytes compressed")
+
+    def get(self, bundle: str, filename: str) -> Optional[StaticAsset]:
+        """
+        Look a file up, rereading it if it changed on disk.
+
+        Args:
+            bundle: Bundle name
+            filename: Path relative to the bundle folder
+
+        Returns:
+            Optional[StaticAsset]: The asset, None if it is not a known file
+        """
+        key = (bundle, filename)
+        asset = self._assets.get(key)
+        if asset is None or not asset.is_stale():
+            return asset
+
+        return self._reload(key, asset.path)
+
+    def _reload(self, key: Tuple[str, str], path: str) -> Optional[StaticAsset]:
+        """Reread a file that changed on disk."""
+        try:
+            asset: Optional[StaticAsset] = StaticAsset(path)
+        except OSError:
+            asset = None
+        with self._lock:
+            if asset is None:
+                self._assets.pop(key, None)
+            else:
+                self._assets[key] = asset
+            self.version += 1
+        return asset
+
+    def refresh(self) -> int:
+        """
+        Reread every file that changed on disk.
+
+        Returns:
+            int: The current version
+        """
+        for key, asset in list(self._assets.items()):
+            if asset.is_stale():
+                self._reload(key, asset.path)
+        return self.version
+
+    def fingerprint(self, bundle: str, filename: str) -> Optional[str]:
+        """Return the content hash of a file, None if it is not known."""
+        asset = self.get(bundle, filename)
+        return asset.fingerprint if asset is not None else None
+
+    def send(self, bundle: str, filename: str) -> Any:
+        """
+        Build the response for a static file request.
+
+        Files that are not known, e.g. added after startup, are served from
+        disk as before.
+
+        Args:
+            bundle: Bundle name
+            filename: Path relative to the bundle folder
+
+        Returns:
+            The Flask response
+        """
+        asset = self.get(bundle, filename)
+        if asset is None:
+            folder = self._folders.get(bundle)
+            if folder is None:
+                return "File not found", 404
+            return send_from_directory(folder, filename)
+
+        encoding = 'identity'
+        for candidate in ('br', 'gzip'):
+            if candidate in asset.variants and request.accept_encodings[candidate]:
+                encoding = candidate
+                break
+
+        response = Response(asset.variants[encoding], mimetype=asset.mimetype)
+        response.headers['Vary'] = 'Accept-Encoding'
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+        # Each encoding is a different representation and needs its own tag
+        response.set_etag(asset.fingerprint if encoding == 'identity' else f'{asset.fingerprint}-{encoding}')
+
+        if request.args.get('v') == asset.fingerprint:
+            response.cache_control.public = True
+            response.cache_control.max_age = IMMUTABLE_MAX_AGE
+            response.cache_control.immutable = True
+        else:
+            response.cache_control.no_cache = True
+        return response.make_conditional(request)
+
+
+_assets: Optional[StaticAssets] = None
+_assets_lock = threading.Lock()
+
+
+def get_static_assets() -> StaticAssets:
+    """
+    Return the static asset store of the application.
+
+    Returns:
+        StaticAssets: The shared store, created on first use
+    """
+    global _assets
+    with _assets_lock:
+        if _assets is None:
+            _assets = StaticAssets()
+        return _assets
@@ -0,0 +1,305 @@
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from binary_codec import BinaryEncoder
+from delta_encoder import DeltaEncoder
+from latency_tracker import LatencyTracker
+
+# Wire encodings a client can ask for with the `encoding` query parameter
+ENCODING_FULL = 'full'
+ENCODING_DELTA = 'delta'
+ENCODING_BINARY = 'binary'
+ENCODINGS = (ENCODING_FULL, ENCODING_DELTA, ENCODING_BINARY)
+
+
+class TelemetryChannel:
+    """
+    Fans one stream of payloads out to the clients of a Socket.IO namespace.
+
+    Every client sits in the room of the wire encoding it asked for when it
+    connected. Clients in the ``full`` room receive the whole payload on
+    ``event`` like they always did. Clients in the ``delta`` room receive
+    DeltaEncoder messages on ``<event>_delta`` and get a keyframe of the
+    current state as soon as they join. Clients in the ``binary`` room
+    receive the schema on ``<event>_schema`` when they join and whenever it
+    changes, then one packed record per frame on ``<event>_binary``.
+
+    Payloads with non-numeric values cannot be packed, such channels are
+    created with the binary encoding left out of ``encodings``.
+
+    A channel can be limited to ``emit_rate`` messages per second. Frames
+    published before the next slot are dropped, so every message carries the
+    latest frame and slow channels cost nothing between their slots. Callers
+    can check ``is_due()`` to skip building the payload altogether. Frames
+    published while ``is_backlogged`` reports the server still busy with
+    earlier ones are dropped the same way, so a slow server skips whole
+    frames instead of single messages.
+
+    Frames published with their sim tick carry a stamp as a second event
+    argument in every encoding: ``[tick, frame_us]``, the tick and when the
+    server started reading it (monotonic microseconds). Every
+    ``latency_probe_interval`` seconds the stamp also gets the emit time,
+    ``[tick, frame_us, emit_us]``, asking clients to echo it back on
+    ``latency_echo`` once the frame is on screen; the echoes feed
+    ``latency``.
+    """
+
+    # Fraction of the emit interval a frame may arrive early and still be sent,
+    # so sim tick jitter does not push a frame to the next slot
+    DUE_TOLERANCE = 0.25
+
+    def __init__(self, socketio: Any, namespace: str, event: str, keyframe_interval: int = 120,
+                 encodings: Iterable[str] = ENCODINGS,
+                 on_subscribers_changed: Optional[Callable[[], None]] = None,
+                 emit_rate: Optional[float] = None,
+                 latency_probe_interval: Optional[float] = None,
+                 is_backlogged: Optional[Callable[[], bool]] = None) -> None:
+        """
+        Initialize the channel.
+
+        Args:
+            socketio: The SocketIO server used to emit
+            namespace: Namespace of the channel, e.g. '/input_telemetry'
+            event: Name of the full payload event
+            keyframe_interval: Messages between periodic delta keyframes
+            encodings: Wire encodings offered on this channel
+            on_subscribers_changed: Called after a client joined or left
+            emit_rate: Maximum messages per second, None to send every frame
+            latency_probe_interval: Seconds between frames clients are asked
+                to echo, None or 0 to measure no latency
+            is_backlogged: Returns True while the server has not sent the
+                previous frames yet, None if it sends them as they come
+        """
+        self.socketio = socketio
+        self.namespace = namespace
+        self.event = event
+        self.delta_event = f'{event}_delta'
+        self.binary_event = f'{event}_binary'
+        self.schema_event = f'{event}_schema'
+        self.encodings = tuple(encodings)
+        self.encoder = DeltaEncoder(keyframe_interval)
+        self.binary_encoder = BinaryEncoder()
+        self._clients: Dict[str, str] = {}
+        self._room_sizes = {encoding: 0 for encoding in ENCODINGS}
+        self._lock = threading.Lock()
+        self.on_subscribers_changed = on_subscribers_changed
+        self.frames_sent = 0
+        self.frames_coalesced = 0
+        self.latency = LatencyTracker()
+        self.latency_probe_interval = latency_probe_interval or 0.0
+        self._next_probe = 0.0
+        self.is_backlogged = is_backlogged
+        self.set_emit_rate(emit_rate)
+
+    def set_emit_rate(self, emit_rate: Optional[float]) -> None:
+        """
+        Change the maximum emit rate.
+
+        Args:
+            emit_rate: Maximum messages per second, None or 0 to send every frame
+        """
+        self.emit_rate = float(emit_rate) if emit_rate else None
+        self._interval = 1.0 / self.emit_rate if self.emit_rate else 0.0
+        self._next_due = 0.0
+
+    def is_due(self) -> bool:
+        """
+        Check whether a frame published now would be sent.
+
+        Returns:
+            bool: True if the channel's next emit slot has been reached and
+                the server is not backlogged
+        """
+        if self.is_backlogged is not None and self.is_backlogged():
+            return False
+        if not self._interval:
+            return True
+        return time.perf_counter() >= self._next_due - self._interval * self.DUE_TOLERANCE
+
+    def _advance_slot(self) -> None:
+        """Schedule the next emit slot one interval after the current one."""
+        if not self._interval:
+            return
+        now = time.perf_counter()
+        self._next_due += self._interval
+        if self._next_due < now:
+            # Fell behind (idle channel or slow frames), restart the schedule
+            self._next_due = now + self._interval
+
+    @property
+    def subscriber_count(self) -> int:
+        """Number of clients currently connected to the namespace."""
+        return len(self._clients)
+
+    @property
+    def has_subscribers(self) -> bool:
+        """True if at least one client would receive a published frame."""
+        return bool(self._clients)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return the channel statistics.
+
+        Returns:
+            Dict[str, Any]: Subscribers, emit rate, sent/coalesced frame counts
+                and the latency figures
+        """
+        return {
+            'subscribers': self.subscriber_count,
+            'emit_rate': self.emit_rate,
+            'frames_sent': self.frames_sent,
+            'frames_coalesced': self.frames_coalesced,
+            'latency': self.latency.get_stats(),
+        }
+
+    def _subscribers_changed(self) -> None:
+        """Notify the listener that the set of clients changed."""
+        if self.on_subscribers_changed is not None:
+            self.on_subscribers_changed()
+
+    def add_client(self, sid: str, encoding: str) -> str:
+        """
+        Register a client and send it what it needs to start decoding.
+
+        Args:
+            sid: Socket.IO session id
+            encoding: Requested wire encoding, unknown or unsupported values
+                fall back to full
+
+        Returns:
+            str: The encoding the client was registered with
+        """
+        if encoding not in self.encodings:
+            encoding = ENCODING_FULL
+
+        with self._lock:
+            previous = self._clients.get(sid)
+            if previous is not None:
+                self._room_sizes[previous] -= 1
+            self._clients[sid] = encoding
+            self._room_sizes[encoding] += 1
+
+        self.socketio.server.enter_room(sid, encoding, namespace=self.namespace)
+        self.send_keyframe(sid)
+        self._subscribers_changed()
+        return encoding
+
+    def remove_client(self, sid: str) -> None:
+        """
+        Forget a disconnected client.
+
+        Args:
+            sid: Socket.IO session id
+        """
+        with self._lock:
+            encoding = self._clients.pop(sid, None)
+            if encoding is not None:
+                self._room_sizes[encoding] -= 1
+        if encoding is None:
+            return
+        self.latency.remove_client(sid)
+        if not self._clients:
+            # Nothing is published while the channel is empty, so the delta
+            # state would go stale. Start the next client from a fresh keyframe.
+            self.encoder.reset()
+        self._subscribers_changed()
+
+    def send_keyframe(self, sid: str) -> None:
+        """
+        Send one client what it needs to decode the next message: the current
+        state for delta clients, the current schema for binary clients.
+
+        Args:
+            sid: Socket.IO session id
+        """
+        encoding = self._clients.get(sid)
+        if encoding == ENCODING_DELTA:
+            keyframe = self.encoder.snapshot()
+            if keyframe is not None:
+                self.socketio.emit(self.delta_event, keyframe, namespace=self.namespace, to=sid)
+        elif encoding == ENCODING_BINARY:
+            schema = self.binary_encoder.schema_message()
+            if schema is not None:
+                self.socketio.emit(self.schema_event, schema, namespace=self.namespace, to=sid)
+
+    def record_latency_echo(self, sid: str, echo: Dict[str, Any]) -> bool:
+        """
+        Add the latency a client echoed for a probe frame.
+
+        Args:
+            sid: Socket.IO session id
+            echo: The echo, see latency_tracker.ECHO_FIELDS
+
+        Returns:
+            bool: False if the echo was rejected
+        """
+        encoding = self._clients.get(sid)
+        if encoding is None:
+            return False
+        return self.latency.record_echo(sid, encoding, echo, time.perf_counter_ns() // 1000)
+
+    def _stamp(self, tick: Optional[int], frame_ns: Optional[int]) -> Optional[List[int]]:
+        """
+        Build the stamp sent along with a frame, see the class docstring.
+
+        Args:
+            tick: Sim tick of the frame, None to send no stamp
+            frame_ns: perf_counter_ns() when the server started reading it
+
+        Returns:
+            Optional[List[int]]: The stamp, None without a tick
+        """
+        if tick is None:
+            return None
+        stamp = [tick, (frame_ns or 0) // 1000]
+        if self.latency_probe_interval:
+            now = time.perf_counter()
+            if now >= self._next_probe:
+                self._next_probe = now + self.latency_probe_interval
+                stamp.append(time.perf_counter_ns() // 1000)
+        return stamp
+
+    def publish(self, payload: Dict[str, Any], tick: Optional[int] = None,
+                frame_ns: Optional[int] = None) -> None:
+        """
+        Send a frame to every client in the encoding it asked for.
+
+        Frames published before the channel is due or while the server is
+        backlogged are dropped in favour of the next one.
+
+        Args:
+            payload: The full payload for this frame
+            tick: Sim tick of the frame, stamped on every message when given
+            frame_ns: perf_counter_ns() when the server started reading the frame
+        """
+        if not self.is_due():
+            self.frames_coalesced += 1
+            return
+        self._advance_slot()
+        self.frames_sent += 1
+
+        try:
+            # A tuple is sent as separate event arguments
+            stamp = self._stamp(tick, frame_ns)
+            if self._room_sizes[ENCODING_FULL]:
+                self.socketio.emit(self.event, payload if stamp is None else (payload, stamp),
+                                   namespace=self.namespace, to=ENCODING_FULL)
+
+            # Keep the delta state current even with no delta client, so a
+            # client that joins later gets an up-to-date keyframe.
+            message = self.encoder.encode(payload)
+            if message is not None and self._room_sizes[ENCODING_DELTA]:
+                self.socketio.emit(self.delta_event, message if stamp is None else (message, stamp),
+                                   namespace=self.namespace, to=ENCODING_DELTA)
+
+            if self._room_sizes[ENCODING_BINARY]:
+                schema, record = self.binary_encoder.encode(payload)
+                if schema is not None:
+                    self.socketio.emit(self.schema_event, schema, namespace=self.namespace, to=ENCODING_BINARY)
+                if record is not None:
+                    self.socketio.emit(self.binary_event, record if stamp is None else (record, stamp),
+                                       namespace=self.namespace, to=ENCODING_BINARY)
+        except Exception as e:
+            logging.error(f"Error emitting {self.event} on {self.namespace}: {e}")
@@ -0,0 +1,142 @@
+import threading
+import time
+from typing import Any, Dict, Iterable, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class TelemetryHistory:
+    """
+    Fixed-capacity ring buffer of recent telemetry samples.
+
+    Every sample is written twice, at ``i`` and ``i + capacity``, into
+    preallocated arrays twice the capacity long. Appending stays O(1) and any
+    window of the most recent samples is one contiguous slice, so reads are
+    zero-copy NumPy views. Values are stored one field per row, which keeps
+    each field's window contiguous as well.
+
+    Timestamps are ``time.perf_counter()`` seconds, the monotonic clock of
+    the frame marks, so they never go back and the windows can be found by
+    binary search. Samples are only recorded
+    while the telemetry loop runs, a time window therefore ends at the
+    current time rather than at the newest sample, leaving out samples that
+    went stale while nothing was recorded.
+    """
+
+    def __init__(self, fields: Sequence[str], capacity: int) -> None:
+        """
+        Preallocate the buffer.
+
+        Args:
+            fields: Names of the values stored with every sample
+            capacity: Number of samples kept
+        """
+        self.fields = tuple(fields)
+        self.capacity = max(int(capacity), 1)
+        self._field_rows = {name: row for row, name in enumerate(self.fields)}
+        self._values = np.zeros((len(self.fields), 2 * self.capacity), dtype=np.float32)
+        self._times = np.zeros(2 * self.capacity, dtype=np.float64)
+        self._ticks = np.zeros(2 * self.capacity, dtype=np.int64)
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        """Drop every sample."""
+        self._next = 0
+        self.count = 0
+
+    def append(self, tick: Optional[int], timestamp: float, values: Mapping[str, Any]) -> None:
+        """
+        Store one sample.
+
+        Args:
+            tick: Sim tick of the sample, None if the source has no tick
+            timestamp: time.perf_counter() of the sample
+            values: Values by field name, missing or None values are stored as 0
+        """
+        column = [float(values.get(name) or 0.0) for name in self.fields]
+        with self._lock:
+            index = self._next
+            mirror = index + self.capacity
+            self._values[:, index] = column
+            self._values[:, mirror] = column
+            self._times[index] = self._times[mirror] = timestamp
+            self._ticks[index] = self._ticks[mirror] = -1 if tick is None else tick
+            self._next = (index + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+
+    def _window(self, count: Optional[int] = None, seconds: Optional[float] = None,
+                now: Optional[float] = None) -> slice:
+        """Return the slice of the most recent samples, newest last."""
+        end = self._next + self.capacity
+        size = self.count if count is None else max(min(int(count), self.count), 0)
+        start = end - size
+        if seconds is not None and size:
+            cutoff = (time.perf_counter() if now is None else now) - seconds
+            start += int(np.searchsorted(self._times[start:end], cutoff, side='left'))
+        return slice(start, end)
+
+    def window(self, count: Optional[int] = None, seconds: Optional[float] = None,
+               fields: Optional[Iterable[str]] = None,
+               now: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Return the most recent samples as read-only views.
+
+        The views share memory with the buffer, copy them before holding on to
+        them across later appends.
+
+        Args:
+            count: Maximum number of samples, None for all
+            seconds: Only samples from the last ``seconds`` before ``now``
+            fields: Fields to return, None for all
+            now: time.perf_counter() the window ends at, None for the current time
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray]]: Timestamps,
+                ticks and values by field name, oldest first
+        """
+        with self._lock:
+            return self._views(count, seconds, fields, now)
+
+    def _views(self, count: Optional[int], seconds: Optional[float], fields: Optional[Iterable[str]],
+               now: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+        """Slice the read-only views of a window, the caller holds the lock."""
+        names = self.fields if fields is None else [name for name in fields if name in self._field_rows]
+        window = self._window(count, seconds, now)
+        times = self._times[window]
+        ticks = self._ticks[window]
+        values = {name: self._values[self._field_rows[name], window] for name in names}
+        for array in (times, ticks, *values.values()):
+            array.flags.writeable = False
+        return times, ticks, values
+
+    def to_message(self, count: Optional[int] = None, seconds: Optional[float] = None,
+                   fields: Optional[Iterable[str]] = None, binary: bool = False,
+                   now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Build a backfill or history response.
+
+        Args:
+            count: Maximum number of samples, None for all
+            seconds: Only samples from the last ``seconds`` before ``now``
+            fields: Fields to include, None for all
+            binary: Send each field as little-endian float32 bytes instead of a list
+            now: time.perf_counter() the window ends at, None for the current time
+
+        Returns:
+            Dict[str, Any]: Sample count, times relative to ``now`` (negative,
+                so the age of every sample shows), ticks and values by field name
+        """
+        if now is None:
+            now = time.perf_counter()
+        encode = (lambda array: array.astype('<f4', copy=False).tobytes()) if binary else (lambda array: array.tolist())
+        # Serialize under the lock so the telemetry thread cannot overwrite
+        # the window halfway through
+        with self._lock:
+            times, ticks, values = self._views(count, seconds, fields, now)
+            return {
+                'count': len(times),
+                'time': (times - now).tolist(),
+                'tick': ticks.tolist(),
+                'values': {name: encode(array) for name, array in values.items()},
+            }
@@ -0,0 +1,359 @@
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Histogram resolution: 2**SUB_BUCKET_BITS buckets per power of two, so a
+# recorded value is known within 1/16 (6%) of itself. Values below
+# 2**(SUB_BUCKET_BITS + 1) ns are counted exactly.
+SUB_BUCKET_BITS = 4
+# Largest recordable duration, 2**36 ns is about 69 s
+MAX_VALUE_BITS = 36
+MAX_VALUE = (1 << MAX_VALUE_BITS) - 1
+BUCKET_COUNT = (MAX_VALUE_BITS - SUB_BUCKET_BITS + 1) << SUB_BUCKET_BITS
+
+# Seconds between background folds of the pending frames, which bounds the
+# memory they hold when nobody reads the metrics
+FOLD_INTERVAL = 5.0
+
+# Timestamps a frame records, in order. Each stage lasts from one timestamp
+# to the next, the frame from the first to the last.
+FRAME_MARKS = ('started', 'decoded', 'ready', 'normalized', 'inputs_sent', 'driver_sent')
+STAGES = ('sdk_read', 'compute', 'normalize', 'emit_input_telemetry', 'emit_driver_in_front', 'frame')
+# Stages that only run when their channel is due, a skipped one repeats the
+# previous timestamp
+OPTIONAL_STAGES = ('normalize', 'emit_input_telemetry', 'emit_driver_in_front')
+
+# Bucket bounds of the /metrics output in seconds, the quantiles come from
+# the full resolution histogram
+EXPORT_BOUNDS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+                 1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 1e-1)
+EXPORT_QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+def _bucket_highest_values() -> np.ndarray:
+    """Highest nanosecond value that falls into each bucket."""
+    index = np.arange(BUCKET_COUNT, dtype=np.int64)
+    exact = 1 << (SUB_BUCKET_BITS + 1)
+    shift = np.maximum((index >> SUB_BUCKET_BITS) - 1, 0)
+    lowest = np.where(index < exact, index, (index - (shift << SUB_BUCKET_BITS)) << shift)
+    return lowest + (1 << shift) - 1
+
+
+BUCKET_HIGHEST = _bucket_highest_values()
+
+
+def bucket_index(values: np.ndarray) -> np.ndarray:
+    """
+    Return the bucket of every duration.
+
+    Args:
+        values: Nanoseconds, clipped to 0..MAX_VALUE in place
+
+    Returns:
+        np.ndarray: Bucket indices, same shape as values
+    """
+    np.clip(values, 0, MAX_VALUE, out=values)
+    # frexp's exponent is the bit length of each value
+    shift = np.frexp(values.astype(np.float64))[1].astype(np.int64)
+    shift -= SUB_BUCKET_BITS + 1
+    np.maximum(shift, 0, out=shift)
+    index = values >> shift
+    index += shift << SUB_BUCKET_BITS
+    return index
+
+
+class LatencyHistogram:
+    """
+    Log-linear histogram of durations in nanoseconds, in the style of
+    HdrHistogram: fixed buckets, constant relative precision, exact count,
+    sum and maximum.
+    """
+
+    def __init__(self) -> None:
+        self._counts = np.zeros(BUCKET_COUNT, dtype=np.int64)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, values: np.ndarray, index: np.ndarray) -> None:
+        """
+        Count a batch of durations.
+
+        Args:
+            values: Nanoseconds
+            index: Their buckets, from bucket_index()
+        """
+        if not len(values):
+            return
+        self._counts += np.bincount(index, minlength=BUCKET_COUNT)
+        self.count += len(values)
+        self.total += int(values.sum())
+        self.max = max(self.max, int(values.max()))
+
+    def record(self, value: int) -> None:
+        """
+        Count one duration, for low rate samples that are not worth batching.
+
+        Args:
+            value: Nanoseconds
+        """
+        value = min(max(int(value), 0), MAX_VALUE)
+        shift = max(value.bit_length() - SUB_BUCKET_BITS - 1, 0)
+        self._counts[(value >> shift) + (shift << SUB_BUCKET_BITS)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def reset(self) -> None:
+        """Drop every sample."""
+        self._counts[:] = 0
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def quantiles(self, quantiles: Sequence[float]) -> List[int]:
+        """
+        Return the value at each quantile, rounded up to its bucket.
+
+        Args:
+            quantiles: Fractions between 0 and 1
+
+        Returns:
+            List[int]: Nanoseconds, 0 without samples
+        """
+        if not self.count:
+            return [0 for _ in quantiles]
+        cumulative = np.cumsum(self._counts)
+        ranks = np.maximum(np.ceil(np.asarray(quantiles) * self.count), 1)
+        values = BUCKET_HIGHEST[np.searchsorted(cumulative, ranks)]
+        return [min(int(value), self.max) for value in values]
+
+    def cumulative_counts(self, bounds_ns: Sequence[int]) -> List[int]:
+        """
+        Return how many samples were at most each bound.
+
+        Samples in a bucket that straddles a bound are counted at the next
+        bound, never early.
+
+        Args:
+            bounds_ns: Ascending bounds in nanoseconds
+
+        Returns:
+            List[int]: Sample count per bound
+        """
+        cumulative = np.cumsum(self._counts)
+        last_bucket = np.searchsorted(BUCKET_HIGHEST, np.asarray(bounds_ns), side='right') - 1
+        return [int(cumulative[index]) if index >= 0 else 0 for index in last_bucket]
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in labels.items()) + '}'
+
+
+def format_metric(name: str, metric_type: str, help_text: str,
+                  samples: Iterable[Tuple[Dict[str, str], float]]) -> List[str]:
+    """
+    Format one metric family in the Prometheus text format.
+
+    Args:
+        name: Metric name
+        metric_type: counter, gauge or histogram
+        help_text: Description
+        samples: (labels, value) pairs
+
+    Returns:
+        List[str]: The lines of the family
+    """
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} {metric_type}']
+    for labels, value in samples:
+        lines.append(f'{name}{_format_labels(labels)} {value:g}' if isinstance(value, float)
+                     else f'{name}{_format_labels(labels)} {value}')
+    return lines
+
+
+class TelemetryMetrics:
+    """
+    Per-stage timings and counters of the telemetry hot path.
+
+    A frame costs the hot path one time.perf_counter_ns() per entry of
+    FRAME_MARKS and one ``record_frame`` call with the tuple of them,
+    ``record_frame`` is the bound ``extend`` of the pending list. Turning
+    the timestamps into stage durations, frame counters and histogram
+    buckets is left to ``fold``, which runs with NumPy on the reading side:
+    before every read and every FOLD_INTERVAL seconds on the thread started
+    by ``start_folding``, never on the thread that records. Only one thread
+    may record frames, any thread may fold and read.
+    """
+
+    def __init__(self) -> None:
+        self.histograms: Dict[str, LatencyHistogram] = {stage: LatencyHistogram() for stage in STAGES}
+        self._pending: List[int] = []
+        self.record_frame = self._pending.extend
+        self._lock = threading.Lock()
+        self._folder: Optional[threading.Thread] = None
+        self.frames_read = 0
+        self.frames_emitted = 0
+        self.frames_skipped = 0
+        self.reconnects = 0
+        self.errors: Dict[str, int] = {}
+
+    @property
+    def pending_frames(self) -> int:
+        """Frames recorded since the last fold."""
+        return len(self._pending) // len(FRAME_MARKS)
+
+    def histogram(self, stage: str) -> LatencyHistogram:
+        """Return the histogram of a stage, fold first to see the latest frames."""
+        return self.histograms[stage]
+
+    def count_error(self, error: BaseException) -> None:
+        """Count an exception by its type."""
+        name = type(error).__name__
+        self.errors[name] = self.errors.get(name, 0) + 1
+
+    def start_folding(self, interval: float = FOLD_INTERVAL) -> None:
+        """
+        Fold the pending frames periodically on a background thread, once.
+
+        Args:
+            interval: Seconds between folds
+        """
+        with self._lock:
+            if self._folder is not None:
+                return
+            self._folder = threading.Thread(target=self._fold_periodically, args=(interval,), daemon=True)
+            self._folder.start()
+
+    def _fold_periodically(self, interval: float) -> None:
+        """Thread function of start_folding."""
+        while True:
+            time.sleep(interval)
+            self.fold()
+
+    def fold(self) -> None:
+        """Move the pending frames into the histograms and frame counters."""
+        with self._lock:
+            # A frame is recorded by a single extend, so whole frames are taken
+            # and frames recorded while folding stay pending
+            taken = len(self._pending)
+            if not taken:
+                return
+            marks = np.fromiter(self._pending[:taken], dtype=np.int64, count=taken).reshape(-1, len(FRAME_MARKS))
+            del self._pending[:taken]
+
+            durations = np.empty((len(marks), len(STAGES)), dtype=np.int64)
+            np.subtract(marks[:, 1:], marks[:, :-1], out=durations[:, :-1])
+            np.subtract(marks[:, -1], marks[:, 0], out=durations[:, -1])
+            index = bucket_index(durations)
+            for column, (stage, histogram) in enumerate(self.histograms.items()):
+                values, stage_index = durations[:, column], index[:, column]
+                if stage in OPTIONAL_STAGES:
+                    ran = values > 0
+                    values, stage_index = values[ran], stage_index[ran]
+                histogram.add(values, stage_index)
+
+            # Frames that published nothing end where their data was ready
+            emitted = int(np.count_nonzero(marks[:, -1] != marks[:, FRAME_MARKS.index('ready')]))
+            self.frames_read += len(marks)
+            self.frames_emitted += emitted
+            self.frames_skipped += len(marks) - emitted
+
+    def reset(self) -> None:
+        """Clear every histogram and counter."""
+        with self._lock:
+            self._pending.clear()
+            for histogram in self.histograms.values():
+                histogram.reset()
+            self.frames_read = 0
+            self.frames_emitted = 0
+            self.frames_skipped = 0
+            self.reconnects = 0
+            self.errors = {}
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Return the stage timings.
+
+        Returns:
+            Dict[str, Dict[str, float]]: Count, mean, quantiles and max in
+                microseconds by stage
+        """
+        self.fold()
+        stats = {}
+        for stage, histogram in self.histograms.items():
+            p50, p90, p99, p999 = histogram.quantiles(EXPORT_QUANTILES)
+            stats[stage] = {
+                'count': histogram.count,
+                'mean_us': round(histogram.total / histogram.count / 1000, 3) if histogram.count else 0.0,
+                'p50_us': p50 / 1000,
+                'p90_us': p90 / 1000,
+                'p99_us': p99 / 1000,
+                'p999_us': p999 / 1000,
+                'max_us': histogram.max / 1000,
+            }
+        return stats
+
+    def render(self) -> List[str]:
+        """
+        Format the timings and counters in the Prometheus text format.
+
+        Returns:
+            List[str]: Lines of the /metrics output
+        """
+        self.fold()
+        bounds_ns = [round(bound * 1e9) for bound in EXPORT_BOUNDS]
+        buckets, sums, counts, quantiles, maxima = [], [], [], [], []
+        for stage, histogram in self.histograms.items():
+            for bound, count in zip(EXPORT_BOUNDS, histogram.cumulative_counts(bounds_ns)):
+                buckets.append(({'stage': stage, 'le': f'{bound:g}'}, count))
+            buckets.append(({'stage': stage, 'le': '+Inf'}, histogram.count))
+            sums.append(({'stage': stage}, histogram.total / 1e9))
+            counts.append(({'stage': stage}, histogram.count))
+            for quantile, value in zip(EXPORT_QUANTILES, histogram.quantiles(EXPORT_QUANTILES)):
+                quantiles.append(({'stage': stage, 'quantile': f'{quantile:g}'}, value / 1e9))
+            maxima.append(({'stage': stage}, histogram.max / 1e9))
+
+        name = 'rah_stage_duration_seconds'
+        lines = [f'# HELP {name} Time spent in each stage of the telemetry hot path',
+                 f'# TYPE {name} histogram']
+        for labels, value in buckets:
+            lines.append(f'{name}_bucket{_format_labels(labels)} {value}')
+        for labels, value in sums:
+            lines.append(f'{name}_sum{_format_labels(labels)} {value:g}')
+        for labels, value in counts:
+            lines.append(f'{name}_count{_format_labels(labels)} {value}')
+        lines += format_metric('rah_stage_duration_quantile_seconds', 'gauge',
+                               'Stage duration quantiles since start, within 6%', quantiles)
+        lines += format_metric('rah_stage_duration_max_seconds', 'gauge', 'Longest stage duration since start', maxima)
+        lines += format_metric('rah_frames_read_total', 'counter', 'Telemetry frames decoded', [({}, self.frames_read)])
+        lines += format_metric('rah_frames_emitted_total', 'counter', 'Frames published to at least one channel',
+                               [({}, self.frames_emitted)])
+        lines += format_metric('rah_frames_skipped_total', 'counter', 'Frames read while no channel was due',
+                               [({}, self.frames_skipped)])
+        lines += format_metric('rah_reconnects_total', 'counter', 'Connections to the sim after the first',
+                               [({}, self.reconnects)])
+        lines += format_metric('rah_errors_total', 'counter', 'Errors in the telemetry hot path by type',
+                               [({'type': name}, count) for name, count in sorted(self.errors.items())])
+        return lines
+
+
+_metrics: Optional[TelemetryMetrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_telemetry_metrics() -> TelemetryMetrics:
+    """
+    Return the hot path metrics of this process.
+
+    Returns:
+        TelemetryMetrics: The shared metrics, created on first use
+    """
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = TelemetryMetrics()
+        return _metrics
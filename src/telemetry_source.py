@@ -0,0 +1,268 @@
+import irsdk
+import os
+import time
+import logging
+from typing import Any, Mapping, Optional, Tuple
+
+from ibt_reader import IbtFile, open_ibt
+
+
+class TelemetrySource:
+    """
+    Interface for anything that can feed telemetry frames to the DataProvider.
+
+    The methods mirror the subset of ``irsdk.IRSDK`` that the DataProvider
+    relies on, so the live SDK and recorded sessions can be used interchangeably.
+    """
+
+    def startup(self) -> bool:
+        """
+        Open the underlying telemetry source.
+
+        Returns:
+            bool: True if the source is ready to deliver frames
+        """
+        raise NotImplementedError
+
+    def shutdown(self) -> None:
+        """Release the underlying telemetry source."""
+        raise NotImplementedError
+
+    def freeze_var_buffer_latest(self) -> None:
+        """Select the most recent frame so that every read sees the same sample."""
+        raise NotImplementedError
+
+    @property
+    def tick_count(self) -> Optional[int]:
+        """Sim tick of the frozen frame, None if the source cannot tell."""
+        return None
+
+    @property
+    def tick_rate(self) -> Optional[float]:
+        """Rate at which new frames become available, None if unpaced."""
+        return 60.0
+
+    @property
+    def has_data_event(self) -> bool:
+        """Whether freezing a frame blocks until the sim signals new data."""
+        return False
+
+    @property
+    def session_info_update(self) -> Optional[int]:
+        """Counter bumped whenever the SessionInfo YAML changes, None if unknown."""
+        return None
+
+    @property
+    def var_headers(self) -> Optional[Mapping[str, Any]]:
+        """
+        Var headers (type, offset, count) by variable name, None if the source
+        has no raw buffer. A new mapping object means the layout changed.
+        """
+        return None
+
+    def frozen_buffer(self) -> Optional[Tuple[Any, int]]:
+        """
+        Return the frozen var buffer and the offset of the frame inside it.
+
+        Returns:
+            Optional[Tuple[Any, int]]: (buffer, offset), None without a raw buffer
+        """
+        return None
+
+    def __getitem__(self, key: str) -> Any:
+        """
+        Read a telemetry variable or a SessionInfo section by name.
+
+        Args:
+            key: Variable name (e.g. 'Speed') or SessionInfo section (e.g. 'SessionInfo')
+
+        Returns:
+            Any: The value of the variable, or None if it is unknown
+        """
+        raise NotImplementedError
+
+
+class IRSDKSource(TelemetrySource):
+    """Live telemetry read from iRacing's shared memory through pyirsdk."""
+
+    def __init__(self) -> None:
+        self.ir_sdk = irsdk.IRSDK()
+        self._frozen_tick: Optional[int] = None
+
+    def startup(self) -> bool:
+        return bool(self.ir_sdk.startup())
+
+    def shutdown(self) -> None:
+        self.ir_sdk.shutdown()
+        self._frozen_tick = None
+
+    def freeze_var_buffer_latest(self) -> None:
+        # pyirsdk waits on the data-valid event (when there is one) before
+        # picking the newest buffer, so this blocks until the next sim tick.
+        self.ir_sdk.freeze_var_buffer_latest()
+        self._frozen_tick = self.ir_sdk._var_buffer_latest.tick_count
+
+    @property
+    def tick_count(self) -> Optional[int]:
+        return self._frozen_tick
+
+    @property
+    def tick_rate(self) -> Optional[float]:
+        header = self.ir_sdk._header
+        return float(header.tick_rate) if header and header.tick_rate else 60.0
+
+    @property
+    def has_data_event(self) -> bool:
+        return bool(self.ir_sdk._data_valid_event)
+
+    @property
+    def session_info_update(self) -> Optional[int]:
+        return self.ir_sdk.session_info_update if self.ir_sdk.is_initialized else None
+
+    @property
+    def var_headers(self) -> Optional[Mapping[str, Any]]:
+        # pyirsdk drops this dict on shutdown and rebuilds it on the next
+        # startup, so its identity tracks the header layout.
+        return self.ir_sdk._var_headers_dict if self.ir_sdk.is_initialized else None
+
+    def frozen_buffer(self) -> Optional[Tuple[Any, int]]:
+        var_buffer = self.ir_sdk._var_buffer_latest
+        return var_buffer.get_memory(), var_buffer.buf_offset
+
+    def __getitem__(self, key: str) -> Any:
+        return self.ir_sdk[key]
+
+
+class IBTReplaySource(TelemetrySource):
+    """
+    Replays a recorded iRacing ``.ibt`` telemetry file.
+
+    Frames are served at the recording's tick rate multiplied by ``speed``.
+    A speed of 0 disables pacing and advances exactly one record every time
+    a frame is frozen, which is what benchmarks want.
+    """
+
+    def __init__(self, ibt_path: str, speed: float = 1.0, loop: bool = True) -> None:
+        """
+        Initialize the replay source.
+
+        Args:
+            ibt_path: Path to the recorded .ibt file
+            speed: Playback speed multiplier (1.0 = real time, 0 = as fast as possible)
+            loop: Whether to restart from the first record once the file is exhausted
+        """
+        self.ibt_path = ibt_path
+        self.speed = max(float(speed), 0.0)
+        self.loop = loop
+        self.finished = False
+        self._ibt: Optional[IbtFile] = None
+        self._session_sdk: Optional[irsdk.IRSDK] = None
+        self._record_count = 0
+        self._tick_rate = 60
+        self._record_index = 0
+        self._tick = 0
+        self._started_at = 0.0
+
+    def startup(self) -> bool:
+        if self._ibt is not None:
+            return True
+
+        self._ibt = open_ibt(self.ibt_path)
+        if self._ibt is None:
+            return False
+
+        try:
+            # The .ibt header has the same layout as the live shared memory,
+            # so pyirsdk can parse the SessionInfo YAML straight from the file.
+            self._session_sdk = irsdk.IRSDK()
+            self._session_sdk.startup(test_file=self.ibt_path)
+        except Exception as e:
+            logging.error(f"Could not open replay file {self.ibt_path}: {e}")
+            self.shutdown()
+            return False
+
+        self._record_count = self._ibt.record_count
+        self._tick_rate = self._ibt.tick_rate or 60
+        if self._record_count <= 0:
+            logging.error(f"Replay file {self.ibt_path} contains no telemetry records")
+            self.shutdown()
+            return False
+
+        self._record_index = 0
+        self._tick = -1 if self.speed == 0 else 0
+        self._started_at = time.monotonic()
+        self.finished = False
+        logging.info(f"Replaying {self._record_count} records from {self.ibt_path} at speed {self.speed or 'max'}")
+        return True
+
+    def shutdown(self) -> None:
+        if self._ibt is not None:
+            self._ibt.close()
+            self._ibt = None
+        if self._session_sdk is not None:
+            self._session_sdk.shutdown()
+            self._session_sdk = None
+
+    def freeze_var_buffer_latest(self) -> None:
+        if self.speed == 0:
+            tick = self._tick + 1
+        else:
+            elapsed = time.monotonic() - self._started_at
+            tick = int(elapsed * self._tick_rate * self.speed)
+
+        if tick >= self._record_count and not self.loop:
+            tick = self._record_count - 1
+            self.finished = True
+
+        self._tick = tick
+        self._record_index = tick % self._record_count
+
+    @property
+    def tick_count(self) -> Optional[int]:
+        return self._tick
+
+    @property
+    def tick_rate(self) -> Optional[float]:
+        return self._tick_rate * self.speed if self.speed else None
+
+    @property
+    def session_info_update(self) -> Optional[int]:
+        return self._ibt.session_info_update if self._ibt else None
+
+    @property
+    def var_headers(self) -> Optional[Mapping[str, Any]]:
+        return self._ibt.var_headers if self._ibt else None
+
+    def frozen_buffer(self) -> Optional[Tuple[Any, int]]:
+        return (self._ibt.record(self._record_index), 0) if self._ibt else None
+
+    def __getitem__(self, key: str) -> Any:
+        if self._ibt is None:
+            return None
+        if key in self._ibt:
+            return self._ibt[key][self._record_index].tolist()
+        return self._session_sdk[key] if self._session_sdk else None
+
+
+def create_telemetry_source() -> TelemetrySource:
+    """
+    Create the telemetry source selected by the environment.
+
+    Setting ``RAH_REPLAY_FILE`` to a recorded .ibt file replays it instead of
+    reading the live sim. ``RAH_REPLAY_SPEED`` sets the playback multiplier
+    (0 = as fast as possible) and ``RAH_REPLAY_LOOP=false`` stops at the end.
+
+    Returns:
+        TelemetrySource: The configured telemetry source
+    """
+    replay_file = os.environ.get('RAH_REPLAY_FILE')
+    if not replay_file:
+        return IRSDKSource()
+
+    try:
+        speed = float(os.environ.get('RAH_REPLAY_SPEED', '1.0'))
+    except ValueError:
+        logging.warning("Invalid RAH_REPLAY_SPEED, replaying in real time")
+        speed = 1.0
+    loop = os.environ.get('RAH_REPLAY_LOOP', 'true').lower() == 'true'
+    return IBTReplaySource(replay_file, speed=speed, loop=loop)
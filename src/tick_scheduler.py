@@ -0,0 +1,159 @@
+import time
+import math
+from typing import Any, Dict, Optional
+
+
+class TickScheduler:
+    """
+    Paces the telemetry loop on the simulation tick instead of a fixed sleep.
+
+    Wake-ups are scheduled against absolute deadlines one sim period apart,
+    so the time spent processing a frame is absorbed instead of added on top
+    of the sleep. When a poll finds that the tick has not advanced yet, the
+    scheduler retries shortly after and re-aligns its phase to the moment
+    the new tick was actually seen.
+
+    It also keeps the counters needed to check that every sim tick is emitted
+    exactly once: duplicate polls, duplicate emits, missed ticks and the
+    wake-up and emit-interval jitter.
+    """
+
+    RETRY_DIVISOR = 10
+
+    def __init__(self, tick_rate: Optional[float] = 60.0, event_driven: bool = False) -> None:
+        """
+        Initialize the scheduler.
+
+        Args:
+            tick_rate: Sim ticks per second, None or 0 to run unpaced
+            event_driven: True when the source blocks until new data is ready,
+                in which case the scheduler never sleeps
+        """
+        self.event_driven = event_driven
+        self.set_tick_rate(tick_rate)
+        self.reset_stats()
+
+    def set_tick_rate(self, tick_rate: Optional[float]) -> None:
+        """
+        Change the expected sim tick rate and restart the deadline phase.
+
+        Args:
+            tick_rate: Sim ticks per second, None or 0 to run unpaced
+        """
+        self.period = 1.0 / tick_rate if tick_rate else 0.0
+        self._deadline: Optional[float] = None
+        self._retrying = False
+
+    def reset_stats(self) -> None:
+        """Clear all counters and jitter measurements."""
+        self.frames_emitted = 0
+        self.duplicate_polls = 0
+        self.duplicate_emits = 0
+        self.missed_ticks = 0
+        self.overruns = 0
+        self._last_tick: Optional[int] = None
+        self._last_emit_at: Optional[float] = None
+        self._wake_jitter_sum = 0.0
+        self._wake_jitter_max = 0.0
+        self._wake_count = 0
+        self._interval_error_sum = 0.0
+        self._interval_error_sq_sum = 0.0
+        self._interval_count = 0
+
+    def wait(self) -> None:
+        """Sleep until the next deadline and record how late the wake-up was."""
+        if self.event_driven or not self.period:
+            # Still yield so an unpaced loop cannot starve other threads
+            time.sleep(0)
+            return
+
+        now = time.perf_counter()
+        if self._deadline is None:
+            self._deadline = now
+            return
+
+        remaining = self._deadline - now
+        if remaining > 0:
+            time.sleep(remaining)
+            now = time.perf_counter()
+
+        lateness = now - self._deadline
+        if lateness > self.period:
+            # Processing fell behind by more than a whole tick, start over
+            # from now rather than bursting to catch up.
+            self.overruns += 1
+            self._deadline = now
+            return
+
+        self._wake_jitter_sum += lateness
+        self._wake_jitter_max = max(self._wake_jitter_max, lateness)
+        self._wake_count += 1
+
+    def frame_unchanged(self) -> None:
+        """Record a poll that found the same tick as the last emitted frame."""
+        self.duplicate_polls += 1
+        if self._deadline is not None and self.period:
+            self._retrying = True
+            self._deadline = time.perf_counter() + self.period / self.RETRY_DIVISOR
+
+    def frame_emitted(self, tick: Optional[int]) -> None:
+        """
+        Record an emitted frame and schedule the next deadline.
+
+        Args:
+            tick: Sim tick of the emitted frame, None if the source has no tick
+        """
+        now = time.perf_counter()
+
+        if tick is not None and self._last_tick is not None:
+            delta = tick - self._last_tick
+            if delta <= 0:
+                self.duplicate_emits += 1
+            elif delta > 1:
+                self.missed_ticks += delta - 1
+        if tick is not None:
+            self._last_tick = tick
+
+        if self._last_emit_at is not None and self.period:
+            error = (now - self._last_emit_at) - self.period
+            self._interval_error_sum += error
+            self._interval_error_sq_sum += error * error
+            self._interval_count += 1
+        self._last_emit_at = now
+        self.frames_emitted += 1
+
+        if self._deadline is not None and self.period:
+            if self._retrying:
+                # The tick edge was found by retrying, lock onto it
+                self._deadline = now + self.period
+                self._retrying = False
+            else:
+                self._deadline += self.period
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return the loop statistics.
+
+        Returns:
+            Dict[str, Any]: Counters and jitter figures in milliseconds
+        """
+        wake_mean = self._wake_jitter_sum / self._wake_count if self._wake_count else 0.0
+        if self._interval_count:
+            mean_error = self._interval_error_sum / self._interval_count
+            variance = max(self._interval_error_sq_sum / self._interval_count - mean_error * mean_error, 0.0)
+            interval_jitter = math.sqrt(variance)
+        else:
+            interval_jitter = 0.0
+
+        return {
+            'tick_rate': round(1.0 / self.period, 3) if self.period else None,
+            'event_driven': self.event_driven,
+            'frames_emitted': self.frames_emitted,
+            'duplicate_polls': self.duplicate_polls,
+            'duplicate_emits': self.duplicate_emits,
+            'missed_ticks': self.missed_ticks,
+            'overruns': self.overruns,
+            'wake_jitter_mean_ms': round(wake_mean * 1000, 3),
+            'wake_jitter_max_ms': round(self._wake_jitter_max * 1000, 3),
+            'emit_interval_jitter_ms': round(interval_jitter * 1000, 3),
+        }
@@ -1,3 +1,6 @@
+# Mode detection and the eventlet monkey patch, before anything else is imported
+from server_mode import using_fallback_mode, using_asyncio_mode
+
 import os
 import sys
 import platform
@@ -6,39 +9,7 @@ import threading
 import logging
 from typing import List, Dict, Optional, Any, Union
 
-using_fallback_mode = False
-
-force_threading = os.environ.get('FORCE_THREADING_MODE', 'false').lower() == 'true'
-
-if force_threading:
-    using_fallback_mode = True
-    logging.info("Using threading mode due to FORCE_THREADING_MODE environment variable")
-
-elif platform.system() == 'Windows':
-    os.environ['EVENTLET_NO_GREENDNS'] = 'yes'
-    
-    if getattr(sys, 'frozen', False):
-        os.environ['EVENTLET_THREADPOOL_SIZE'] = '30'
-
-if not using_fallback_mode:
-    try:
-        import eventlet
-        if platform.system() == 'Windows':
-            eventlet.monkey_patch(os=False, thread=False, time=False)
-        else:
-            eventlet.monkey_patch()
-    except ImportError as e:
-        logging.warning(f"Cannot import eventlet: {e}")
-        logging.info("Falling back to pure threading mode")
-        using_fallback_mode = True
-    except Exception as e:
-        logging.warning(f"Error initializing eventlet: {e}")
-        if platform.system() == 'Windows' and getattr(sys, 'frozen', False):
-            logging.info("This is likely due to PyInstaller packaging issues with eventlet.")
-            logging.info("Falling back to pure threading mode")
-        using_fallback_mode = True
-
-from flask import Flask, send_from_directory
+from flask import Flask, Response, jsonify, request
 
 if not using_fallback_mode:
     try:
@@ -55,9 +26,18 @@ if using_fallback_mode:
         logging.critical("Application cannot run without SocketIO support")
         sys.exit(1)
 
-from data_provider import DataProvider
-from interface import interface_bp
+from data_provider import DataProvider, INPUT_KEYS
+from tick_scheduler import TickScheduler
+from telemetry_history import TelemetryHistory
+from telemetry_channel import TelemetryChannel, ENCODING_FULL, ENCODING_DELTA
+from telemetry_metrics import format_metric, get_telemetry_metrics
+from interface import interface_bp, get_window_stats
 from overlays import overlays_bp
+from static_assets import get_static_assets
+from overlay_registry import get_overlay_registry
+from window_pool import get_window_pool
+from overlay_host import HOST_MODE, get_overlay_host
+import startup_profile
 
 
 def resource_path(relative_path: str) -> str:
@@ -77,30 +57,126 @@ def resource_path(relative_path: str) -> str:
     return os.path.join(base_path, relative_path)
 
 
-class TelemetryNamespace(Namespace):
+KEYFRAME_INTERVAL = int(os.environ.get('RAH_KEYFRAME_INTERVAL', '120'))
+
+# Emit rates in messages per second by overlay, None sends every sim tick.
+# An overlay can set its own with "emit_rate" in properties.json and the
+# RAH_EMIT_RATES environment variable (e.g. "driver_in_front=1") overrides both.
+DEFAULT_EMIT_RATES: Dict[str, Optional[float]] = {
+    'input_telemetry': None,
+    'driver_in_front': 2.0,
+}
+
+
+def parse_emit_rates(spec: str) -> Dict[str, Optional[float]]:
+    """
+    Parse an emit rate override list.
+
+    Args:
+        spec: Comma separated overlay=rate pairs, a rate of 0 sends every tick
+
+    Returns:
+        Dict[str, Optional[float]]: Emit rate by overlay name
+    """
+    rates: Dict[str, Optional[float]] = {}
+    for item in spec.split(','):
+        if not item.strip():
+            continue
+        try:
+            name, rate = item.split('=', 1)
+            rates[name.strip()] = float(rate) or None
+        except ValueError:
+            logging.warning(f"Ignoring invalid emit rate '{item}'")
+    return rates
+
+
+EMIT_RATE_OVERRIDES = parse_emit_rates(os.environ.get('RAH_EMIT_RATES', ''))
+
+# Seconds of driver inputs kept server-side (0 disables the history), the
+# samples per second it is sized for, and the seconds sent to a client that
+# connects to /input_telemetry
+HISTORY_SECONDS = float(os.environ.get('RAH_HISTORY_SECONDS', '60'))
+HISTORY_SAMPLE_RATE = 60
+BACKFILL_SECONDS = float(os.environ.get('RAH_BACKFILL_SECONDS', '12'))
+
+# Seconds between the frames overlays are asked to echo back once rendered,
+# to measure the sim-to-screen latency. 0 turns the echoes off.
+LATENCY_PROBE_INTERVAL = float(os.environ.get('RAH_LATENCY_PROBE_INTERVAL', '1'))
+
+
+class ChannelNamespace(Namespace):
+    """
+    Socket.IO namespace whose clients are served by a TelemetryChannel.
+
+    Clients choose their wire encoding with the `encoding` query parameter
+    ('full' by default, 'delta' or 'binary').
+    """
+
+    def __init__(self, namespace: str, channel: TelemetryChannel) -> None:
+        """
+        Initialize the namespace.
+
+        Args:
+            namespace: Namespace path, e.g. '/input_telemetry'
+            channel: Channel that emits to this namespace
+        """
+        super().__init__(namespace)
+        self.channel = channel
+
+    def on_connect(self, auth: Optional[Dict[str, Any]] = None) -> None:
+        """Register the client with the encoding it asked for."""
+        encoding = request.args.get('encoding') or (auth or {}).get('encoding') or ENCODING_FULL
+        encoding = self.channel.add_client(request.sid, encoding)
+        logging.info(f"Client {request.sid} connected to {self.namespace} ({encoding})")
+
+    def on_disconnect(self, reason: Optional[str] = None) -> None:
+        """Forget the client."""
+        self.channel.remove_client(request.sid)
+        logging.info(f"Client {request.sid} disconnected from {self.namespace}")
+
+    def on_request_keyframe(self) -> None:
+        """Resend the state (delta) or schema (binary) to a client that lost track."""
+        self.channel.send_keyframe(request.sid)
+
+    def on_latency_echo(self, echo: Dict[str, Any]) -> None:
+        """Record the receipt and render times a client echoed for a probe frame."""
+        self.channel.record_latency_echo(request.sid, echo)
+
+
+class TelemetryNamespace(ChannelNamespace):
     """Socket.IO namespace for telemetry data."""
+
+    def __init__(self, namespace: str, channel: TelemetryChannel,
+                 history: Optional[TelemetryHistory] = None) -> None:
+        """
+        Initialize the namespace.
+
+        Args:
+            namespace: Namespace path, e.g. '/input_telemetry'
+            channel: Channel that emits to this namespace
+            history: Recent driver inputs sent to clients when they connect
+        """
+        super().__init__(namespace, channel)
+        self.history = history
     
-    def on_connect(self) -> None:
+    def on_connect(self, auth: Optional[Dict[str, Any]] = None) -> None:
         """Handle client connection to telemetry namespace."""
-        print("Client connected to telemetry namespace")
-        logging.info("Client connected to telemetry namespace")
+        logging.debug("Client connected to telemetry namespace")
+        super().on_connect(auth)
 
-    def on_disconnect(self) -> None:
+        # Backfill the input graph, values are float32 bytes per field
+        if self.history is not None and self.history.count:
+            backfill = self.history.to_message(seconds=BACKFILL_SECONDS, binary=True)
+            self.emit('telemetry_history', backfill, room=request.sid)
+
+    def on_disconnect(self, reason: Optional[str] = None) -> None:
         """Handle client disconnection from telemetry namespace."""
-        print("Client disconnected from telemetry namespace")
-        logging.info("Client disconnected from telemetry namespace")
+        logging.debug("Client disconnected from telemetry namespace")
+        super().on_disconnect(reason)
 
 
-class DriverInFrontNamespace(Namespace):
+class DriverInFrontNamespace(ChannelNamespace):
     """Socket.IO namespace for driver in front data."""
-    
-    def on_connect(self) -> None:
-        """Handle client connection to driver in front namespace."""
-        logging.info("Client connected to driver in front namespace")
-
-    def on_disconnect(self) -> None:
-        """Handle client disconnection from driver in front namespace."""
-        logging.info("Client disconnected from driver in front namespace")
 
 
 class WebInterface:
@@ -111,6 +187,9 @@ class WebInterface:
     transmission between the iRacing sim and the overlay interface.
     """
 
+    RECONNECT_INTERVAL = 1.0
+    IDLE_INTERVAL = 1.0
+
     def __init__(self, selected_overlays: Optional[List[str]] = None) -> None:
         """
         Initialize the web interface.
@@ -120,11 +199,21 @@ class WebInterface:
         """
         self.selected_overlays = selected_overlays or []
         self.app = Flask(__name__)
+        # Cached overlay pages are rerendered when their file changes, Jinja
+        # must not hand back its compiled copy of the old file then
+        self.app.config['TEMPLATES_AUTO_RELOAD'] = True
         self.app.register_blueprint(interface_bp, url_prefix='/')
         self.app.register_blueprint(overlays_bp, url_prefix='/overlay')
+        self._setup_static_assets()
         
         self._configure_socketio()
+        self.subscribers_changed = threading.Event()
+        self._create_channels()
         self.data_provider = DataProvider()
+        self.tick_scheduler = TickScheduler()
+        self.metrics = get_telemetry_metrics()
+        self.telemetry_history = (TelemetryHistory(INPUT_KEYS, int(HISTORY_SECONDS * HISTORY_SAMPLE_RATE))
+                                  if HISTORY_SECONDS > 0 else None)
         self._setup_routes()
         self.telemetry_thread = None
         self.shutdown_flag = False
@@ -134,7 +223,13 @@ class WebInterface:
     def _configure_socketio(self) -> None:
         """Configure the Socket.IO server with appropriate settings."""
         socketio_kwargs = {}
-        
+
+        if using_asyncio_mode:
+            from asgi_server import AsyncSocketIO
+            self.socketio = AsyncSocketIO(self.app, cors_allowed_origins='*')
+            logging.info("Using asyncio mode for SocketIO")
+            return
+
         if using_fallback_mode or (platform.system() == 'Windows' and getattr(sys, 'frozen', False)):
             socketio_kwargs = {
                 'async_mode': 'threading',
@@ -154,42 +249,231 @@ class WebInterface:
             
         self.socketio = SocketIO(self.app, **socketio_kwargs)
 
-    def _setup_namespaces(self) -> None:
+    def _create_channels(self) -> None:
+        """Create the emit channel of every overlay namespace."""
+        # The asyncio server sends from a queue, skip whole frames while it catches up
+        backlogged = self.socketio.is_backlogged if using_asyncio_mode else None
+        self.telemetry_channel = TelemetryChannel(
+            self.socketio, '/input_telemetry', 'telemetry_update', KEYFRAME_INTERVAL,
+            on_subscribers_changed=self.subscribers_changed.set,
+            emit_rate=self._emit_rate('input_telemetry'),
+            latency_probe_interval=LATENCY_PROBE_INTERVAL,
+            is_backlogged=backlogged)
+        # session_type is a string, so this payload cannot be packed as binary
+        self.driver_in_front_channel = TelemetryChannel(
+            self.socketio, '/driver_in_front', 'driver_in_front_update', KEYFRAME_INTERVAL,
+            encodings=(ENCODING_FULL, ENCODING_DELTA),
+            on_subscribers_changed=self.subscribers_changed.set,
+            emit_rate=self._emit_rate('driver_in_front'),
+            latency_probe_interval=LATENCY_PROBE_INTERVAL,
+            is_backlogged=backlogged)
+        self.channels = [self.telemetry_channel, self.driver_in_front_channel]
+
+    def _emit_rate(self, overlay: str) -> Optional[float]:
         """
-        Register Socket.IO namespaces for each overlay by automatically scanning the overlays directory.
+        Resolve the emit rate of an overlay's channel.
+
+        Args:
+            overlay: Overlay folder name
+
+        Returns:
+            Optional[float]: Messages per second, None to send every sim tick
         """
-        overlays_dir = resource_path('overlays')
-        available_overlays = []
-        try:
-            for item in os.listdir(overlays_dir):
-                overlay_path = os.path.join(overlays_dir, item)
-                if os.path.isdir(overlay_path) and os.path.exists(os.path.join(overlay_path, f'{item}.html')):
-                    print(item)
-                    available_overlays.append(item)
-        except Exception as e:
-            logging.error(f"Error scanning overlays directory: {e}")
+        if overlay in EMIT_RATE_OVERRIDES:
+            return EMIT_RATE_OVERRIDES[overlay]
+
+        properties = get_overlay_registry().properties(overlay) or {}
+        if 'emit_rate' in properties:
+            try:
+                return float(properties['emit_rate'] or 0) or None
+            except (ValueError, TypeError) as e:
+                logging.warning(f"Invalid emit_rate for {overlay}: {e}")
+
+        return DEFAULT_EMIT_RATES.get(overlay)
 
+    def _setup_namespaces(self) -> None:
+        """
+        Register Socket.IO namespaces for each overlay found by the overlay registry.
+        """
+        available_overlays = get_overlay_registry().folder_names(with_page=True)
         logging.info(f"Found overlays: {available_overlays}")
 
         for overlay in available_overlays:
-            print(overlay)
+            logging.debug(f"Setting up namespace for overlay: {overlay}")
             if overlay == 'driver_in_front':
-                self.socketio.on_namespace(DriverInFrontNamespace(f'/{overlay}'))
-                print(f"Registered driver in front namespace: {overlay}")
+                self.socketio.on_namespace(self._driver_in_front_namespace(f'/{overlay}'))
+                logging.info(f"Registered driver in front namespace: {overlay}")
             elif overlay == 'input_telemetry':
-                self.socketio.on_namespace(TelemetryNamespace(f'/{overlay}'))
-                print(f"Registered telemetry namespace: {overlay}")
+                self.socketio.on_namespace(self._telemetry_namespace(f'/{overlay}'))
+                logging.info(f"Registered telemetry namespace: {overlay}")
 
         logging.info(f"Registered Socket.IO namespaces for overlays: {available_overlays}")
 
+    def _telemetry_namespace(self, namespace: str) -> Any:
+        """Create the input telemetry namespace handler for the server mode in use."""
+        if using_asyncio_mode:
+            from asgi_server import AsyncTelemetryNamespace
+            return AsyncTelemetryNamespace(namespace, self.telemetry_channel, self.telemetry_history, BACKFILL_SECONDS)
+        return TelemetryNamespace(namespace, self.telemetry_channel, self.telemetry_history)
+
+    def _driver_in_front_namespace(self, namespace: str) -> Any:
+        """Create the driver in front namespace handler for the server mode in use."""
+        if using_asyncio_mode:
+            from asgi_server import AsyncChannelNamespace
+            return AsyncChannelNamespace(namespace, self.driver_in_front_channel)
+        return DriverInFrontNamespace(namespace, self.driver_in_front_channel)
+
+    def _setup_static_assets(self) -> None:
+        """
+        Precompress the static files and fingerprint the URLs built for them.
+        """
+        assets = get_static_assets()
+        assets.add_folder('common', resource_path(os.path.join('common', 'js')))
+        assets.add_folder('interface', os.path.join(interface_bp.root_path, 'static'))
+        for overlay in get_overlay_registry().folder_names():
+            assets.add_folder(f'overlays/{overlay}', resource_path(os.path.join('overlays', overlay, 'static')))
+        assets.build()
+        self.app.url_defaults(self._fingerprint_url)
+
+    @staticmethod
+    def _fingerprint_url(endpoint: str, values: Dict[str, Any]) -> None:
+        """
+        Add the content hash to URLs of static files, see StaticAssets.
+        
+        Args:
+            endpoint: Endpoint the URL is built for
+            values: URL values, updated in place
+        """
+        filename = values.get('filename')
+        if not filename or 'v' in values:
+            return
+        if endpoint == 'serve_common_js':
+            bundle = 'common'
+        elif endpoint == 'interface.serve_static':
+            bundle = 'interface'
+        elif endpoint == 'interface.serve_images':
+            bundle, filename = 'interface', f'images/{filename}'
+        elif endpoint == 'overlays.serve_static':
+            bundle = f"overlays/{values.get('overlay_name')}"
+        else:
+            return
+        fingerprint = get_static_assets().fingerprint(bundle, filename)
+        if fingerprint:
+            values['v'] = fingerprint
+
     def _setup_routes(self) -> None:
         """
         Set up additional routes for serving common static files.
         """
         @self.app.route('/common/js/<path:filename>')
         def serve_common_js(filename: str):
-            common_js_folder = resource_path(os.path.join('common', 'js'))
-            return send_from_directory(common_js_folder, filename)
+            return get_static_assets().send('common', filename)
+
+        @self.app.route('/telemetry_stats')
+        def telemetry_stats():
+            return jsonify(self.get_loop_stats())
+
+        @self.app.route('/metrics')
+        def metrics():
+            return Response('\n'.join(self.render_metrics()) + '\n',
+                            mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+        @self.app.route('/lap_history')
+        def lap_history():
+            session_num = request.args.get('session', type=int)
+            return jsonify(self.data_provider.get_lap_history(session_num))
+
+        @self.app.route('/telemetry_history')
+        def telemetry_history():
+            if self.telemetry_history is None:
+                return jsonify({'error': 'Telemetry history is disabled'}), 404
+            try:
+                seconds = request.args.get('seconds', type=float)
+                count = request.args.get('count', type=int)
+                fields = request.args.get('fields')
+                fields = fields.split(',') if fields else None
+                return jsonify(self.telemetry_history.to_message(count=count, seconds=seconds, fields=fields))
+            except Exception as e:
+                logging.error(f"Error reading telemetry history: {e}")
+                return jsonify({'error': str(e)}), 500
+
+    def get_loop_stats(self) -> Dict[str, Any]:
+        """
+        Return the telemetry loop statistics.
+
+        Returns:
+            Dict[str, Any]: Emitted frames, duplicate and missed tick counts, jitter,
+                the Socket.IO async mode, the subscribers, emit rate and latency
+                of every namespace, the hot path stage timings, the JS bridge
+                calls of every overlay window and in asyncio mode the queued
+                and dropped emits
+        """
+        stats = self.tick_scheduler.get_stats()
+        stats['async_mode'] = self.socketio.async_mode
+        stats['connected'] = self.data_provider.is_connected
+        stats['last_tick'] = self.data_provider.frame_tick
+        stats['channels'] = {channel.namespace: channel.get_stats() for channel in self.channels}
+        stats['stages'] = self.metrics.get_stats()
+        stats['windows'] = get_window_stats()
+        if using_asyncio_mode:
+            stats['emits_pending'] = self.socketio.pending_count
+            stats['emits_dropped'] = self.socketio.emits_dropped
+        return stats
+
+    def render_metrics(self) -> List[str]:
+        """
+        Format the hot path metrics in the Prometheus text format.
+
+        Returns:
+            List[str]: Stage timings, frame and error counters, the telemetry
+                loop counters and the frames of every namespace
+        """
+        lines = self.metrics.render()
+        scheduler = self.tick_scheduler
+        lines += format_metric('rah_connected', 'gauge', 'Whether the sim is connected',
+                               [({}, int(self.data_provider.is_connected))])
+        lines += format_metric('rah_duplicate_polls_total', 'counter', 'Polls that found no new sim tick',
+                               [({}, scheduler.duplicate_polls)])
+        lines += format_metric('rah_missed_ticks_total', 'counter', 'Sim ticks the loop never read',
+                               [({}, scheduler.missed_ticks)])
+        lines += format_metric('rah_overruns_total', 'counter', 'Frames that took longer than a tick',
+                               [({}, scheduler.overruns)])
+        lines += format_metric('rah_subscribers', 'gauge', 'Connected clients by namespace',
+                               [({'namespace': channel.namespace}, channel.subscriber_count) for channel in self.channels])
+        lines += format_metric('rah_channel_frames_sent_total', 'counter', 'Frames sent by namespace',
+                               [({'namespace': channel.namespace}, channel.frames_sent) for channel in self.channels])
+        lines += format_metric('rah_channel_frames_coalesced_total', 'counter',
+                               'Frames dropped by the emit rate limit by namespace',
+                               [({'namespace': channel.namespace}, channel.frames_coalesced) for channel in self.channels])
+        lines += format_metric('rah_latency_echoes_total', 'counter', 'Latency probes echoed by the overlays by namespace',
+                               [({'namespace': channel.namespace}, channel.latency.echoes) for channel in self.channels])
+        lines += format_metric('rah_latency_seconds', 'gauge',
+                               'Sim-to-screen latency quantiles by namespace, encoding and component',
+                               [sample for channel in self.channels
+                                for sample in channel.latency.quantile_samples({'namespace': channel.namespace})])
+        if using_asyncio_mode:
+            lines += format_metric('rah_emits_pending', 'gauge', 'Emits queued for the asyncio producer',
+                                   [({}, self.socketio.pending_count)])
+            lines += format_metric('rah_emits_dropped_total', 'counter',
+                                   'Emits dropped because the asyncio producer fell behind',
+                                   [({}, self.socketio.emits_dropped)])
+        return lines
+
+    def has_subscribers(self) -> bool:
+        """
+        Check whether any overlay client is connected.
+
+        Returns:
+            bool: True if at least one channel has a client
+        """
+        return any(channel.has_subscribers for channel in self.channels)
+
+    def _configure_scheduler(self) -> None:
+        """Align the tick scheduler with the telemetry source that just connected."""
+        source = self.data_provider.ir_sdk
+        self.tick_scheduler.set_tick_rate(source.tick_rate)
+        self.tick_scheduler.event_driven = source.has_data_event
+        logging.info(f"Telemetry loop paced at {source.tick_rate or 'max'} Hz (data event: {source.has_data_event})")
 
     def _start_telemetry_thread(self) -> None:
         """
@@ -197,55 +481,114 @@ class WebInterface:
         """
         def telemetry_thread() -> None:
             """
-            Thread function that processes and emits telemetry data.
+            Thread function that emits one frame per sim tick.
             """
+            scheduler_aligned = False
+            first_frame = True
             while not self.shutdown_flag:
                 try:
+                    # With no overlay open there is nothing to compute, sleep
+                    # until a client connects and only read the lap variables
+                    # once per IDLE_INTERVAL so laps are still recorded
+                    self.subscribers_changed.clear()
+                    if not self.has_subscribers():
+                        scheduler_aligned = False
+                        if self.data_provider.is_connected or self.data_provider.connect():
+                            self.data_provider.poll_laps()
+                        self.subscribers_changed.wait(self.IDLE_INTERVAL)
+                        continue
+
                     # Reconnect to iRacing if needed
                     if not self.data_provider.is_connected:
-                        self.data_provider.connect()
-                        
-                    # Process telemetry if connected
-                    if self.data_provider.is_connected:
-                        self._process_telemetry_data()
-                            
+                        scheduler_aligned = False
+                        if not self.data_provider.connect():
+                            time.sleep(self.RECONNECT_INTERVAL)
+                            continue
+
+                    if not scheduler_aligned:
+                        self._configure_scheduler()
+                        scheduler_aligned = True
+
+                    self.tick_scheduler.wait()
+                    if not self.data_provider.acquire_frame():
+                        self.tick_scheduler.frame_unchanged()
+                        continue
+
+                    self._process_telemetry_data(freeze=False)
+                    self.tick_scheduler.frame_emitted(self.data_provider.frame_tick)
+                    if first_frame:
+                        first_frame = False
+                        startup_profile.log_report('first telemetry frame emitted')
+
                 except Exception as e:
+                    self.metrics.count_error(e)
                     logging.error(f"Unexpected error in telemetry thread: {e}")
-                    
-                time.sleep(0.01)  # ~30 FPS
+                    time.sleep(self.RECONNECT_INTERVAL)
 
         self.telemetry_thread = threading.Thread(target=telemetry_thread)
         self.telemetry_thread.daemon = True
         self.telemetry_thread.start()
+        # The frame marks are bucketed off the telemetry thread
+        self.metrics.start_folding()
         
-    def _process_telemetry_data(self) -> None:
-        """Process and emit telemetry and lap time data."""
+    def _process_telemetry_data(self, freeze: bool = True) -> None:
+        """
+        Process and emit telemetry and lap time data.
+
+        Only the payloads of namespaces with connected clients whose emit
+        slot has come up are computed. The driver inputs of every processed
+        frame are recorded in the telemetry history and its lap variables
+        feed the lap history.
+
+        The frame's stage timestamps (see FRAME_MARKS) go to the hot path
+        metrics, the input history is part of the compute stage.
+
+        Args:
+            freeze: Freeze the latest frame first, False when the telemetry
+                loop already acquired it
+        """
+        send_inputs = self.telemetry_channel.has_subscribers and self.telemetry_channel.is_due()
+        send_metrics = self.driver_in_front_channel.has_subscribers and self.driver_in_front_channel.is_due()
+        record_history = self.telemetry_history is not None
+
+        # The frame is read even when no payload is due, so the input history
+        # and lap detection see every tick
         try:
-            data = self.data_provider.get_telemetry_data()
+            provider = self.data_provider
+            data = provider.get_telemetry_data(freeze=freeze, metrics=send_metrics)
             if data:
-                normalized_data = self._normalize_data(data)
-                
-                # Standard emission for all modes - keep it simple
-                try:
-                    self.socketio.emit('telemetry_update', normalized_data, namespace='/input_telemetry')
-                except Exception as e:
-                    logging.error(f"Error in telemetry processing: {e}")
-                
-                # Create driver in front data
-                driver_data = {
-                    'front_last_lap_time': data.get('front_last_lap_time', 0.0),
-                    'front_best_lap_time': data.get('front_best_lap_time', 0.0),
-                    'lap_delta': data.get('lap_delta', 0.0),
-                    'target_pace': data.get('target_pace', 0.0),
-                    'session_type': data.get('session_type', 'race')
-                }
-                
-                try:
-                    self.socketio.emit('driver_in_front_update', driver_data, namespace='/driver_in_front')
-                except Exception as e:
-                    logging.error(f"Error in driver in front processing: {e}")
-                
+                if record_history:
+                    # The sample time is when the frame was read, no extra clock read
+                    self.telemetry_history.append(provider.frame_tick, provider.frame_started_ns / 1e9, data)
+                ready = normalized = inputs_sent = time.perf_counter_ns()
+
+                if send_inputs:
+                    inputs = {key: data.get(key) for key in INPUT_KEYS}
+                    payload = self._normalize_data(inputs)
+                    normalized = time.perf_counter_ns()
+                    self.telemetry_channel.publish(payload, provider.frame_tick, provider.frame_started_ns)
+                    inputs_sent = time.perf_counter_ns()
+
+                driver_sent = inputs_sent
+
+                if send_metrics:
+                    # Create driver in front data
+                    driver_data = {
+                        'front_last_lap_time': data.get('front_last_lap_time', 0.0),
+                        'front_best_lap_time': data.get('front_best_lap_time', 0.0),
+                        'lap_delta': data.get('lap_delta', 0.0),
+                        'target_pace': data.get('target_pace', 0.0),
+                        'session_type': data.get('session_type', 'race')
+                    }
+                    self.driver_in_front_channel.publish(driver_data, provider.frame_tick, provider.frame_started_ns)
+                    driver_sent = time.perf_counter_ns()
+
+                if provider.frame_decoded_ns:
+                    self.metrics.record_frame((provider.frame_started_ns, provider.frame_decoded_ns, ready,
+                                               normalized, inputs_sent, driver_sent))
+
         except Exception as e:
+            self.metrics.count_error(e)
             logging.error(f"Error in telemetry processing: {e}")
     
     def _normalize_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
@@ -279,11 +622,23 @@ class WebInterface:
             host: The hostname to listen on
             port: The port of the webserver
         """
+        startup_profile.mark('connecting to iRacing')
+
         # Always connect to iRacing first
         self.data_provider.connect()
         
+        # Overlay windows launched from the interface start from warm processes
+        if HOST_MODE:
+            get_overlay_host().start()
+        else:
+            get_window_pool().start()
+
+        startup_profile.log_report('web server starting')
+        
         # Run the appropriate server mode
-        if using_fallback_mode or (platform.system() == 'Windows' and getattr(sys, 'frozen', False)):
+        if using_asyncio_mode:
+            self.socketio.run(host, port)
+        elif using_fallback_mode or (platform.system() == 'Windows' and getattr(sys, 'frozen', False)):
             self._run_with_threading(host, port)
         else:
             self._run_with_eventlet(host, port)
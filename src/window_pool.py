@@ -0,0 +1,380 @@
+import os
+import sys
+import time
+import logging
+import threading
+import multiprocessing
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import startup_profile
+
+# Number of idle window processes kept ready, 0 spawns one per launch
+POOL_SIZE = max(int(os.environ.get('RAH_WINDOW_POOL_SIZE', '1')), 0)
+
+# Keep one transparent window per overlay and switch it between positioning
+# and click-through mode in place instead of relaunching it
+IN_PLACE_TOGGLE = os.environ.get('RAH_IN_PLACE_TOGGLE', 'false').lower() == 'true'
+
+# Seconds a window process gets to answer a stats request
+STATS_TIMEOUT = 0.5
+
+# Workers are started from background threads. A forked child would carry
+# that thread over as its only thread and pywebview refuses to run outside
+# the main thread, spawned children start clean on every platform.
+_context = multiprocessing.get_context('spawn')
+
+
+def run_overlay_window(url: str, resolution: Dict[str, int], transparent: bool = True,
+                       position: Optional[Dict[str, int]] = None, folder_name: Optional[str] = None,
+                       requested_at: Optional[float] = None, in_place: bool = False,
+                       commands: Any = None) -> None:
+    """
+    Show an overlay window, blocks until the window is closed.
+
+    Args:
+        url: URL of the overlay page
+        resolution: Window width and height
+        transparent: Create a transparent, click-through window
+        position: Saved window position, None to let the system place it
+        folder_name: Overlay folder name, used for position reporting
+        requested_at: time.time() of the launch request, used to log the launch latency
+        in_place: Switch between positioning and transparent mode in place
+        commands: Pipe end to read ``mode`` and ``move`` commands from
+    """
+    try:
+        from overlay_window import OverlayWindow
+
+        overlay_window = OverlayWindow(
+            url,
+            width=resolution['width'],
+            height=resolution['height'],
+            transparent=transparent,
+            on_top=True,
+            in_place=in_place
+        )
+
+        if folder_name:
+            overlay_window.set_folder_name(folder_name)
+
+        if position:
+            logging.info(f"Setting position for {folder_name}: {position}")
+            overlay_window.position = position
+
+        overlay_window.requested_at = requested_at
+
+        def on_closed():
+            logging.debug(f"Window for {folder_name} closed")
+            sys.exit(0)
+
+        overlay_window.set_on_closed(on_closed)
+
+        if commands is not None:
+            threading.Thread(target=_serve_commands, args=(commands, overlay_window),
+                             name='overlay-window-commands', daemon=True).start()
+
+        overlay_window.create_overlay_window()
+    except Exception as e:
+        logging.error(f"Error launching overlay window: {e}")
+        sys.exit(1)
+
+
+def _serve_commands(conn: Any, overlay_window: Any) -> None:
+    """Apply the commands the web server sends to a pooled window, ``stats`` is answered."""
+    while True:
+        try:
+            command, *args = conn.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            if command == 'mode':
+                overlay_window.set_positioning(*args)
+            elif command == 'move':
+                overlay_window.set_position(*args)
+            elif command == 'stats':
+                conn.send(('stats', overlay_window.bridge_stats()))
+        except (EOFError, OSError):
+            return
+        except Exception as e:
+            logging.error(f"Window command {command} failed: {e}")
+
+
+def _worker_main(conn: Any, parent_conn: Any) -> None:
+    """
+    Entry point of a pooled window process.
+
+    The worker loads webview and the window code before it reports ready,
+    then only waits for its launch request and shows the window. The web
+    server process imports this module without that cost.
+
+    Args:
+        conn: Worker end of the pipe
+        parent_conn: Pool end of the pipe, closed here so a dying pool ends the wait
+    """
+    parent_conn.close()
+    import overlay_window  # noqa: F401
+    startup_profile.log_report('window worker ready')
+    try:
+        conn.send(('ready', os.getpid()))
+        request = conn.recv()
+    except (EOFError, OSError):
+        conn.close()
+        return
+
+    if request is None:
+        conn.close()
+        return
+    # The pipe stays open for mode and move commands
+    run_overlay_window(**request, commands=conn)
+
+
+class PooledWindow:
+    """
+    Handle of a window shown by a pooled process.
+
+    Has the subset of the multiprocessing.Process interface the interface
+    uses on its overlay processes, plus the window commands.
+    """
+
+    def __init__(self, process: multiprocessing.Process, conn: Any) -> None:
+        self.process = process
+        self.conn = conn
+        self._stats_lock = threading.Lock()
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.process.pid
+
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    def terminate(self) -> None:
+        self.conn.close()
+        self.process.terminate()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        self.process.join(timeout)
+
+    def _send(self, *command: Any) -> bool:
+        try:
+            self.conn.send(command)
+            return True
+        except (OSError, ValueError):
+            return False
+
+    def set_positioning(self, enabled: bool) -> bool:
+        """Switch an in-place window's mode, False if the command could not be sent."""
+        return self._send('mode', enabled)
+
+    def move(self, x: int, y: int) -> bool:
+        return self._send('move', x, y)
+
+    def bridge_stats(self) -> Optional[Dict[str, Any]]:
+        """
+        Ask the window process for its JS bridge counters.
+
+        Returns:
+            Optional[Dict[str, Any]]: See OverlayWindow.bridge_stats, None if
+                the window did not answer within STATS_TIMEOUT
+        """
+        with self._stats_lock:
+            try:
+                # Drop replies that came in after an earlier request timed out
+                while self.conn.poll():
+                    self.conn.recv()
+            except (EOFError, OSError):
+                return None
+            if not self._send('stats'):
+                return None
+            deadline = time.monotonic() + STATS_TIMEOUT
+            try:
+                while self.conn.poll(max(deadline - time.monotonic(), 0)):
+                    reply = self.conn.recv()
+                    # A worker launched before it was ready still has its ready message queued
+                    if reply[0] == 'stats':
+                        return reply[1]
+            except (EOFError, OSError):
+                pass
+            return None
+
+
+class WindowPool:
+    """
+    Keeps pre-spawned overlay window processes waiting for a launch request.
+
+    Spawning a process and importing webview takes most of the time between a
+    click in the interface and the overlay showing up. Pooled workers have
+    done both before the click, a launch only sends the window arguments over
+    a pipe. The pool is refilled in the background after every launch, by
+    one fill thread at a time.
+
+    A worker counts as warm once its ``ready`` message arrived. Launches
+    prefer ready workers, a worker still importing is only used when none
+    is ready and the launch counts as cold.
+    """
+
+    def __init__(self, size: int = POOL_SIZE) -> None:
+        """
+        Initialize the pool, no process is spawned until start() or launch().
+
+        Args:
+            size: Number of idle workers to keep
+        """
+        self.size = size
+        self._idle: List[Tuple[multiprocessing.Process, Any]] = []
+        # Pipes of the idle workers that reported ready
+        self._ready: Set[Any] = set()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._filling = False
+        self.launch_count = 0
+        self.warm_launch_count = 0
+
+    def _spawn(self) -> Tuple[multiprocessing.Process, Any]:
+        """Start one worker process."""
+        parent_conn, child_conn = _context.Pipe()
+        process = _context.Process(target=_worker_main, args=(child_conn, parent_conn),
+                                   name='overlay-window')
+        process.daemon = True
+        process.start()
+        child_conn.close()
+        return process, parent_conn
+
+    def _fill(self) -> None:
+        """Spawn workers until the pool is full, runs on the single fill thread."""
+        while True:
+            with self._lock:
+                if self._closed or len(self._idle) >= self.size:
+                    self._filling = False
+                    return
+            worker = self._spawn()
+            with self._lock:
+                if self._closed:
+                    self._filling = False
+                    worker[0].terminate()
+                    return
+                self._idle.append(worker)
+
+    def start(self) -> None:
+        """Pre-spawn the idle workers in the background, unless a fill is running."""
+        if self.size <= 0:
+            return
+        with self._lock:
+            if self._filling or self._closed:
+                return
+            self._filling = True
+        threading.Thread(target=self._fill, name='window-pool-fill', daemon=True).start()
+
+    def _poll_ready(self, conn: Any) -> bool:
+        """Read a worker's ready message if it arrived, the caller holds the lock."""
+        if conn in self._ready:
+            return True
+        try:
+            if conn.poll() and conn.recv()[0] == 'ready':
+                self._ready.add(conn)
+                return True
+        except (EOFError, OSError):
+            pass
+        return False
+
+    def _take_idle(self) -> Tuple[Optional[Tuple[multiprocessing.Process, Any]], bool]:
+        """
+        Remove and return a live idle worker, a ready one if there is any.
+
+        Returns:
+            Tuple[Optional[Tuple[multiprocessing.Process, Any]], bool]: The
+                worker or None, and whether it reported ready
+        """
+        with self._lock:
+            for process, conn in list(self._idle):
+                if not process.is_alive():
+                    self._idle.remove((process, conn))
+                    self._ready.discard(conn)
+                    conn.close()
+            for worker in self._idle:
+                if self._poll_ready(worker[1]):
+                    self._idle.remove(worker)
+                    self._ready.discard(worker[1])
+                    return worker, True
+            if self._idle:
+                # Still importing, but ahead of a process spawned now
+                return self._idle.pop(0), False
+        return None, False
+
+    def launch(self, url: str, resolution: Dict[str, int], transparent: bool = True,
+               position: Optional[Dict[str, int]] = None,
+               folder_name: Optional[str] = None, in_place: bool = False) -> PooledWindow:
+        """
+        Show an overlay window in a pooled process.
+
+        Args:
+            url: URL of the overlay page
+            resolution: Window width and height
+            transparent: Create a transparent, click-through window
+            position: Saved window position
+            folder_name: Overlay folder name
+            in_place: Switch between positioning and transparent mode in place
+
+        Returns:
+            PooledWindow: Handle of the window, terminate it to close the window
+        """
+        request = {
+            'url': url,
+            'resolution': resolution,
+            'transparent': transparent,
+            'position': position,
+            'folder_name': folder_name,
+            'requested_at': time.time(),
+            'in_place': in_place,
+        }
+
+        worker, warm = self._take_idle()
+        if worker is None:
+            # Cold start, the request waits in the pipe until the imports are done
+            worker = self._spawn()
+        process, conn = worker
+        try:
+            conn.send(request)
+        except (OSError, ValueError):
+            conn.close()
+            raise
+
+        self.launch_count += 1
+        if warm:
+            self.warm_launch_count += 1
+        logging.debug(f"Launched overlay {folder_name} in {'warm' if warm else 'cold'} process {process.pid}")
+        self.start()
+        return PooledWindow(process, conn)
+
+    def shutdown(self) -> None:
+        """Stop the idle workers."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._ready.clear()
+        for process, conn in idle:
+            try:
+                conn.send(None)
+            except (OSError, ValueError):
+                pass
+            conn.close()
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+
+
+_pool: Optional[WindowPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_window_pool() -> WindowPool:
+    """
+    Return the window pool of this process.
+
+    Returns:
+        WindowPool: The shared pool, created on first use
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WindowPool()
+        return _pool